@@ -6,13 +6,13 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
-from backend.database import Base
+from backend.database import Base, to_sync_url
 
 config = context.config
 
 db_url = os.getenv("DATABASE_URL")
 if db_url:
-    config.set_main_option("sqlalchemy.url", db_url)
+    config.set_main_option("sqlalchemy.url", to_sync_url(db_url))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -0,0 +1,26 @@
+"""add sample filter indexes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+SAMPLE_FILTER_COLUMNS = ["well_id", "horizon", "assigned_to", "storage_location", "sampling_date"]
+
+
+def upgrade():
+    for column in SAMPLE_FILTER_COLUMNS:
+        op.create_index(f"ix_samples_{column}_sample_id", "samples", [column, "sample_id"])
+
+
+def downgrade():
+    for column in reversed(SAMPLE_FILTER_COLUMNS):
+        op.drop_index(f"ix_samples_{column}_sample_id", table_name="samples")
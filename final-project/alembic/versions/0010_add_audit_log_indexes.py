@@ -0,0 +1,31 @@
+"""add audit log indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+AUDIT_INDEXES = {
+    "ix_audit_log_performed_at_id": ["performed_at", "id"],
+    "ix_audit_log_entity": ["entity_type", "entity_id", "performed_at", "id"],
+    "ix_audit_log_performed_by": ["performed_by", "performed_at", "id"],
+    "ix_audit_log_action": ["action", "performed_at", "id"],
+}
+
+
+def upgrade():
+    for name, columns in AUDIT_INDEXES.items():
+        op.create_index(name, "audit_log", columns)
+
+
+def downgrade():
+    for name in reversed(list(AUDIT_INDEXES)):
+        op.drop_index(name, table_name="audit_log")
@@ -0,0 +1,30 @@
+"""add collection versions
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+COLLECTIONS = ["samples", "planned_analyses", "action_batches", "conflicts"]
+
+
+def upgrade():
+    table = op.create_table(
+        "collection_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.bulk_insert(table, [{"name": name, "version": 0} for name in COLLECTIONS])
+
+
+def downgrade():
+    op.drop_table("collection_versions")
@@ -0,0 +1,22 @@
+"""add planned analysis (sample_id, analysis_type) index
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_planned_analyses_sample_id_analysis_type", "planned_analyses", ["sample_id", "analysis_type"])
+
+
+def downgrade():
+    op.drop_index("ix_planned_analyses_sample_id_analysis_type", table_name="planned_analyses")
@@ -0,0 +1,38 @@
+"""add status counts summary table
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "status_counts",
+        sa.Column("entity", sa.String(), primary_key=True),
+        sa.Column("group_a", sa.String(), primary_key=True),
+        sa.Column("group_b", sa.String(), primary_key=True),
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "INSERT INTO status_counts (entity, group_a, group_b, status, count) "
+        "SELECT 'samples', well_id, horizon, CAST(status AS VARCHAR), count(*) FROM samples GROUP BY well_id, horizon, status"
+    )
+    op.execute(
+        "INSERT INTO status_counts (entity, group_a, group_b, status, count) "
+        "SELECT 'planned_analyses', analysis_type, '', CAST(status AS VARCHAR), count(*) FROM planned_analyses GROUP BY analysis_type, status"
+    )
+
+
+def downgrade():
+    op.drop_table("status_counts")
@@ -0,0 +1,51 @@
+"""add sample search index
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "sample_id, well_id, horizon, storage_location, assigned_to"
+NEW = "new.sample_id, new.well_id, new.horizon, new.storage_location, new.assigned_to"
+OLD = "old.sample_id, old.well_id, old.horizon, old.storage_location, old.assigned_to"
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_samples_search ON samples USING gin (to_tsvector('simple', sample_id || ' ' || well_id || ' ' || horizon"
+            " || ' ' || coalesce(storage_location, '') || ' ' || coalesce(assigned_to, '')))"
+        )
+        return
+    op.execute(f"CREATE VIRTUAL TABLE samples_fts USING fts5({COLUMNS}, content='samples', detail=column, prefix='1 2 3 4')")
+    op.execute(
+        f"CREATE TRIGGER samples_fts_insert AFTER INSERT ON samples BEGIN "
+        f"INSERT INTO samples_fts(rowid, {COLUMNS}) VALUES (new.rowid, {NEW}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER samples_fts_delete AFTER DELETE ON samples BEGIN "
+        f"INSERT INTO samples_fts(samples_fts, rowid, {COLUMNS}) VALUES ('delete', old.rowid, {OLD}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER samples_fts_update AFTER UPDATE OF {COLUMNS} ON samples BEGIN "
+        f"INSERT INTO samples_fts(samples_fts, rowid, {COLUMNS}) VALUES ('delete', old.rowid, {OLD}); "
+        f"INSERT INTO samples_fts(rowid, {COLUMNS}) VALUES (new.rowid, {NEW}); END"
+    )
+    op.execute("INSERT INTO samples_fts(samples_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX ix_samples_search")
+        return
+    for trigger in ("samples_fts_insert", "samples_fts_delete", "samples_fts_update"):
+        op.execute(f"DROP TRIGGER {trigger}")
+    op.execute("DROP TABLE samples_fts")
@@ -0,0 +1,24 @@
+"""add assignee and analysis status indexes for the work queue
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_planned_analysis_assignees_assignee_analysis_id", "planned_analysis_assignees", ["assignee", "analysis_id"])
+    op.create_index("ix_planned_analyses_status", "planned_analyses", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_planned_analyses_status", table_name="planned_analyses")
+    op.drop_index("ix_planned_analysis_assignees_assignee_analysis_id", table_name="planned_analysis_assignees")
@@ -0,0 +1,130 @@
+"""store sampling dates and audit/conflict timestamps as typed columns
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-16
+
+Every existing value is validated before anything is converted; the
+migration stops and names the offending rows rather than guessing. Values
+were written as ISO 8601 strings (datetime.isoformat() for timestamps), so
+in practice only hand-entered sampling dates can fail.
+
+Postgres converts in place with ALTER ... TYPE ... USING, which also rebuilds
+the indexes on these columns. SQLite has no typed dates, so the declared
+types stay and the values are rewritten into the formats SQLAlchemy's Date
+and DateTime read back ("YYYY-MM-DD", "YYYY-MM-DD HH:MM:SS.ffffff" in UTC).
+"""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+# (table, column, key column, kind)
+COLUMNS = [
+    ("samples", "sampling_date", "sample_id", "date"),
+    ("audit_log", "performed_at", "id", "timestamp"),
+    ("conflicts", "updated_at", "id", "timestamp"),
+]
+# Conflict timestamps are nullable and may have been written as "".
+PG_PATTERNS = {"date": r"^\d{4}-\d{2}-\d{2}", "timestamp": r"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}|$)"}
+PG_CASTS = {"date": "left({col}, 10)::date", "timestamp": "NULLIF({col}, '')::timestamptz"}
+SQLITE_BATCH = 5000
+EXAMPLES = 10
+
+
+def to_sqlite_date(value: str) -> str:
+    return date.fromisoformat(value[:10]).isoformat()
+
+
+def to_sqlite_timestamp(value: str) -> str | None:
+    if value == "":
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+SQLITE_CONVERTERS = {"date": to_sqlite_date, "timestamp": to_sqlite_timestamp}
+
+
+def fail(table: str, column: str, kind: str, count: int, examples: list[tuple]):
+    listed = ", ".join(f"{key}={value!r}" for key, value in examples[:EXAMPLES])
+    raise RuntimeError(
+        f"{table}.{column}: {count} value(s) are not ISO 8601 {kind}s (e.g. {listed}). "
+        "Fix or clear them, then rerun the migration."
+    )
+
+
+def upgrade_postgres(bind):
+    # The app always wrote UTC; timestamps stored without an offset are read as UTC.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    for table, column, key, kind in COLUMNS:
+        invalid = f"FROM {table} WHERE {column} !~ :pattern"
+        params = {"pattern": PG_PATTERNS[kind]}
+        count = bind.scalar(sa.text(f"SELECT count(*) {invalid}"), params)
+        if count:
+            fail(table, column, kind, count, bind.execute(sa.text(f"SELECT {key}, {column} {invalid} LIMIT {EXAMPLES}"), params).all())
+    for table, column, _, kind in COLUMNS:
+        type_ = "date" if kind == "date" else "timestamptz"
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_} USING {PG_CASTS[kind].format(col=column)}")
+
+
+def upgrade_sqlite(bind):
+    for table, column, key, kind in COLUMNS:
+        convert = SQLITE_CONVERTERS[kind]
+        rows = bind.execute(sa.text(f"SELECT {key}, {column} FROM {table} WHERE {column} IS NOT NULL")).all()
+        updates, bad = [], []
+        for row_key, value in rows:
+            try:
+                converted = convert(value)
+            except ValueError:
+                bad.append((row_key, value))
+                continue
+            if converted != value:
+                updates.append({"key": row_key, "value": converted})
+        if bad:
+            fail(table, column, kind, len(bad), bad)
+        statement = sa.text(f"UPDATE {table} SET {column} = :value WHERE {key} = :key")
+        for start in range(0, len(updates), SQLITE_BATCH):
+            bind.execute(statement, updates[start:start + SQLITE_BATCH])
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        upgrade_postgres(bind)
+    else:
+        upgrade_sqlite(bind)
+    op.create_index("ix_conflicts_updated_at", "conflicts", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_conflicts_updated_at", table_name="conflicts")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("SET LOCAL TIME ZONE 'UTC'")
+        op.execute("ALTER TABLE samples ALTER COLUMN sampling_date TYPE varchar USING to_char(sampling_date, 'YYYY-MM-DD')")
+        for table, column in [("audit_log", "performed_at"), ("conflicts", "updated_at")]:
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar "
+                f"USING to_char({column}, 'YYYY-MM-DD\"T\"HH24:MI:SS.US\"+00:00\"')"
+            )
+        return
+    # Back to datetime.isoformat() strings; sampling dates are already ISO dates.
+    for table, column, key in [("audit_log", "performed_at", "id"), ("conflicts", "updated_at", "id")]:
+        rows = bind.execute(sa.text(f"SELECT {key}, {column} FROM {table} WHERE {column} IS NOT NULL")).all()
+        updates = [
+            {"key": row_key, "value": datetime.fromisoformat(value).replace(tzinfo=timezone.utc).isoformat()}
+            for row_key, value in rows
+        ]
+        statement = sa.text(f"UPDATE {table} SET {column} = :value WHERE {key} = :key")
+        for start in range(0, len(updates), SQLITE_BATCH):
+            bind.execute(statement, updates[start:start + SQLITE_BATCH])
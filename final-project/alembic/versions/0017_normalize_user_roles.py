@@ -0,0 +1,49 @@
+"""move user roles from a comma-separated column into a user_roles table
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-16
+
+Each user gets one row per role, in the order the roles were listed; users
+whose roles string is empty keep their primary role.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    user_roles = op.create_table(
+        "user_roles",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("role", sa.String(), primary_key=True),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+    )
+    bind = op.get_bind()
+    rows = []
+    for user_id, role, roles in bind.execute(sa.text("SELECT id, role, roles FROM users")).all():
+        names = list(dict.fromkeys(r.strip() for r in (roles or "").split(",") if r.strip())) or [role]
+        rows.extend({"user_id": user_id, "role": name, "position": i} for i, name in enumerate(names))
+    if rows:
+        op.bulk_insert(user_roles, rows)
+    op.drop_column("users", "roles")
+
+
+def downgrade():
+    op.add_column("users", sa.Column("roles", sa.String(), nullable=False, server_default="lab_operator"))
+    bind = op.get_bind()
+    roles: dict[int, list[str]] = {}
+    for user_id, role in bind.execute(sa.text("SELECT user_id, role FROM user_roles ORDER BY user_id, position")).all():
+        roles.setdefault(user_id, []).append(role)
+    statement = sa.text("UPDATE users SET roles = :roles WHERE id = :id")
+    for user_id, names in roles.items():
+        bind.execute(statement, {"id": user_id, "roles": ",".join(names)})
+    if bind.dialect.name == "postgresql":
+        op.alter_column("users", "roles", server_default=None)
+    op.drop_table("user_roles")
@@ -0,0 +1,26 @@
+"""add version columns for optimistic concurrency on samples and planned analyses
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows start at version 1, the same as new ones.
+    op.add_column("samples", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("planned_analyses", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade():
+    op.drop_column("planned_analyses", "version")
+    op.drop_column("samples", "version")
@@ -0,0 +1,45 @@
+"""rebuild the sample search indexes
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-17
+
+Postgres: the old expression let the text search parser read "W-7731" as
+"w" and "-7731", so a search for "7731" missed it; punctuation is now
+blanked before parsing. SQLite: the FTS5 table gains 5- and 6-character
+prefix indexes.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0019"
+down_revision = "0018"
+branch_labels = None
+depends_on = None
+
+FIELDS = "sample_id || ' ' || well_id || ' ' || horizon || ' ' || coalesce(storage_location, '') || ' ' || coalesce(assigned_to, '')"
+COLUMNS = "sample_id, well_id, horizon, storage_location, assigned_to"
+
+
+def rebuild_fts(prefix: str):
+    # The samples triggers refer to samples_fts by name and keep working.
+    op.execute("DROP TABLE samples_fts")
+    op.execute(f"CREATE VIRTUAL TABLE samples_fts USING fts5({COLUMNS}, content='samples', detail=column, prefix='{prefix}')")
+    op.execute("INSERT INTO samples_fts(samples_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        rebuild_fts("1 2 3 4 5 6")
+        return
+    op.execute("DROP INDEX ix_samples_search")
+    op.execute(f"CREATE INDEX ix_samples_search ON samples USING gin (to_tsvector('simple', regexp_replace({FIELDS}, '[^[:alnum:]_]+', ' ', 'g')))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        rebuild_fts("1 2 3 4")
+        return
+    op.execute("DROP INDEX ix_samples_search")
+    op.execute(f"CREATE INDEX ix_samples_search ON samples USING gin (to_tsvector('simple', {FIELDS}))")
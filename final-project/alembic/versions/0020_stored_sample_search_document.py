@@ -0,0 +1,54 @@
+"""store the sample search document and an insertion sequence
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-17
+
+Postgres: the GIN expression index gives way to a stored tsvector column
+holding every prefix of every word, indexed with GIN, and search pages in
+insert_seq order instead of heap order, which an UPDATE changes. Both
+columns are filled by the database, so existing rows are backfilled by the
+ALTER TABLE itself. SQLite already pages by the FTS5 rowid, which an UPDATE
+keeps; nothing changes there.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0020"
+down_revision = "0019"
+branch_labels = None
+depends_on = None
+
+FIELDS = "sample_id || ' ' || well_id || ' ' || horizon || ' ' || coalesce(storage_location, '') || ' ' || coalesce(assigned_to, '')"
+# Copied rather than imported, so this revision keeps its meaning if search.py changes.
+DOCUMENT_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION sample_search_document(VARIADIC fields text[]) RETURNS tsvector "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ "
+    "SELECT coalesce(array_to_tsvector(array_agg(DISTINCT left(w, n))), ''::tsvector) "
+    "FROM unnest(regexp_split_to_array(lower(array_to_string(fields, ' ')), '[^[:alnum:]_]+')) w, "
+    "generate_series(1, length(w)) n WHERE w <> '' $$"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(DOCUMENT_FUNCTION)
+    op.execute("ALTER TABLE samples ADD COLUMN insert_seq bigint GENERATED ALWAYS AS IDENTITY")
+    op.execute(
+        "ALTER TABLE samples ADD COLUMN search_document tsvector GENERATED ALWAYS AS "
+        "(sample_search_document(sample_id, well_id, horizon, storage_location, assigned_to)) STORED"
+    )
+    op.execute("CREATE UNIQUE INDEX ix_samples_insert_seq ON samples (insert_seq)")
+    op.execute("CREATE INDEX ix_samples_search_document ON samples USING gin (search_document)")
+    op.execute("DROP INDEX ix_samples_search")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(f"CREATE INDEX ix_samples_search ON samples USING gin (to_tsvector('simple', regexp_replace({FIELDS}, '[^[:alnum:]_]+', ' ', 'g')))")
+    op.execute("ALTER TABLE samples DROP COLUMN search_document")
+    op.execute("ALTER TABLE samples DROP COLUMN insert_seq")
+    op.execute("DROP FUNCTION sample_search_document(text[])")
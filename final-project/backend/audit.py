@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+try:
+    from .database import AsyncSessionLocal
+    from .models import AuditLogModel
+except ImportError:  # pragma: no cover
+    from database import AsyncSessionLocal  # type: ignore
+    from models import AuditLogModel  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "audit_pending"
+
+
+def audit_entry(*, entity_type: str, entity_id: str, action: str, performed_by: str | None, details: str | None = None) -> dict:
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "performed_by": performed_by,
+        "performed_at": datetime.now(timezone.utc),
+        "details": details,
+    }
+
+
+class AuditWriter:
+    """Buffers audit rows on the session and writes them in bulk.
+
+    mode="transaction" inserts the buffered rows with one executemany right
+    before the session commits, so they are exactly as durable as the change
+    they describe. mode="background" hands them to a queue after the commit
+    succeeds, and a worker writes them in group commits of up to batch_size
+    rows. That is cheaper under load, but a crash can lose up to
+    flush_interval seconds of audit rows.
+    """
+
+    def __init__(self, mode: str = "transaction", batch_size: int = 500, flush_interval: float = 0.05):
+        if mode not in {"transaction", "background"}:
+            raise ValueError(f"Unknown audit write mode: {mode}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict] | None = None
+        self._worker: asyncio.Task | None = None
+
+    def stage(self, db: AsyncSession, entries: list[dict]):
+        """Attach entries to the caller's pending transaction; the caller commits."""
+        if not db.in_transaction():
+            # Begin (no I/O yet) so a rollback before the first query still discards the entries.
+            db.sync_session.begin()
+        db.sync_session.info.setdefault(PENDING_KEY, []).extend(entries)
+
+    def before_commit(self, session: Session):
+        if self.mode != "transaction":
+            return
+        entries = session.info.pop(PENDING_KEY, None)
+        if entries:
+            session.execute(insert(AuditLogModel), entries)
+
+    def after_commit(self, session: Session):
+        if self.mode != "background":
+            return
+        entries = session.info.pop(PENDING_KEY, None)
+        if entries:
+            self._ensure_worker()
+            for entry in entries:
+                self._queue.put_nowait(entry)
+
+    def after_soft_rollback(self, session: Session):
+        session.info.pop(PENDING_KEY, None)
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+
+    async def _write(self, batch: list[dict]):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AuditLogModel), batch)
+                await db.commit()
+        except Exception:
+            logger.exception("Dropped %d audit rows", len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every queued audit row has been written."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+audit_writer = AuditWriter(
+    mode=os.getenv("AUDIT_WRITE_MODE", "transaction"),
+    batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "50")) / 1000,
+)
+
+event.listen(Session, "before_commit", lambda s: audit_writer.before_commit(s))
+event.listen(Session, "after_commit", lambda s: audit_writer.after_commit(s))
+event.listen(Session, "after_soft_rollback", lambda s, _: audit_writer.after_soft_rollback(s))
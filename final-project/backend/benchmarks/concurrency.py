@@ -0,0 +1,96 @@
+"""Concurrency benchmark for a running LabSync backend.
+
+Hammers one endpoint with N concurrent clients and reports requests/sec and
+latency percentiles for each concurrency level. Run it against the same
+database before and after a change to compare:
+
+    uvicorn backend.main:app --port 8000 --workers 1
+    python -m backend.benchmarks.concurrency --base-url http://localhost:8000 --seed 2000
+
+Requests that take longer than --timeout seconds count as errors, so a run
+against a server that stops answering still finishes with numbers. Only 2xx
+responses count towards rps and the latency percentiles; everything else is
+reported under errors.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def seed_samples(client: httpx.AsyncClient, count: int) -> None:
+    for i in range(count):
+        await client.post(
+            "/samples",
+            json={
+                "sample_id": f"BENCH-{i:06d}",
+                "well_id": f"W-{i % 50}",
+                "horizon": f"H{i % 7}",
+                "sampling_date": "2024-01-01",
+                "status": "new",
+            },
+        )
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, requests_per_client: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                ok = (await client.get(path)).is_success
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if args.seed:
+            await seed_samples(client, args.seed)
+        results = []
+        for level in args.concurrency:
+            results.append(await run_level(client, args.path, level, args.requests))
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/samples")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--requests", type=int, default=20, help="requests per client at each level")
+    parser.add_argument("--seed", type=int, default=0, help="create this many samples before measuring")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds before a request counts as an error")
+    for row in asyncio.run(main(parser.parse_args())):
+        print(json.dumps(row))
@@ -0,0 +1,107 @@
+"""Polling-fleet benchmark for conditional GETs.
+
+Simulates browser tabs that poll the Kanban list endpoints, once sending
+plain GETs and once replaying the last ETag in If-None-Match, while a writer
+occasionally moves a sample. The app runs in-process, so SQL statements can
+be counted exactly with an engine event:
+
+    python -m backend.benchmarks.polling --clients 50 --rounds 20 --seed 2000
+
+DATABASE_URL defaults to a throwaway SQLite file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{tempfile.mkdtemp()}/polling.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend.benchmarks.concurrency import percentile  # noqa: E402
+from backend.database import Base, async_engine, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+
+ENDPOINTS = ["/samples", "/planned-analyses", "/action-batches", "/conflicts"]
+
+
+async def seed(client: httpx.AsyncClient, count: int) -> None:
+    lines = ["sample_id,well_id,horizon,sampling_date,status"]
+    lines += [f"POLL-{i:06d},W-{i % 50},H{i % 7},2024-01-01,new" for i in range(count)]
+    await client.post("/samples/import", content="\n".join(lines), headers={"Content-Type": "text/csv"})
+
+
+async def run(client: httpx.AsyncClient, clients: int, rounds: int, conditional: bool, write_every: int) -> dict:
+    statements = 0
+    latencies: list[float] = []
+    not_modified = 0
+    transferred = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    async def tab():
+        nonlocal not_modified, transferred
+        etags: dict[str, str] = {}
+        for _ in range(rounds):
+            for path in ENDPOINTS:
+                headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+                start = time.perf_counter()
+                res = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                transferred += len(res.content)
+                if res.status_code == 304:
+                    not_modified += 1
+                elif "etag" in res.headers:
+                    etags[path] = res.headers["etag"]
+
+    async def writer():
+        for i in range(rounds * len(ENDPOINTS) * clients // write_every):
+            await client.patch("/samples/POLL-000000", json={"storage_location": f"Shelf {i}"}, headers={"If-Match": "*"})
+            await asyncio.sleep(0)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(writer(), *(tab() for _ in range(clients)))
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+    elapsed = time.perf_counter() - started
+    polls = len(latencies)
+    return {
+        "mode": "conditional" if conditional else "plain",
+        "polls": polls,
+        "not_modified": not_modified,
+        "sql_statements": statements,
+        "statements_per_poll": round(statements / polls, 2),
+        "bytes_per_poll": round(transferred / polls),
+        "rps": round(polls / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await seed(client, args.seed)
+        return [
+            await run(client, args.clients, args.rounds, conditional, args.write_every)
+            for conditional in (False, True)
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20, help="polls of every endpoint per client")
+    parser.add_argument("--seed", type=int, default=2000, help="samples to create before polling")
+    parser.add_argument("--write-every", type=int, default=100, help="one sample update per this many polls")
+    for row in asyncio.run(main(parser.parse_args())):
+        print(json.dumps(row))
@@ -0,0 +1,136 @@
+"""List serialization microbenchmark: pydantic path vs plain tuples + orjson.
+
+Seeds --rows samples (100k by default) into DATABASE_URL, then builds the
+unfiltered GET /samples body both ways, the way list_samples does:
+
+    pydantic  ORM entities -> Sample models -> jsonable_encoder -> JSONResponse
+    orjson    column tuples -> dicts -> ORJSONRowsResponse
+
+    python -m backend.benchmarks.serialization --rows 100000
+
+Reports median CPU time (process_time) for the query and encode stages, and
+the peak traced memory of a separate run under tracemalloc, since tracing
+slows everything down. Exits 1 if the two bodies are not byte-identical.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{tempfile.mkdtemp()}/serialization.db")
+os.environ.setdefault("DB_SCHEMA_MODE", "create")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from backend.benchmarks.load import HORIZONS, _chunks  # noqa: E402
+from backend.database import AsyncSessionLocal, SessionLocal, async_engine, engine  # noqa: E402
+from backend.fast_json import ORJSONRowsResponse  # noqa: E402
+from backend.main import SAMPLE_OUT_COLUMNS, SAMPLE_OUT_FIELDS, app, to_sample_out  # noqa: E402
+from backend.models import SampleModel, SampleStatus  # noqa: E402
+
+
+def seed(rows: int):
+    rnd = random.Random(25)
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(SampleModel))
+        batch = [
+            {
+                "sample_id": f"SER-{i:07d}",
+                "well_id": f"W-{rnd.randint(1, 2000)}",
+                "horizon": rnd.choice(HORIZONS),
+                "sampling_date": date(2024, 1, 1) + timedelta(days=rnd.randint(0, 700)),
+                "status": rnd.choice(list(SampleStatus)),
+                "storage_location": f"Rack {rnd.randint(1, 400)} / Shelf {rnd.randint(1, 8)}" if rnd.random() < 0.8 else None,
+                "assigned_to": rnd.choice(["ann", "bob", "Zoë", None]),
+            }
+            for i in range(existing, rows)
+        ]
+        for chunk in _chunks(batch):
+            db.execute(insert(SampleModel), chunk)
+        db.commit()
+
+
+async def fetch_entities():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(SampleModel).order_by(SampleModel.sample_id))).scalars().all()
+
+
+def encode_entities(rows) -> bytes:
+    # What FastAPI does with a list of models and no response_model.
+    return JSONResponse(jsonable_encoder([to_sample_out(r) for r in rows])).body
+
+
+async def fetch_tuples():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(*SAMPLE_OUT_COLUMNS).order_by(SampleModel.sample_id))).all()
+
+
+def encode_tuples(rows) -> bytes:
+    return ORJSONRowsResponse([dict(zip(SAMPLE_OUT_FIELDS, r)) for r in rows]).body
+
+
+PATHS = {"pydantic": (fetch_entities, encode_entities), "orjson": (fetch_tuples, encode_tuples)}
+
+
+async def run_once(name: str) -> tuple[float, float, bytes]:
+    fetch, encode = PATHS[name]
+    started = time.process_time()
+    rows = await fetch()
+    fetched = time.process_time()
+    body = encode(rows)
+    return fetched - started, time.process_time() - fetched, body
+
+
+async def measure(name: str, repeats: int) -> tuple[dict, bytes]:
+    query_cpu, encode_cpu = [], []
+    for _ in range(repeats):
+        query, encode, body = await run_once(name)
+        query_cpu.append(query)
+        encode_cpu.append(encode)
+    tracemalloc.start()
+    await run_once(name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report = {
+        "query_cpu_ms": round(statistics.median(query_cpu) * 1000, 1),
+        "encode_cpu_ms": round(statistics.median(encode_cpu) * 1000, 1),
+        "total_cpu_ms": round(statistics.median(q + e for q, e in zip(query_cpu, encode_cpu)) * 1000, 1),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+    return report, body
+
+
+async def main(args: argparse.Namespace) -> dict:
+    async with app.router.lifespan_context(app):
+        seed(args.rows)
+        reports, bodies = {}, {}
+        for name in PATHS:
+            reports[name], bodies[name] = await measure(name, args.repeats)
+    return {
+        "dialect": engine.dialect.name,
+        "rows": args.rows,
+        "body_bytes": len(bodies["orjson"]),
+        "identical": bodies["orjson"] == bodies["pydantic"],
+        "paths": reports,
+        "cpu_speedup": round(reports["pydantic"]["total_cpu_ms"] / reports["orjson"]["total_cpu_ms"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    result = asyncio.run(main(parser.parse_args()))
+    asyncio.run(async_engine.dispose())
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["identical"] else 1)
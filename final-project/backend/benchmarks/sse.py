@@ -0,0 +1,80 @@
+"""Fan-out benchmark for the GET /events change feed.
+
+Opens many idle SSE connections to a running server, then updates one sample
+and measures how long every subscriber takes to receive the change event:
+
+    uvicorn backend.main:app --port 8000 --workers 1
+    python -m backend.benchmarks.sse --base-url http://localhost:8000 --connections 2000
+
+Each connection needs one file descriptor on both sides; raise `ulimit -n`
+before going past about 1000.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from backend.benchmarks.concurrency import percentile
+
+
+async def subscriber(client: httpx.AsyncClient, connected: asyncio.Event, ready: list, received: list, marker: str):
+    async with client.stream("GET", "/events") as res:
+        async for line in res.aiter_lines():
+            if line.startswith("retry:"):
+                ready.append(1)
+                connected.set()
+            elif line.startswith("data:") and marker in line:
+                received.append(time.perf_counter())
+                return
+
+
+async def main(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.connections + 10, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=None) as client:
+        sample_id = f"SSE-{int(time.time())}"
+        await client.post("/samples", json={"sample_id": sample_id, "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-01-01"})
+        ready: list = []
+        received: list[float] = []
+        connected = asyncio.Event()
+        opened = time.perf_counter()
+        tasks = [asyncio.create_task(subscriber(client, connected, ready, received, sample_id)) for _ in range(args.connections)]
+        while len(ready) < args.connections:
+            await asyncio.sleep(0.05)
+            if time.perf_counter() - opened > args.timeout:
+                break
+        connect_seconds = time.perf_counter() - opened
+        metrics = (await client.get("/metrics")).text
+        subscribers = next((line.split()[1] for line in metrics.splitlines() if line.startswith("labsync_events_subscribers ")), None)
+
+        await asyncio.sleep(args.idle)
+        started = time.perf_counter()
+        await client.patch(f"/samples/{sample_id}", json={"status": "progress"}, headers={"If-Match": "*"})
+        deadline = started + args.timeout
+        while len(received) < len(ready) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    delays = [t - started for t in received]
+    return {
+        "connections": len(ready),
+        "server_subscribers": int(subscribers) if subscribers else None,
+        "connect_s": round(connect_seconds, 2),
+        "delivered": len(received),
+        "fanout_p50_ms": round(percentile(delays, 50) * 1000, 2),
+        "fanout_p99_ms": round(percentile(delays, 99) * 1000, 2),
+        "fanout_max_ms": round(max(delays, default=0) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=1.0, help="seconds to hold the connections idle before the write")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    print(json.dumps(asyncio.run(main(parser.parse_args()))))
@@ -0,0 +1,130 @@
+import os
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def pool_options() -> dict:
+    """Pool settings for create_engine, overridable through DB_POOL_* variables."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connect_seconds_total = 0.0
+        # Checkouts timed by InstrumentedAsyncPool.connect, failed ones included.
+        self.timed_checkouts = 0
+
+    def record_wait(self, seconds: float):
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+pool_stats = PoolStats()
+
+# Connection info keys: when the DBAPI connect began, and how long a fresh
+# connection took to open until its checkout takes it out of the wait time.
+CONNECT_STARTED_KEY = "labsync_connect_started"
+CONNECT_SECONDS_KEY = "labsync_connect_seconds"
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited.
+
+    Pool events fire only once a connection has been handed out, so the wait
+    is timed around the public Pool.connect(), which every engine checkout
+    goes through. Opening a new connection, timed by the do_connect and
+    connect events in instrument(), is counted in connect_seconds_total and
+    subtracted from the wait; the pre-ping of a reused connection is not.
+    Stats live on the module-level pool_stats because the pool recreates
+    itself after a disconnect.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        connect_seconds = 0.0
+        try:
+            connection = super().connect()
+            connect_seconds = connection.info.pop(CONNECT_SECONDS_KEY, 0.0)
+            return connection
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.timed_checkouts += 1
+            pool_stats.record_wait(time.perf_counter() - started - connect_seconds)
+
+
+def instrument(engine):
+    """Count pool lifecycle events on engine's pool and time new connections."""
+
+    @event.listens_for(engine, "do_connect")
+    def on_do_connect(dialect, connection_record, cargs, cparams):
+        connection_record.info[CONNECT_STARTED_KEY] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_stats.connects += 1
+        started = connection_record.info.pop(CONNECT_STARTED_KEY, None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            pool_stats.connect_seconds_total += seconds
+            connection_record.info[CONNECT_SECONDS_KEY] = seconds
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats.checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_stats.checkins += 1
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_stats.invalidations += 1
+
+
+def pool_snapshot(pool) -> dict:
+    snapshot = {
+        "pool_class": type(pool).__name__,
+        "checkouts": pool_stats.checkouts,
+        "checkins": pool_stats.checkins,
+        "connects": pool_stats.connects,
+        "invalidations": pool_stats.invalidations,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+        "wait_seconds_avg": round(pool_stats.wait_seconds_total / pool_stats.timed_checkouts, 6) if pool_stats.timed_checkouts else 0.0,
+        "connect_seconds_total": round(pool_stats.connect_seconds_total, 6),
+    }
+    if hasattr(pool, "checkedout"):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool_options()["max_overflow"],
+            timeout=pool.timeout(),
+        )
+    return snapshot
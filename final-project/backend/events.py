@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+PENDING_KEY = "events_pending"
+
+
+def change_event(entity: str, entity_id, action: str, **fields) -> dict:
+    """Compact change notification; fields that are None are left out."""
+    payload = {"entity": entity, "id": entity_id, "action": action}
+    payload.update((key, value) for key, value in fields.items() if value is not None)
+    return payload
+
+
+class Broadcaster:
+    """In-process fan-out of change events to /events subscribers.
+
+    Each subscriber gets a bounded queue. publish() never blocks: a
+    subscriber whose queue is full is dropped, and its stream ends so the
+    browser reconnects and re-fetches instead of holding up the writer. The
+    last slot of every queue is reserved for that end-of-stream marker.
+    Events are staged on the session and only published after it commits,
+    so rolled-back changes are never announced.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        if queue_size < 2:
+            raise ValueError("queue_size must be at least 2")
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, payload: dict):
+        self._last_id += 1
+        self.published += 1
+        message = (self._last_id, json.dumps(payload, separators=(",", ":")))
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.queue_size - 1:
+                self._subscribers.discard(queue)
+                queue.put_nowait(None)
+                self.dropped += 1
+            else:
+                queue.put_nowait(message)
+
+    def stage(self, db: AsyncSession, events: list[dict]):
+        """Attach events to the caller's pending transaction; they go out after commit."""
+        if not db.in_transaction():
+            db.sync_session.begin()
+        db.sync_session.info.setdefault(PENDING_KEY, []).extend(events)
+
+    def after_commit(self, session: Session):
+        for payload in session.info.pop(PENDING_KEY, None) or ():
+            self.publish(payload)
+
+    def after_soft_rollback(self, session: Session):
+        session.info.pop(PENDING_KEY, None)
+
+    async def stream(self, queue: asyncio.Queue, heartbeat: float = 15.0):
+        """Server-sent event frames for one subscriber, with comment heartbeats while idle."""
+        try:
+            yield f"retry: {int(heartbeat * 1000)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                event_id, data = message
+                yield f"id: {event_id}\nevent: change\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+broadcaster = Broadcaster(queue_size=int(os.getenv("EVENTS_QUEUE_SIZE", "256")))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+event.listen(Session, "after_commit", lambda s: broadcaster.after_commit(s))
+event.listen(Session, "after_soft_rollback", lambda s, _: broadcaster.after_soft_rollback(s))
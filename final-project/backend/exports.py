@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+try:
+    from .database import AsyncSessionLocal
+except ImportError:  # pragma: no cover
+    from database import AsyncSessionLocal  # type: ignore
+
+
+BATCH_SIZE = 1000
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def stream_batches(stmt: Select, to_row: Callable, scalars: bool = False) -> AsyncIterator[list[dict]]:
+    """Yield rows in batches from a server-side cursor.
+
+    The session is opened here rather than taken from get_db, because the
+    request-scoped session is closed before a StreamingResponse body runs.
+    """
+    async with AsyncSessionLocal() as db:
+        stmt = stmt.execution_options(yield_per=BATCH_SIZE)
+        result = await (db.stream_scalars(stmt) if scalars else db.stream(stmt))
+        async for partition in result.partitions():
+            yield [to_row(r) for r in partition]
+            db.expunge_all()
+
+
+async def encode_batches(batches: AsyncIterator[list[dict]], fmt: str, columns: list[str]) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for batch in batches:
+            for row in batch:
+                writer.writerow([";".join(v) if isinstance(v, list) else v for v in (row[c] for c in columns)])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    else:
+        async for batch in batches:
+            yield "".join(json.dumps(row) + "\n" for row in batch).encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(name: str, batches: AsyncIterator[list[dict]], fmt: str, columns: list[str], gzip: bool) -> StreamingResponse:
+    body = encode_batches(batches, fmt, columns)
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,24 @@
+import os
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional; lists then take the pydantic path
+    orjson = None
+
+
+# On by default when orjson is installed; FAST_JSON_LISTS=0 turns it off.
+FAST_JSON_LISTS = orjson is not None and os.getenv("FAST_JSON_LISTS", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class ORJSONRowsResponse(JSONResponse):
+    """JSONResponse rendered by orjson.
+
+    For str, int, None, date and Enum values the bytes are identical to
+    JSONResponse's (compact separators, UTF-8, non-ASCII unescaped), so a
+    route can switch between the two without changing its contract.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
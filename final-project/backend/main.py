@@ -1,29 +1,83 @@
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+import json
+import logging
 import os
-from datetime import datetime, timezone
+import time
+from datetime import date, datetime, timezone
 import re
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select, distinct, delete
-from sqlalchemy.orm import Session
+from sqlalchemy import select, distinct, delete, insert, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 # Support running as a module or script
 try:
-    from .database import Base, engine, get_db
-    from .models import ActionBatchModel, ActionBatchStatus, AuditLogModel, ConflictModel, ConflictStatus, FilterMethodModel, SampleModel, SampleStatus, PlannedAnalysisModel, PlannedAnalysisAssigneeModel, AnalysisStatus, UserModel
-    from .schemas import ActionBatchCreate, ActionBatchOut, ConflictCreate, ConflictOut, ConflictUpdate, FilterMethodsOut, FilterMethodsUpdate, PlannedAnalysisCreate, PlannedAnalysisOut, PlannedAnalysisUpdate, UserOut, UserUpdate
-    from .seed import seed_users
+    from .database import AsyncSessionLocal, async_engine, get_db
+    from .db_pool import pool_snapshot
+    from .models import ActionBatchModel, ActionBatchStatus, AuditLogModel, ConflictModel, ConflictStatus, FilterMethodModel, SampleModel, SampleStatus, PlannedAnalysisModel, PlannedAnalysisAssigneeModel, AnalysisStatus, UserModel, UserRoleModel
+    from .schemas import ActionBatchCreate, ActionBatchOut, AuditLogOut, BulkItemResult, BulkUpdateOut, ConflictCreate, ConflictOut, ConflictUpdate, FilterMethodsOut, FilterMethodsUpdate, PlannedAnalysisBatchCreate, PlannedAnalysisBatchOut, PlannedAnalysisBulkUpdate, PlannedAnalysisCreate, PlannedAnalysisOut, PlannedAnalysisUpdate, SampleBulkUpdate, UserOut, UserUpdate, WorkQueueOut
+    from .startup import DB_SCHEMA_MODE, SEED_ON_STARTUP, prepare_schema, seed_default_users
+    from .sample_import import detect_format, import_samples_stream
+    from .exports import export_response, stream_batches
+    from .audit import audit_entry, audit_writer
+    from .versions import collection_etag, entity_etag, if_match, not_modified, touch
+    from .cache import FILTER_METHODS_KEY, reference_cache
+    from .metrics import MetricsMiddleware, instrument_engine, registry, snapshot_collector
+    from .sql_guard import SLOW_QUERY_MS, budget_enforcer, log_slow_queries, sql_budget
+    from .events import EVENTS_HEARTBEAT_SECONDS, broadcaster, change_event
+    from .stats import STATS_RECONCILE_SECONDS, count_analysis, count_sample, read_stats, reconcile, reconcile_periodically
+    from .search import SEARCH_PAGE_MAX, search_samples
+    from .fast_json import FAST_JSON_LISTS, ORJSONRowsResponse
+    from .permissions import Permission, current_permissions, normalize_roles, request_actor, request_claims, require
+    from .tokens import check_token_secret, issue_token, revocations, revoke_tokens
 except ImportError:  # pragma: no cover - fallback for script execution
-  from database import Base, engine, get_db  # type: ignore
-  from models import ActionBatchModel, ActionBatchStatus, AuditLogModel, ConflictModel, ConflictStatus, FilterMethodModel, SampleModel, SampleStatus, PlannedAnalysisModel, PlannedAnalysisAssigneeModel, AnalysisStatus, UserModel  # type: ignore
-  from schemas import ActionBatchCreate, ActionBatchOut, ConflictCreate, ConflictOut, ConflictUpdate, FilterMethodsOut, FilterMethodsUpdate, PlannedAnalysisCreate, PlannedAnalysisOut, PlannedAnalysisUpdate, UserOut, UserUpdate  # type: ignore
-  from seed import seed_users  # type: ignore
-
-app = FastAPI(title="LabSync backend", version="0.1.0")
-
-Base.metadata.create_all(bind=engine)
-seed_users()
+  from database import AsyncSessionLocal, async_engine, get_db  # type: ignore
+  from db_pool import pool_snapshot  # type: ignore
+  from models import ActionBatchModel, ActionBatchStatus, AuditLogModel, ConflictModel, ConflictStatus, FilterMethodModel, SampleModel, SampleStatus, PlannedAnalysisModel, PlannedAnalysisAssigneeModel, AnalysisStatus, UserModel, UserRoleModel  # type: ignore
+  from schemas import ActionBatchCreate, ActionBatchOut, AuditLogOut, BulkItemResult, BulkUpdateOut, ConflictCreate, ConflictOut, ConflictUpdate, FilterMethodsOut, FilterMethodsUpdate, PlannedAnalysisBatchCreate, PlannedAnalysisBatchOut, PlannedAnalysisBulkUpdate, PlannedAnalysisCreate, PlannedAnalysisOut, PlannedAnalysisUpdate, SampleBulkUpdate, UserOut, UserUpdate, WorkQueueOut  # type: ignore
+  from startup import DB_SCHEMA_MODE, SEED_ON_STARTUP, prepare_schema, seed_default_users  # type: ignore
+  from sample_import import detect_format, import_samples_stream  # type: ignore
+  from exports import export_response, stream_batches  # type: ignore
+  from audit import audit_entry, audit_writer  # type: ignore
+  from versions import collection_etag, entity_etag, if_match, not_modified, touch  # type: ignore
+  from cache import FILTER_METHODS_KEY, reference_cache  # type: ignore
+  from metrics import MetricsMiddleware, instrument_engine, registry, snapshot_collector  # type: ignore
+  from sql_guard import SLOW_QUERY_MS, budget_enforcer, log_slow_queries, sql_budget  # type: ignore
+  from events import EVENTS_HEARTBEAT_SECONDS, broadcaster, change_event  # type: ignore
+  from stats import STATS_RECONCILE_SECONDS, count_analysis, count_sample, read_stats, reconcile, reconcile_periodically  # type: ignore
+  from search import SEARCH_PAGE_MAX, search_samples  # type: ignore
+  from fast_json import FAST_JSON_LISTS, ORJSONRowsResponse  # type: ignore
+  from permissions import Permission, current_permissions, normalize_roles, request_actor, request_claims, require  # type: ignore
+  from tokens import check_token_secret, issue_token, revocations, revoke_tokens  # type: ignore
+
+logger = logging.getLogger("labsync.startup")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Importing this module must not touch the database; workers do it here instead.
+  started = time.perf_counter()
+  check_token_secret(DB_SCHEMA_MODE)
+  await prepare_schema(async_engine, DB_SCHEMA_MODE)
+  if SEED_ON_STARTUP:
+    await seed_default_users(async_engine)
+  logger.info("Startup checks took %.1f ms", (time.perf_counter() - started) * 1000)
+  reconciler = None
+  if STATS_RECONCILE_SECONDS > 0:
+    reconciler = asyncio.create_task(reconcile_periodically(AsyncSessionLocal, STATS_RECONCILE_SECONDS))
+  yield
+  if reconciler is not None:
+    reconciler.cancel()
+  await audit_writer.close()
+
+
+app = FastAPI(title="LabSync backend", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,7 +85,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
+instrument_engine(async_engine.sync_engine)
+registry.add_collector(snapshot_collector("labsync_db_pool", lambda: pool_snapshot(async_engine.pool)))
+registry.add_collector(snapshot_collector("labsync_cache", reference_cache.stats))
+registry.add_collector(snapshot_collector("labsync_token_revocations", revocations.stats))
+registry.add_collector(snapshot_collector("labsync_events", broadcaster.stats))
+registry.add_collector(snapshot_collector("labsync_sql_budget", budget_enforcer.stats))
+registry.add_request_hook(budget_enforcer)
+if SLOW_QUERY_MS:
+  log_slow_queries(async_engine.sync_engine, float(SLOW_QUERY_MS))
 
 
 @app.get("/health")
@@ -39,6 +104,21 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/events")
+async def change_events():
+  # Pushes change events instead of every tab re-polling the lists; no DB session is held.
+  return StreamingResponse(
+    broadcaster.stream(broadcaster.subscribe(), EVENTS_HEARTBEAT_SECONDS),
+    media_type="text/event-stream",
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+  )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+  return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 class LoginRequest(BaseModel):
   username: str
   password: str
@@ -53,86 +133,186 @@ class LoginResponse(BaseModel):
 
 
 @app.post("/auth/login", response_model=LoginResponse)
-async def login(payload: LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
   username = payload.username.strip() or "user"
-  user = db.execute(select(UserModel).where(UserModel.username == username)).scalars().first()
+  user = (await db.execute(select(UserModel).where(UserModel.username == username))).scalars().first()
   if not user:
     full_name = payload.full_name or username.replace(".", " ").title()
-    user = UserModel(username=username, full_name=full_name, role="warehouse_worker", roles="warehouse_worker")
+    user = UserModel(username=username, full_name=full_name, role="warehouse_worker", roles=[UserRoleModel(role="warehouse_worker")])
     db.add(user)
-    db.commit()
-    db.refresh(user)
-  token = f"fake-{user.id}"
-  roles = parse_roles(user.roles)
-  return LoginResponse(token=token, role=roles[0] if roles else user.role, roles=roles, full_name=user.full_name)
+    await db.commit()
+  roles = user.role_names or [user.role]
+  token = issue_token(user.id, user.full_name, roles)
+  return LoginResponse(token=token, role=roles[0], roles=roles, full_name=user.full_name)
+
+
+@app.post("/auth/refresh", response_model=LoginResponse)
+@sql_budget(1)
+async def refresh_token(request: Request, db: AsyncSession = Depends(get_db)):
+  # Tokens are short-lived; a still-valid one is exchanged for a fresh token
+  # carrying the user's current roles, so role changes reach every worker.
+  claims = request_claims(request)
+  if claims is None:
+    raise HTTPException(status_code=401, detail="Unauthorized")
+  user = (await db.execute(select(UserModel).where(UserModel.id == claims["sub"]).options(joinedload(UserModel.roles)))).unique().scalars().first()
+  if not user:
+    raise HTTPException(status_code=401, detail="Unknown user")
+  roles = user.role_names or [user.role]
+  return LoginResponse(token=issue_token(user.id, user.full_name, roles), role=roles[0], roles=roles, full_name=user.full_name)
 
 
 @app.get("/auth/me", response_model=LoginResponse)
-async def me(authorization: str | None = None, db: Session = Depends(get_db)):
-  if not authorization or not authorization.lower().startswith("bearer "):
+@sql_budget(0)
+async def me(request: Request, authorization: str | None = None):
+  # Everything comes from the signed token; no database access.
+  claims = request_claims(request, authorization)
+  if claims is None:
     raise HTTPException(status_code=401, detail="Unauthorized")
-  token = authorization.split(" ", 1)[1]
-  user_id = None
-  if token.startswith("fake-"):
-    _, maybe_id = token.split("-", 1)
-    user_id = maybe_id
-  else:
-    user_id = token
-  try:
-    user_id_int = int(user_id)
-  except Exception:
-    raise HTTPException(status_code=401, detail="Invalid token")
-  user = db.get(UserModel, user_id_int)
-  if not user:
-    raise HTTPException(status_code=401, detail="Invalid token")
-  roles = parse_roles(user.roles)
-  return LoginResponse(token=token, role=roles[0] if roles else user.role, roles=roles, full_name=user.full_name)
+  token = (authorization or request.headers["authorization"]).split(" ", 1)[1]
+  return LoginResponse(token=token, role=claims["roles"][0], roles=claims["roles"], full_name=claims["name"])
 
 
 class Sample(BaseModel):
   sample_id: str
   well_id: str
   horizon: str
-  sampling_date: str
+  sampling_date: date
   status: str = "new"
   storage_location: str | None = None
   assigned_to: str | None = None
+  version: int | None = None
+
+
+# Sample's fields as columns, in the same order, for the plain-tuple list path.
+SAMPLE_OUT_FIELDS = list(Sample.model_fields)
+SAMPLE_OUT_COLUMNS = [getattr(SampleModel, name) for name in SAMPLE_OUT_FIELDS]
 
 
 class SamplePurgeRequest(BaseModel):
   sample_ids: list[str]
 
 
-@app.get("/samples")
-async def list_samples(status: str | None = None, db: Session = Depends(get_db)):
-  stmt = select(SampleModel)
+SAMPLE_PAGE_MAX = 1000
+
+
+def sample_filters(
+  status: str | None = None,
+  well_id: str | None = None,
+  horizon: str | None = None,
+  assigned_to: str | None = None,
+  storage_location: str | None = None,
+  sampling_date_from: date | None = None,
+  sampling_date_to: date | None = None,
+  date_from: date | None = Query(default=None, alias="from"),
+  date_to: date | None = Query(default=None, alias="to"),
+) -> list:
+  conditions = []
   if status:
-    stmt = stmt.where(SampleModel.status == SampleStatus(status))
-  rows = db.execute(stmt).scalars().all()
+    conditions.append(SampleModel.status == SampleStatus(status))
+  if well_id:
+    conditions.append(SampleModel.well_id == well_id)
+  if horizon:
+    conditions.append(SampleModel.horizon == horizon)
+  if assigned_to:
+    conditions.append(SampleModel.assigned_to == assigned_to)
+  if storage_location:
+    conditions.append(SampleModel.storage_location == storage_location)
+  conditions.extend(date_range(SampleModel.sampling_date, sampling_date_from or date_from, sampling_date_to or date_to))
+  return conditions
+
+
+def date_range(column, start, end) -> list:
+  # Both bounds inclusive. Plain comparisons on the typed column, so the
+  # (column, id) indexes serve them as range scans.
+  conditions = []
+  if start is not None:
+    conditions.append(column >= start)
+  if end is not None:
+    conditions.append(column <= end)
+  return conditions
+
+
+@app.get("/samples")
+@sql_budget(2)
+async def list_samples(
+  request: Request,
+  response: Response,
+  filters: list = Depends(sample_filters),
+  cursor: str | None = None,
+  limit: int | None = Query(default=None, ge=1, le=SAMPLE_PAGE_MAX),
+  db: AsyncSession = Depends(get_db),
+):
+  cached = not_modified(request, response, await collection_etag(db, "samples", request))
+  if cached is not None:
+    return cached
+  # Keyset pagination over sample_id: the cursor is the last sample_id of the
+  # previous page, and X-Next-Cursor is only set while more rows remain.
+  fast = FAST_JSON_LISTS
+  stmt = select(*SAMPLE_OUT_COLUMNS) if fast else select(SampleModel)
+  stmt = stmt.where(*filters).order_by(SampleModel.sample_id)
+  if cursor:
+    stmt = stmt.where(SampleModel.sample_id > cursor)
+  if limit:
+    stmt = stmt.limit(limit + 1)
+  result = await db.execute(stmt)
+  rows = result.all() if fast else result.scalars().all()
+  if limit and len(rows) > limit:
+    rows = rows[:limit]
+    response.headers["X-Next-Cursor"] = rows[-1].sample_id
+  if fast:
+    # Column tuples straight to JSON bytes: no ORM objects, no Sample models,
+    # no jsonable_encoder pass. A returned Response skips the injected one's
+    # headers, so they are passed on explicitly.
+    return ORJSONRowsResponse([dict(zip(SAMPLE_OUT_FIELDS, r)) for r in rows], headers=response.headers)
+  return [to_sample_out(r) for r in rows]
+
+
+@app.get("/samples/search")
+@sql_budget(1)
+async def search_samples_route(
+  response: Response,
+  q: str = Query(min_length=1, max_length=128),
+  cursor: str | None = Query(default=None, pattern="^[0-9]+$"),
+  limit: int = Query(default=20, ge=1, le=SEARCH_PAGE_MAX),
+  db: AsyncSession = Depends(get_db),
+):
+  # Results are ranked, so the cursor is an offset into the ranking rather than
+  # a sample_id; X-Next-Cursor is only set while more matches remain.
+  offset = int(cursor or 0)
+  rows = await search_samples(db, q, limit + 1, offset)
+  if len(rows) > limit:
+    rows = rows[:limit]
+    response.headers["X-Next-Cursor"] = str(offset + limit)
   return [to_sample_out(r) for r in rows]
 
 
 @app.get("/samples/{sample_id}")
-async def get_sample(sample_id: str, db: Session = Depends(get_db)):
-  row = db.get(SampleModel, sample_id)
+@sql_budget(1)
+async def get_sample(sample_id: str, response: Response, db: AsyncSession = Depends(get_db)):
+  row = await db.get(SampleModel, sample_id)
   if not row:
     raise HTTPException(status_code=404, detail="Sample not found")
+  response.headers["ETag"] = entity_etag(row.version)
   return to_sample_out(row)
 
 
 @app.delete("/samples/{sample_id}")
-async def delete_sample(sample_id: str, db: Session = Depends(get_db)):
-  row = db.get(SampleModel, sample_id)
+async def delete_sample(sample_id: str, db: AsyncSession = Depends(get_db)):
+  row = await db.get(SampleModel, sample_id)
   if not row:
     raise HTTPException(status_code=404, detail="Sample not found")
-  db.delete(row)
-  db.commit()
+  await db.delete(row)
+  count_sample(db, row.well_id, row.horizon, row.status, -1)
+  await delete_analyses(db, PlannedAnalysisModel.sample_id == sample_id)
+  broadcaster.stage(db, [change_event("sample", sample_id, "deleted")])
+  touch(db, "samples", "planned_analyses")
+  await db.commit()
   return {"deleted": True}
 
 
 @app.post("/samples", status_code=201)
-async def create_sample(sample: Sample, db: Session = Depends(get_db)):
-  existing = db.get(SampleModel, sample.sample_id)
+async def create_sample(sample: Sample, db: AsyncSession = Depends(get_db)):
+  existing = await db.get(SampleModel, sample.sample_id)
   if existing:
     raise HTTPException(status_code=400, detail="Sample exists")
   row = SampleModel(
@@ -145,55 +325,200 @@ async def create_sample(sample: Sample, db: Session = Depends(get_db)):
     assigned_to=sample.assigned_to,
   )
   db.add(row)
-  db.commit()
-  db.refresh(row)
+  count_sample(db, row.well_id, row.horizon, row.status)
+  broadcaster.stage(db, [sample_event(row, "created")])
+  touch(db, "samples")
+  await db.commit()
+  await db.refresh(row)
   return to_sample_out(row)
 
 
+@app.post("/samples/import")
+async def import_samples(request: Request, format: str | None = None, db: AsyncSession = Depends(get_db)):
+  fmt = detect_format(request.headers.get("content-type"), format)
+  if not fmt:
+    raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+  return await import_samples_stream(db, request.stream(), fmt)
+
+
+SAMPLE_UPDATE_COLUMNS = set(SampleModel.__table__.columns.keys()) - {"version"}
+
+
 @app.patch("/samples/{sample_id}")
-async def update_sample(sample_id: str, payload: dict, request: Request, db: Session = Depends(get_db)):
-  row = db.get(SampleModel, sample_id)
+@sql_budget(5)
+async def update_sample(sample_id: str, payload: dict, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+  row = await db.get(SampleModel, sample_id)
   if not row:
     raise HTTPException(status_code=404, detail="Sample not found")
-  old_status = row.status.value
+  values = {}
   for key, value in payload.items():
     if key == "status":
-      setattr(row, key, SampleStatus(value))
-    elif key == "assigned_to":
-      setattr(row, key, value)
-    elif hasattr(row, key):
-      setattr(row, key, value)
-  db.add(row)
-  db.commit()
-  db.refresh(row)
+      values[key] = SampleStatus(value)
+    elif key == "sampling_date":
+      try:
+        values[key] = date.fromisoformat(value)
+      except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="sampling_date must be an ISO date (YYYY-MM-DD)")
+    elif key in SAMPLE_UPDATE_COLUMNS:
+      values[key] = value
+  old = (row.well_id, row.horizon, row.status)
+  expected = if_match(request)
+  updated = None
+  if expected is None or entity_etag(row.version) in expected:
+    updated = await compare_and_swap(db, SampleModel, SampleModel.sample_id == sample_id, row.version, values)
+  if updated is None:
+    current = await db.get(SampleModel, sample_id, populate_existing=True)
+    if not current:
+      raise HTTPException(status_code=404, detail="Sample not found")
+    await version_conflict(db, request, "sample", sample_id, to_sample_out(current).model_dump(mode="json"), payload, expected)
+  count_sample(db, *old, -1)
+  count_sample(db, updated.well_id, updated.horizon, updated.status)
   if "status" in payload:
-    actor = request.headers.get("x-user")
-    log_audit(db, entity_type="sample", entity_id=sample_id, action="status_change", performed_by=actor, details=f"{old_status}->{payload['status']}")
-  return to_sample_out(row)
+    actor = request_actor(request)
+    log_audit(db, entity_type="sample", entity_id=sample_id, action="status_change", performed_by=actor, details=f"{old[2].value}->{payload['status']}")
+  broadcaster.stage(db, [sample_event(updated, "updated")])
+  touch(db, "samples")
+  await db.commit()
+  response.headers["ETag"] = entity_etag(updated.version)
+  return to_sample_out(updated)
+
+
+async def compare_and_swap(db: AsyncSession, model, key, version: int, values: dict):
+  """UPDATE ... WHERE <key> AND version = :version; the updated row, or None if it had moved on.
+
+  No lock is taken: of two concurrent writers from the same version, one
+  matches and the other updates nothing.
+  """
+  stmt = update(model).where(key, model.version == version).values(**values, version=model.version + 1).returning(model)
+  return (await db.execute(stmt, execution_options={"synchronize_session": False, "populate_existing": True})).scalars().first()
+
+
+async def version_conflict(db: AsyncSession, request: Request, entity_type: str, entity_id, current: dict, changes: dict, expected: set[str] | None):
+  """Record a lost update in the conflicts queue, then reject the write.
+
+  412 when If-Match names an older version; 409 when, with If-Match: *, the
+  row changed between this request's read and its write.
+  """
+  attempted = {"entity_type": entity_type, "entity_id": entity_id, "if_match": sorted(expected) if expected else None, "changes": changes, "performed_by": request_actor(request)}
+  conflict = ConflictModel(old_payload=json.dumps(current, default=str), new_payload=json.dumps(attempted, default=str), status=ConflictStatus.open)
+  db.add(conflict)
+  touch(db, "conflicts")
+  await db.flush()
+  broadcaster.stage(db, [change_event("conflict", conflict.id, "created", status=conflict.status.value)])
+  await db.commit()
+  raise HTTPException(
+    status_code=412 if expected is not None else 409,
+    detail={"message": f"{entity_type} {entity_id} was changed by someone else", "conflict_id": conflict.id, "current": current},
+    headers={"ETag": entity_etag(current["version"])},
+  )
+
+
+def group_changes(changes: dict) -> dict[tuple, list]:
+  """Group ids by identical change sets so each group becomes one set-based UPDATE."""
+  groups: dict[tuple, list] = {}
+  for entity_id, values in changes.items():
+    groups.setdefault(tuple(sorted(values.items())), []).append(entity_id)
+  return groups
+
+
+def bulk_results(ids: list, errors: dict) -> BulkUpdateOut:
+  results = [BulkItemResult(id=i, ok=i not in errors, error=errors.get(i)) for i in ids]
+  return BulkUpdateOut(updated=sum(r.ok for r in results), results=results)
+
+
+@app.post("/samples/bulk-update", response_model=BulkUpdateOut)
+async def bulk_update_samples(payload: SampleBulkUpdate, request: Request, db: AsyncSession = Depends(get_db)):
+  ids = [c.id for c in payload.changes]
+  current = {
+    r.sample_id: r
+    for r in (await db.execute(
+      select(SampleModel.sample_id, SampleModel.well_id, SampleModel.horizon, SampleModel.status, SampleModel.assigned_to).where(SampleModel.sample_id.in_(ids))
+    )).all()
+  }
+  errors: dict = {}
+  changes: dict[str, dict] = {}
+  for change in payload.changes:
+    values = change.model_dump(include=change.model_fields_set - {"id"})
+    if values.get("status", "") is None:
+      del values["status"]
+    if change.id in changes or change.id in errors:
+      errors[change.id] = "Duplicate id in request"
+    elif change.id not in current:
+      errors[change.id] = "Sample not found"
+    elif not values:
+      errors[change.id] = "No changes"
+    else:
+      changes[change.id] = values
+  for sid in [i for i in changes if i in errors]:
+    del changes[sid]
+
+  for values, group_ids in group_changes(changes).items():
+    values = dict(values)
+    if "status" in values:
+      values["status"] = SampleStatus(values["status"])
+    await db.execute(
+      update(SampleModel).where(SampleModel.sample_id.in_(group_ids)).values(**values, version=SampleModel.version + 1),
+      execution_options={"synchronize_session": False},
+    )
+  for sid, values in changes.items():
+    if "status" in values:
+      count_sample(db, current[sid].well_id, current[sid].horizon, current[sid].status, -1)
+      count_sample(db, current[sid].well_id, current[sid].horizon, values["status"])
+  actor = request_actor(request)
+  audit_writer.stage(db, [
+    audit_entry(entity_type="sample", entity_id=sid, action="status_change", performed_by=actor, details=f"{current[sid].status.value}->{values['status']}")
+    for sid, values in changes.items() if "status" in values
+  ])
+  broadcaster.stage(db, [
+    change_event("sample", sid, "updated", status=values.get("status", current[sid].status.value), assigned_to=values.get("assigned_to", current[sid].assigned_to))
+    for sid, values in changes.items()
+  ])
+  if changes:
+    touch(db, "samples")
+    await db.commit()
+  return bulk_results(ids, errors)
 
 
 @app.delete("/admin/samples")
-async def delete_samples(payload: SamplePurgeRequest, request: Request, db: Session = Depends(get_db)):
-  roles_header = (request.headers.get("x-roles") or "").lower()
-  role_header = (request.headers.get("x-role") or "").lower()
-  is_admin = "admin" in roles_header.split(",") or role_header == "admin"
-  if not is_admin:
-    raise HTTPException(status_code=403, detail="Admin only")
+@sql_budget(8)
+async def delete_samples(payload: SamplePurgeRequest, request: Request, db: AsyncSession = Depends(get_db), _=Depends(require(Permission.DELETE_SAMPLES))):
   sample_ids = [sid.strip() for sid in payload.sample_ids if sid.strip()]
   if not sample_ids:
     raise HTTPException(status_code=400, detail="Sample IDs required")
-  deleted = (
-    db.query(SampleModel)
-    .filter(SampleModel.sample_id.in_(sample_ids))
-    .delete(synchronize_session=False)
-  )
-  db.commit()
-  actor = request.headers.get("x-user")
-  for sid in sample_ids:
-    log_audit(db, entity_type="sample", entity_id=sid, action="delete", performed_by=actor)
+  removed = (await db.execute(
+    delete(SampleModel).where(SampleModel.sample_id.in_(sample_ids)).returning(SampleModel.well_id, SampleModel.horizon, SampleModel.status)
+  )).all()
+  deleted = len(removed)
+  for well_id, horizon, status in removed:
+    count_sample(db, well_id, horizon, status, -1)
+  await delete_analyses(db, PlannedAnalysisModel.sample_id.in_(sample_ids))
+  actor = request_actor(request)
+  audit_writer.stage(db, [audit_entry(entity_type="sample", entity_id=sid, action="delete", performed_by=actor) for sid in sample_ids])
+  broadcaster.stage(db, [change_event("sample", sid, "deleted") for sid in sample_ids])
+  touch(db, "samples", "planned_analyses")
+  await db.commit()
   return {"deleted": deleted}
 
 
+async def delete_analyses(db: AsyncSession, *conditions) -> int:
+  # Explicit rather than relying on ON DELETE CASCADE, which SQLite does not
+  # enforce: orphaned assignees would attach to a reused analysis id, and the
+  # analysis counts would drift from the rows.
+  matching = select(PlannedAnalysisModel.id).where(*conditions)
+  await db.execute(delete(PlannedAnalysisAssigneeModel).where(PlannedAnalysisAssigneeModel.analysis_id.in_(matching)))
+  removed = (await db.execute(
+    delete(PlannedAnalysisModel).where(*conditions).returning(PlannedAnalysisModel.analysis_type, PlannedAnalysisModel.status),
+    execution_options={"synchronize_session": False},
+  )).all()
+  for analysis_type, status in removed:
+    count_analysis(db, analysis_type, status, -1)
+  return len(removed)
+
+
+def sample_event(row: SampleModel, action: str) -> dict:
+  return change_event("sample", row.sample_id, action, status=row.status.value, assigned_to=row.assigned_to)
+
+
 def to_sample_out(row: SampleModel):
   return Sample(
     sample_id=row.sample_id,
@@ -203,6 +528,7 @@ def to_sample_out(row: SampleModel):
     status=row.status.value,
     storage_location=row.storage_location,
     assigned_to=row.assigned_to,
+    version=row.version,
   )
 
 def normalize_assignees(value: list[str] | str | None) -> list[str]:
@@ -231,162 +557,366 @@ def normalize_methods(value: list[str] | None) -> list[str]:
       cleaned.append(name)
   return cleaned
 
-def is_admin_from_headers(request: Request) -> bool:
-  roles_header = (request.headers.get("x-roles") or "").lower()
-  role_header = (request.headers.get("x-role") or "").lower()
-  return "admin" in roles_header.split(",") or role_header == "admin"
+DEFAULT_ANALYSIS_TYPES = {"SARA", "IR", "Mass Spectrometry", "Viscosity"}
 
-def get_assignees(db: Session, analysis_id: int, fallback: str | None = None) -> list[str]:
-  rows = db.execute(
-    select(PlannedAnalysisAssigneeModel.assignee).where(
-      PlannedAnalysisAssigneeModel.analysis_id == analysis_id
-    )
-  ).all()
-  assignees = [r[0] for r in rows if r and r[0]]
+def check_analysis_type(value: str, is_admin: bool) -> str:
+  name = value.strip()
+  if not name:
+    raise HTTPException(status_code=400, detail="Analysis type required")
+  if not is_admin and name not in DEFAULT_ANALYSIS_TYPES:
+    raise HTTPException(status_code=403, detail="Only these analysis types are allowed: SARA, IR, Mass Spectrometry, Viscosity")
+  return name
+
+def get_assignees(row: PlannedAnalysisModel) -> list[str]:
+  assignees = [a.assignee for a in row.assignees if a.assignee]
   if assignees:
     return assignees
-  if fallback and fallback.strip():
-    return normalize_assignees(fallback)
+  if row.assigned_to and row.assigned_to.strip():
+    return normalize_assignees(row.assigned_to)
   return []
 
 
-@app.get("/planned-analyses")
-async def list_planned_analyses(status: str | None = None, db: Session = Depends(get_db)):
-  stmt = select(PlannedAnalysisModel)
+def planned_analysis_filters(status: str | None = None) -> list:
+  conditions = []
   if status:
-    stmt = stmt.where(PlannedAnalysisModel.status == AnalysisStatus(status))
-  rows = db.execute(stmt).scalars().all()
-  return [to_planned_out(r, db) for r in rows]
+    conditions.append(PlannedAnalysisModel.status == AnalysisStatus(status))
+  return conditions
+
+
+@app.get("/planned-analyses")
+@sql_budget(2)
+async def list_planned_analyses(request: Request, response: Response, filters: list = Depends(planned_analysis_filters), db: AsyncSession = Depends(get_db)):
+  cached = not_modified(request, response, await collection_etag(db, "planned_analyses", request))
+  if cached is not None:
+    return cached
+  # Joined rather than selectin: selectin issues one IN query per 500 analyses.
+  stmt = select(PlannedAnalysisModel).where(*filters).options(joinedload(PlannedAnalysisModel.assignees))
+  rows = (await db.execute(stmt)).unique().scalars().all()
+  return [to_planned_out(r) for r in rows]
 
 
 @app.post("/planned-analyses", response_model=PlannedAnalysisOut, status_code=201)
-async def create_planned_analysis(payload: PlannedAnalysisCreate, request: Request, db: Session = Depends(get_db)):
-  default_allowed = {"SARA", "IR", "Mass Spectrometry", "Viscosity"}
-  is_admin = is_admin_from_headers(request)
-  name = payload.analysis_type.strip()
-  if not name:
-    raise HTTPException(status_code=400, detail="Analysis type required")
-  if not is_admin and name not in default_allowed:
-    raise HTTPException(status_code=403, detail="Only these analysis types are allowed: SARA, IR, Mass Spectrometry, Viscosity")
+async def create_planned_analysis(payload: PlannedAnalysisCreate, db: AsyncSession = Depends(get_db), granted: Permission = Depends(current_permissions)):
+  name = check_analysis_type(payload.analysis_type, Permission.CUSTOM_ANALYSIS_TYPES in granted)
+  assignees = normalize_assignees(payload.assigned_to)
   row = PlannedAnalysisModel(
     sample_id=payload.sample_id,
     analysis_type=name,
-    assigned_to=None,
+    assigned_to=assignees[0] if assignees else None,
     status=AnalysisStatus.planned,
+    assignees=[PlannedAnalysisAssigneeModel(assignee=a) for a in assignees],
   )
   db.add(row)
-  db.commit()
-  db.refresh(row)
+  count_analysis(db, row.analysis_type, row.status)
+  touch(db, "planned_analyses")
+  await db.flush()
+  broadcaster.stage(db, [planned_event(row, "created")])
+  await db.commit()
+  return to_planned_out(row)
+
+
+@app.post("/planned-analyses/batch", response_model=PlannedAnalysisBatchOut, status_code=201)
+async def create_planned_analyses_batch(payload: PlannedAnalysisBatchCreate, db: AsyncSession = Depends(get_db), granted: Permission = Depends(current_permissions)):
+  custom_types = Permission.CUSTOM_ANALYSIS_TYPES in granted
+  types = list(dict.fromkeys(check_analysis_type(t, custom_types) for t in payload.analysis_types))
+  sample_ids = list(dict.fromkeys(sid.strip() for sid in payload.sample_ids if sid.strip()))
+  if not sample_ids:
+    raise HTTPException(status_code=400, detail="Sample IDs required")
   assignees = normalize_assignees(payload.assigned_to)
-  for assignee in assignees:
-    db.add(PlannedAnalysisAssigneeModel(analysis_id=row.id, assignee=assignee))
+  known = set((await db.execute(select(SampleModel.sample_id).where(SampleModel.sample_id.in_(sample_ids)))).scalars())
+  # One range probe per sample on ix_planned_analyses_sample_id_analysis_type.
+  existing = set(
+    (await db.execute(
+      select(PlannedAnalysisModel.sample_id, PlannedAnalysisModel.analysis_type)
+      .where(PlannedAnalysisModel.sample_id.in_(sample_ids), PlannedAnalysisModel.analysis_type.in_(types))
+    )).tuples()
+  )
+  pairs, skipped = [], []
+  for sid in sample_ids:
+    for name in types:
+      if sid not in known:
+        skipped.append({"sample_id": sid, "analysis_type": name, "reason": "Sample not found"})
+      elif (sid, name) in existing:
+        skipped.append({"sample_id": sid, "analysis_type": name, "reason": "Already planned"})
+      else:
+        pairs.append((sid, name))
+  if not pairs:
+    return {"created": [], "skipped": skipped}
+
+  # RETURNING the natural key maps ids back to pairs without sort_by_parameter_order,
+  # which would force SQLite back to one INSERT per row.
+  result = await db.execute(
+    insert(PlannedAnalysisModel).returning(PlannedAnalysisModel.id, PlannedAnalysisModel.sample_id, PlannedAnalysisModel.analysis_type),
+    [
+      {"sample_id": sid, "analysis_type": name, "status": AnalysisStatus.planned, "assigned_to": assignees[0] if assignees else None}
+      for sid, name in pairs
+    ],
+  )
+  new_ids = {(sid, name): i for i, sid, name in result.tuples()}
+  ids = [new_ids[pair] for pair in pairs]
+  for _, name in pairs:
+    count_analysis(db, name, AnalysisStatus.planned)
   if assignees:
-    row.assigned_to = assignees[0]
-    db.add(row)
-  db.commit()
-  db.refresh(row)
-  return to_planned_out(row, db)
+    await db.execute(insert(PlannedAnalysisAssigneeModel), [{"analysis_id": i, "assignee": a} for i in ids for a in assignees])
+  created = [
+    {"id": i, "sample_id": sid, "analysis_type": name, "status": AnalysisStatus.planned.value, "assigned_to": assignees, "version": 1}
+    for i, (sid, name) in zip(ids, pairs)
+  ]
+  broadcaster.stage(db, [
+    change_event("planned_analysis", row["id"], "created", sample_id=row["sample_id"], status=row["status"], assigned_to=assignees)
+    for row in created
+  ])
+  touch(db, "planned_analyses")
+  await db.commit()
+  return {"created": created, "skipped": skipped}
 
 
 @app.patch("/planned-analyses/{analysis_id}", response_model=PlannedAnalysisOut)
-async def update_planned_analysis(analysis_id: int, payload: PlannedAnalysisUpdate, request: Request, db: Session = Depends(get_db)):
-  row = db.get(PlannedAnalysisModel, analysis_id)
+async def update_planned_analysis(analysis_id: int, payload: PlannedAnalysisUpdate, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+  row = await db.get(PlannedAnalysisModel, analysis_id)
   if not row:
     raise HTTPException(status_code=404, detail="Planned analysis not found")
-  old_status = row.status.value
+  old_status = row.status
+  values = {}
   if payload.status:
-    row.status = AnalysisStatus(payload.status)
+    values["status"] = AnalysisStatus(payload.status)
+  assignees = None
   if payload.assigned_to is not None:
     assignees = normalize_assignees(payload.assigned_to)
-    db.execute(
-      delete(PlannedAnalysisAssigneeModel).where(
-        PlannedAnalysisAssigneeModel.analysis_id == row.id
-      )
-    )
-    if assignees:
-      for assignee in assignees:
-        db.add(PlannedAnalysisAssigneeModel(analysis_id=row.id, assignee=assignee))
-      row.assigned_to = assignees[0]
-    else:
-      row.assigned_to = None
-  db.add(row)
-  db.commit()
-  db.refresh(row)
+    values["assigned_to"] = assignees[0] if assignees else None
+  expected = if_match(request)
+  updated = None
+  if expected is None or entity_etag(row.version) in expected:
+    updated = await compare_and_swap(db, PlannedAnalysisModel, PlannedAnalysisModel.id == analysis_id, row.version, values)
+  if updated is None:
+    current = await db.get(PlannedAnalysisModel, analysis_id, populate_existing=True)
+    if not current:
+      raise HTTPException(status_code=404, detail="Planned analysis not found")
+    await version_conflict(db, request, "planned_analysis", analysis_id, to_planned_out(current), payload.model_dump(exclude_unset=True), expected)
   if payload.status:
-    actor = request.headers.get("x-user")
-    log_audit(db, entity_type="planned_analysis", entity_id=str(analysis_id), action="status_change", performed_by=actor, details=f"{old_status}->{payload.status}")
-  return to_planned_out(row, db)
+    count_analysis(db, updated.analysis_type, old_status, -1)
+    count_analysis(db, updated.analysis_type, updated.status)
+  if assignees is not None:
+    # Flush the removals first so re-adding a kept name can't hit the unique constraint.
+    updated.assignees.clear()
+    await db.flush()
+    updated.assignees.extend(PlannedAnalysisAssigneeModel(assignee=a) for a in assignees)
+  if payload.status:
+    actor = request_actor(request)
+    log_audit(db, entity_type="planned_analysis", entity_id=str(analysis_id), action="status_change", performed_by=actor, details=f"{old_status.value}->{payload.status}")
+  broadcaster.stage(db, [planned_event(updated, "updated")])
+  touch(db, "planned_analyses")
+  await db.commit()
+  response.headers["ETag"] = entity_etag(updated.version)
+  return to_planned_out(updated)
+
+
+@app.post("/planned-analyses/bulk-update", response_model=BulkUpdateOut)
+async def bulk_update_planned_analyses(payload: PlannedAnalysisBulkUpdate, request: Request, db: AsyncSession = Depends(get_db)):
+  ids = [c.id for c in payload.changes]
+  current = {r.id: r for r in (await db.execute(select(PlannedAnalysisModel).where(PlannedAnalysisModel.id.in_(ids)))).scalars()}
+  errors: dict = {}
+  changes: dict[int, dict] = {}
+  assignees: dict[int, list[str]] = {}
+  for change in payload.changes:
+    values = {}
+    if change.status is not None:
+      values["status"] = change.status
+    if "assigned_to" in change.model_fields_set:
+      assignees[change.id] = normalize_assignees(change.assigned_to)
+      values["assigned_to"] = assignees[change.id][0] if assignees[change.id] else None
+    if change.id in changes or change.id in errors:
+      errors[change.id] = "Duplicate id in request"
+    elif change.id not in current:
+      errors[change.id] = "Planned analysis not found"
+    elif not values:
+      errors[change.id] = "No changes"
+    else:
+      changes[change.id] = values
+  for analysis_id in [i for i in changes if i in errors]:
+    del changes[analysis_id]
+  assignees = {i: names for i, names in assignees.items() if i in changes}
+
+  for values, group_ids in group_changes(changes).items():
+    values = dict(values)
+    if "status" in values:
+      values["status"] = AnalysisStatus(values["status"])
+    await db.execute(
+      update(PlannedAnalysisModel).where(PlannedAnalysisModel.id.in_(group_ids)).values(**values, version=PlannedAnalysisModel.version + 1),
+      execution_options={"synchronize_session": False},
+    )
+  if assignees:
+    await db.execute(delete(PlannedAnalysisAssigneeModel).where(PlannedAnalysisAssigneeModel.analysis_id.in_(list(assignees))))
+    rows = [{"analysis_id": i, "assignee": name} for i, names in assignees.items() for name in names]
+    if rows:
+      await db.execute(insert(PlannedAnalysisAssigneeModel), rows)
+  for i, values in changes.items():
+    if "status" in values:
+      count_analysis(db, current[i].analysis_type, current[i].status, -1)
+      count_analysis(db, current[i].analysis_type, values["status"])
+  actor = request_actor(request)
+  audit_writer.stage(db, [
+    audit_entry(entity_type="planned_analysis", entity_id=str(i), action="status_change", performed_by=actor, details=f"{current[i].status.value}->{values['status']}")
+    for i, values in changes.items() if "status" in values
+  ])
+  broadcaster.stage(db, [
+    change_event("planned_analysis", i, "updated", sample_id=current[i].sample_id, status=values.get("status", current[i].status.value), assigned_to=assignees.get(i, get_assignees(current[i])))
+    for i, values in changes.items()
+  ])
+  if changes:
+    touch(db, "planned_analyses")
+    await db.commit()
+  return bulk_results(ids, errors)
+
+
+@app.get("/work-queue", response_model=WorkQueueOut)
+@sql_budget(2)
+async def work_queue(assignee: str = Query(min_length=1, max_length=128), status: str | None = None, db: AsyncSession = Depends(get_db)):
+  # One status filter for two status vocabularies: it applies to whichever
+  # entity knows the value, and the other list is skipped without a query.
+  if status and status not in AnalysisStatus.__members__ and status not in SampleStatus.__members__:
+    raise HTTPException(status_code=422, detail=f"Unknown status: {status}")
+
+  analyses = []
+  if not status or status in AnalysisStatus.__members__:
+    analyses = [
+      {**to_planned_out(row), "well_id": well_id, "horizon": horizon}
+      for row, well_id, horizon in (await db.execute(work_queue_analyses_query(assignee, status))).unique().all()
+    ]
+
+  samples = []
+  if not status or status in SampleStatus.__members__:
+    samples = [to_sample_out(r).model_dump() for r in (await db.execute(work_queue_samples_query(assignee, status))).scalars()]
+  return {"analyses": analyses, "samples": samples}
+
+
+def work_queue_analyses_query(assignee: str, status: str | None = None):
+  # Seeks ix_planned_analysis_assignees_assignee_analysis_id, then joins the
+  # analysis and its sample by primary key; the full assignee list comes
+  # along in the same statement.
+  stmt = (
+    select(PlannedAnalysisModel, SampleModel.well_id, SampleModel.horizon)
+    .join(PlannedAnalysisAssigneeModel, PlannedAnalysisAssigneeModel.analysis_id == PlannedAnalysisModel.id)
+    .join(SampleModel, SampleModel.sample_id == PlannedAnalysisModel.sample_id)
+    .where(PlannedAnalysisAssigneeModel.assignee == assignee)
+    .options(joinedload(PlannedAnalysisModel.assignees))
+    .order_by(PlannedAnalysisModel.id)
+  )
+  if status:
+    stmt = stmt.where(PlannedAnalysisModel.status == AnalysisStatus(status))
+  return stmt
+
+
+def work_queue_samples_query(assignee: str, status: str | None = None):
+  stmt = select(SampleModel).where(SampleModel.assigned_to == assignee).order_by(SampleModel.sample_id)
+  if status:
+    stmt = stmt.where(SampleModel.status == SampleStatus(status))
+  return stmt
 
 
 @app.get("/filter-methods", response_model=FilterMethodsOut)
-async def list_filter_methods(db: Session = Depends(get_db)):
-  rows = db.execute(select(FilterMethodModel.method_name).where(FilterMethodModel.visible == True)).all()
-  methods = [r[0] for r in rows if r and r[0]]
-  return {"methods": methods}
+@sql_budget(1)
+async def list_filter_methods(db: AsyncSession = Depends(get_db)):
+  async def load():
+    rows = (await db.execute(select(FilterMethodModel.method_name).where(FilterMethodModel.visible == True))).all()
+    return [r[0] for r in rows if r and r[0]]
+  return {"methods": await reference_cache.get_or_load(FILTER_METHODS_KEY, load)}
 
 
 @app.put("/filter-methods", response_model=FilterMethodsOut)
-async def update_filter_methods(payload: FilterMethodsUpdate, request: Request, db: Session = Depends(get_db)):
-  if not is_admin_from_headers(request):
-    raise HTTPException(status_code=403, detail="Admin only")
+async def update_filter_methods(payload: FilterMethodsUpdate, db: AsyncSession = Depends(get_db), _=Depends(require(Permission.MANAGE_FILTER_METHODS))):
   methods = normalize_methods(payload.methods)
-  db.execute(delete(FilterMethodModel))
+  await db.execute(delete(FilterMethodModel))
   for name in methods:
     db.add(FilterMethodModel(method_name=name, visible=True))
-  db.commit()
+  await db.commit()
+  reference_cache.invalidate(FILTER_METHODS_KEY)
   return {"methods": methods}
 
 
-def to_planned_out(row: PlannedAnalysisModel, db: Session):
+def planned_event(row: PlannedAnalysisModel, action: str) -> dict:
+  return change_event("planned_analysis", row.id, action, sample_id=row.sample_id, status=row.status.value, assigned_to=get_assignees(row))
+
+
+def to_planned_out(row: PlannedAnalysisModel):
   return {
     "id": row.id,
     "sample_id": row.sample_id,
     "analysis_type": row.analysis_type,
     "status": row.status.value,
-    "assigned_to": get_assignees(db, row.id, row.assigned_to),
+    "assigned_to": get_assignees(row),
+    "version": row.version,
   }
 
 
+def to_planned_export(row: PlannedAnalysisModel) -> dict:
+  # Versions are for concurrent edits, not reports; same columns as the CSV.
+  out = to_planned_out(row)
+  del out["version"]
+  return out
+
+
 @app.post("/action-batches", response_model=ActionBatchOut, status_code=201)
-async def create_action_batch(payload: ActionBatchCreate, db: Session = Depends(get_db)):
+async def create_action_batch(payload: ActionBatchCreate, db: AsyncSession = Depends(get_db)):
   row = ActionBatchModel(
     title=payload.title,
     date=payload.date,
     status=ActionBatchStatus(payload.status),
   )
   db.add(row)
-  db.commit()
-  db.refresh(row)
+  touch(db, "action_batches")
+  await db.flush()
+  broadcaster.stage(db, [change_event("action_batch", row.id, "created", status=row.status.value)])
+  await db.commit()
+  await db.refresh(row)
   return to_action_batch_out(row)
 
 
 @app.get("/action-batches", response_model=list[ActionBatchOut])
-async def list_action_batches(db: Session = Depends(get_db)):
-  rows = db.execute(select(ActionBatchModel)).scalars().all()
+@sql_budget(2)
+async def list_action_batches(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+  cached = not_modified(request, response, await collection_etag(db, "action_batches", request))
+  if cached is not None:
+    return cached
+  rows = (await db.execute(select(ActionBatchModel))).scalars().all()
   return [to_action_batch_out(r) for r in rows]
 
 
 @app.post("/conflicts", response_model=ConflictOut, status_code=201)
-async def create_conflict(payload: ConflictCreate, db: Session = Depends(get_db)):
+async def create_conflict(payload: ConflictCreate, db: AsyncSession = Depends(get_db)):
   row = ConflictModel(
     old_payload=payload.old_payload,
     new_payload=payload.new_payload,
     status=ConflictStatus(payload.status),
   )
   db.add(row)
-  db.commit()
-  db.refresh(row)
+  touch(db, "conflicts")
+  await db.flush()
+  broadcaster.stage(db, [change_event("conflict", row.id, "created", status=row.status.value)])
+  await db.commit()
+  await db.refresh(row)
   return to_conflict_out(row)
 
 @app.get("/conflicts", response_model=list[ConflictOut])
-async def list_conflicts(db: Session = Depends(get_db)):
-  rows = db.execute(select(ConflictModel)).scalars().all()
+@sql_budget(2)
+async def list_conflicts(
+  request: Request,
+  response: Response,
+  updated_from: datetime | None = Query(default=None, alias="from"),
+  updated_to: datetime | None = Query(default=None, alias="to"),
+  db: AsyncSession = Depends(get_db),
+):
+  cached = not_modified(request, response, await collection_etag(db, "conflicts", request))
+  if cached is not None:
+    return cached
+  stmt = select(ConflictModel).where(*date_range(ConflictModel.updated_at, updated_from, updated_to))
+  rows = (await db.execute(stmt)).scalars().all()
   return [to_conflict_out(r) for r in rows]
 
 
 @app.patch("/conflicts/{conflict_id}", response_model=ConflictOut)
-async def update_conflict(conflict_id: int, payload: ConflictUpdate, request: Request, db: Session = Depends(get_db), authorization: str | None = None):
-  row = db.get(ConflictModel, conflict_id)
+async def update_conflict(conflict_id: int, payload: ConflictUpdate, request: Request, db: AsyncSession = Depends(get_db), authorization: str | None = None):
+  row = await db.get(ConflictModel, conflict_id)
   if not row:
     raise HTTPException(status_code=404, detail="Conflict not found")
   old_status = row.status.value
@@ -394,15 +924,16 @@ async def update_conflict(conflict_id: int, payload: ConflictUpdate, request: Re
     row.status = ConflictStatus(payload.status)
   if payload.resolution_note is not None:
     row.resolution_note = payload.resolution_note
-  row.updated_at = datetime.now(timezone.utc).isoformat()
-  if authorization and authorization.lower().startswith("bearer "):
-    row.updated_by = authorization.split(" ", 1)[1]
+  row.updated_at = datetime.now(timezone.utc)
+  actor = request_actor(request, authorization)
+  if actor:
+    row.updated_by = actor
   db.add(row)
-  db.commit()
-  db.refresh(row)
   if payload.status:
-    actor = request.headers.get("x-user") or row.updated_by
     log_audit(db, entity_type="conflict", entity_id=str(conflict_id), action="status_change", performed_by=actor, details=f"{old_status}->{payload.status}")
+  broadcaster.stage(db, [change_event("conflict", conflict_id, "updated", status=row.status.value)])
+  touch(db, "conflicts")
+  await db.commit()
   return to_conflict_out(row)
 
 
@@ -422,71 +953,184 @@ def to_conflict_out(row: ConflictModel):
   }
 
 @app.delete("/admin/purge-nondefault-analyses")
-async def purge_nondefault_analyses(request: Request, db: Session = Depends(get_db)):
+async def purge_nondefault_analyses(db: AsyncSession = Depends(get_db), _=Depends(require(Permission.PURGE_ANALYSES))):
   allowed = {"sara", "ir", "mass spectrometry", "viscosity"}
-  roles_header = (request.headers.get("x-roles") or "").lower()
-  role_header = (request.headers.get("x-role") or "").lower()
-  is_admin = "admin" in roles_header.split(",") or role_header == "admin"
-  if not is_admin:
-    raise HTTPException(status_code=403, detail="Admin only")
-  deleted = (
-    db.query(PlannedAnalysisModel)
-    .filter(~PlannedAnalysisModel.analysis_type.in_(allowed))
-    .delete(synchronize_session=False)
-  )
-  db.commit()
+  deleted = await delete_analyses(db, ~PlannedAnalysisModel.analysis_type.in_(allowed))
+  broadcaster.stage(db, [change_event("planned_analysis", None, "purged", count=deleted)])
+  touch(db, "planned_analyses")
+  await db.commit()
   return {"deleted": deleted}
 
 
-def log_audit(db: Session, *, entity_type: str, entity_id: str, action: str, performed_by: str | None, details: str | None = None):
-  log_row = AuditLogModel(
-    entity_type=entity_type,
-    entity_id=entity_id,
-    action=action,
-    performed_by=performed_by,
-    performed_at=datetime.now(timezone.utc).isoformat(),
-    details=details,
+def audit_filters(
+  entity_type: str | None = None,
+  entity_id: str | None = None,
+  performed_by: str | None = None,
+  action: str | None = None,
+  performed_from: datetime | None = None,
+  performed_to: datetime | None = None,
+  time_from: datetime | None = Query(default=None, alias="from"),
+  time_to: datetime | None = Query(default=None, alias="to"),
+) -> list:
+  conditions = []
+  if entity_type:
+    conditions.append(AuditLogModel.entity_type == entity_type)
+  if entity_id:
+    conditions.append(AuditLogModel.entity_id == entity_id)
+  if performed_by:
+    conditions.append(AuditLogModel.performed_by == performed_by)
+  if action:
+    conditions.append(AuditLogModel.action == action)
+  conditions.extend(date_range(AuditLogModel.performed_at, performed_from or time_from, performed_to or time_to))
+  return conditions
+
+
+AUDIT_PAGE_DEFAULT = 100
+AUDIT_PAGE_MAX = 1000
+
+
+def encode_audit_cursor(row: AuditLogModel) -> str:
+  return base64.urlsafe_b64encode(f"{row.performed_at.isoformat()}|{row.id}".encode()).decode()
+
+
+def decode_audit_cursor(cursor: str) -> tuple[datetime, int]:
+  try:
+    performed_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+    return datetime.fromisoformat(performed_at), int(row_id)
+  except ValueError:
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def audit_page(db: AsyncSession, response: Response, filters: list, cursor: str | None, limit: int):
+  # Newest first; keyset on (performed_at, id) so deep pages cost the same as the first.
+  stmt = (
+    select(AuditLogModel)
+    .where(*filters)
+    .order_by(AuditLogModel.performed_at.desc(), AuditLogModel.id.desc())
+    .limit(limit + 1)
   )
-  db.add(log_row)
-  db.commit()
+  if cursor:
+    stmt = stmt.where(tuple_(AuditLogModel.performed_at, AuditLogModel.id) < tuple_(*decode_audit_cursor(cursor)))
+  rows = (await db.execute(stmt)).scalars().all()
+  if len(rows) > limit:
+    rows = rows[:limit]
+    response.headers["X-Next-Cursor"] = encode_audit_cursor(rows[-1])
+  return [to_audit_out(r) for r in rows]
 
 
-def parse_roles(role_str: str | None) -> list[str]:
-  if not role_str:
-    return []
-  return [r for r in (role_str.split(",") if "," in role_str else [role_str]) if r]
+def to_audit_out(row: AuditLogModel):
+  return {
+    "id": row.id,
+    "entity_type": row.entity_type,
+    "entity_id": row.entity_id,
+    "action": row.action,
+    "performed_by": row.performed_by,
+    "performed_at": row.performed_at,
+    "details": row.details,
+  }
+
+
+@app.get("/audit-log", response_model=list[AuditLogOut])
+@sql_budget(1)
+async def list_audit_log(
+  response: Response,
+  filters: list = Depends(audit_filters),
+  cursor: str | None = None,
+  limit: int = Query(default=AUDIT_PAGE_DEFAULT, ge=1, le=AUDIT_PAGE_MAX),
+  db: AsyncSession = Depends(get_db),
+):
+  return await audit_page(db, response, filters, cursor, limit)
+
+
+@app.get("/samples/{sample_id}/history", response_model=list[AuditLogOut])
+@sql_budget(1)
+async def sample_history(
+  sample_id: str,
+  response: Response,
+  cursor: str | None = None,
+  limit: int = Query(default=AUDIT_PAGE_DEFAULT, ge=1, le=AUDIT_PAGE_MAX),
+  db: AsyncSession = Depends(get_db),
+):
+  filters = [AuditLogModel.entity_type == "sample", AuditLogModel.entity_id == sample_id]
+  return await audit_page(db, response, filters, cursor, limit)
+
+
+SAMPLE_EXPORT_COLUMNS = ["sample_id", "well_id", "horizon", "sampling_date", "status", "storage_location", "assigned_to"]
+PLANNED_ANALYSIS_EXPORT_COLUMNS = ["id", "sample_id", "analysis_type", "status", "assigned_to"]
+AUDIT_EXPORT_COLUMNS = ["id", "entity_type", "entity_id", "action", "performed_by", "performed_at", "details"]
+EXPORT_FORMAT = Query(default="csv", pattern="^(csv|ndjson)$")
+
+
+@app.get("/export/samples")
+async def export_samples(filters: list = Depends(sample_filters), format: str = EXPORT_FORMAT, gzip: bool = False):
+  stmt = select(*(getattr(SampleModel, c) for c in SAMPLE_EXPORT_COLUMNS)).where(*filters).order_by(SampleModel.sample_id)
+  batches = stream_batches(stmt, lambda r: {**r._asdict(), "status": r.status.value, "sampling_date": r.sampling_date.isoformat()})
+  return export_response("samples", batches, format, SAMPLE_EXPORT_COLUMNS, gzip)
 
 
-def serialize_roles(roles: list[str]) -> str:
-  cleaned = [r for r in roles if r]
-  return ",".join(cleaned) if cleaned else "lab_operator"
+@app.get("/export/planned-analyses")
+async def export_planned_analyses(filters: list = Depends(planned_analysis_filters), format: str = EXPORT_FORMAT, gzip: bool = False):
+  stmt = select(PlannedAnalysisModel).where(*filters).order_by(PlannedAnalysisModel.id)
+  batches = stream_batches(stmt, to_planned_export, scalars=True)
+  return export_response("planned-analyses", batches, format, PLANNED_ANALYSIS_EXPORT_COLUMNS, gzip)
+
+
+@app.get("/export/audit-log")
+async def export_audit_log(filters: list = Depends(audit_filters), format: str = EXPORT_FORMAT, gzip: bool = False):
+  stmt = select(*(getattr(AuditLogModel, c) for c in AUDIT_EXPORT_COLUMNS)).where(*filters).order_by(AuditLogModel.id)
+  batches = stream_batches(stmt, lambda r: {**r._asdict(), "performed_at": r.performed_at.isoformat()})
+  return export_response("audit-log", batches, format, AUDIT_EXPORT_COLUMNS, gzip)
+
+
+def log_audit(db: AsyncSession, *, entity_type: str, entity_id: str, action: str, performed_by: str | None, details: str | None = None):
+  # Written by audit_writer when the caller commits, not here.
+  audit_writer.stage(db, [audit_entry(entity_type=entity_type, entity_id=entity_id, action=action, performed_by=performed_by, details=details)])
+
+
+@app.get("/stats")
+@sql_budget(1)
+async def dashboard_stats(db: AsyncSession = Depends(get_db)):
+  return await read_stats(db)
+
+
+@app.post("/admin/stats/reconcile")
+async def reconcile_stats(db: AsyncSession = Depends(get_db), _=Depends(require(Permission.RECONCILE_STATS))):
+  repaired = await reconcile(db)
+  if repaired is None:
+    raise HTTPException(status_code=409, detail="Reconciliation already running")
+  return {"repaired": repaired}
+
+
+@app.get("/admin/db-pool")
+async def db_pool_status(_=Depends(require(Permission.VIEW_DB_POOL))):
+  return pool_snapshot(async_engine.pool)
 
 
 @app.get("/admin/users", response_model=list[UserOut])
-async def list_users(db: Session = Depends(get_db)):
-  rows = db.execute(select(UserModel)).scalars().all()
-  return [
-    UserOut(
-      id=r.id,
-      username=r.username,
-      full_name=r.full_name,
-      role=parse_roles(r.roles)[0] if parse_roles(r.roles) else r.role,
-      roles=parse_roles(r.roles) or [r.role],
-    )
-    for r in rows
-  ]
+@sql_budget(1)
+async def list_users(db: AsyncSession = Depends(get_db), _=Depends(require(Permission.MANAGE_USERS))):
+  rows = (await db.execute(select(UserModel).options(joinedload(UserModel.roles)))).unique().scalars().all()
+  return [to_user_out(r) for r in rows]
+
+
+def to_user_out(row: UserModel) -> UserOut:
+  roles = row.role_names or [row.role]
+  return UserOut(id=row.id, username=row.username, full_name=row.full_name, role=roles[0], roles=roles)
 
 
 @app.patch("/admin/users/{user_id}", response_model=UserOut)
-async def update_user_role(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)):
-  row = db.get(UserModel, user_id)
+async def update_user_role(user_id: int, payload: UserUpdate, db: AsyncSession = Depends(get_db), _=Depends(require(Permission.MANAGE_USERS))):
+  row = await db.get(UserModel, user_id)
   if not row:
     raise HTTPException(status_code=404, detail="User not found")
-  roles = payload.roles or ([payload.role] if payload.role else parse_roles(row.roles) or [row.role])
-  primary = roles[0] if roles else row.role
-  row.role = primary
-  row.roles = serialize_roles(roles)
-  db.add(row)
-  db.commit()
-  db.refresh(row)
-  return UserOut(id=row.id, username=row.username, full_name=row.full_name, role=row.role, roles=parse_roles(row.roles) or [row.role])
+  roles = normalize_roles(payload.roles or ([payload.role] if payload.role else row.role_names or [row.role]))
+  # Keep rows for roles the user already has, so only the difference is written.
+  current = {r.role: r for r in row.roles}
+  row.roles = [current.get(name) or UserRoleModel(role=name) for name in roles]
+  for position, link in enumerate(row.roles):
+    link.position = position
+  row.role = roles[0]
+  await db.commit()
+  # Tokens carry roles; make the user log in again to pick up the new ones.
+  revoke_tokens(user_id)
+  return to_user_out(row)
@@ -0,0 +1,183 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Upper bounds in seconds; the +Inf bucket is implicit.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestDB:
+    __slots__ = ("scope", "statements", "seconds")
+
+    def __init__(self, scope: dict | None = None):
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope else None
+        return route.path if route is not None else UNMATCHED_ROUTE
+
+
+class RouteStats:
+    __slots__ = ("requests", "errors", "buckets", "latency_sum", "db_statements", "db_seconds", "statuses")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.statuses: dict[int, int] = {}
+
+
+current_request_db: ContextVar[RequestDB | None] = ContextVar("current_request_db", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.collectors: list = []
+        self.request_hooks: list = []
+
+    def observe(self, method: str, route: str, status: int, seconds: float, db: RequestDB):
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.requests += 1
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if status >= 500:
+            stats.errors += 1
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.latency_sum += seconds
+        stats.db_statements += db.statements
+        stats.db_seconds += db.seconds
+
+    def add_request_hook(self, hook):
+        """Register hook(scope, status, db) to run after every HTTP request; it may raise."""
+        self.request_hooks.append(hook)
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines (gauges from other subsystems)."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP labsync_http_requests_total HTTP requests by route template and status.",
+            "# TYPE labsync_http_requests_total counter",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'labsync_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+        lines += [
+            "# HELP labsync_http_request_errors_total Requests that ended in a 5xx or an unhandled exception.",
+            "# TYPE labsync_http_request_errors_total counter",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            lines.append(f'labsync_http_request_errors_total{{method="{method}",route="{route}"}} {stats.errors}')
+        lines += [
+            "# HELP labsync_http_request_duration_seconds Request latency by route template.",
+            "# TYPE labsync_http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'labsync_http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"labsync_http_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}")
+            lines.append(f"labsync_http_request_duration_seconds_count{{{labels}}} {stats.requests}")
+        lines += [
+            "# HELP labsync_db_statements_total SQL statements executed while serving each route.",
+            "# TYPE labsync_db_statements_total counter",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            lines.append(f'labsync_db_statements_total{{method="{method}",route="{route}"}} {stats.db_statements}')
+        lines += [
+            "# HELP labsync_db_seconds_total Time spent in SQL statements while serving each route.",
+            "# TYPE labsync_db_seconds_total counter",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            lines.append(f'labsync_db_seconds_total{{method="{method}",route="{route}"}} {stats.db_seconds:.6f}')
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so the per-request cost is two clock reads and a dict update."""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        db = RequestDB(scope)
+        token = current_request_db.set(db)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_db.reset(token)
+            self.registry.observe(scope["method"], db.route, status, elapsed, db)
+        for hook in self.registry.request_hooks:
+            hook(scope, status, db)
+
+
+def instrument_engine(engine):
+    """Attribute SQL statements and their time to the request being served."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db = current_request_db.get()
+        if db is not None:
+            db.statements += 1
+            db.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None and exception_context.connection.info.get("query_start"):
+            exception_context.connection.info["query_start"].pop()
+
+
+def snapshot_collector(prefix: str, snapshot):
+    """Expose every numeric field of snapshot() as a gauge named prefix_field."""
+
+    def collect() -> list[str]:
+        lines = []
+        for key, value in snapshot().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+        return lines
+
+    return collect
@@ -1,5 +1,7 @@
-from sqlalchemy import Boolean, Enum, ForeignKey, Integer, String, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Index, Integer, String, TypeDecorator, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
 try:
@@ -8,6 +10,29 @@ except ImportError:  # pragma: no cover
     from database import Base  # type: ignore
 
 
+class UTCDateTime(TypeDecorator):
+    """timestamptz on Postgres; always an aware UTC datetime in Python.
+
+    SQLite has no timezone-aware type and hands back naive values, so values
+    are normalised to UTC on the way in and tagged as UTC on the way out.
+    Stored in one fixed format, they also sort correctly as text. Naive input
+    (e.g. a query parameter without an offset) is taken to be UTC.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None:
+            value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
 class SampleStatus(enum.Enum):
     new = "new"
     progress = "progress"
@@ -17,14 +42,24 @@ class SampleStatus(enum.Enum):
 
 class SampleModel(Base):
     __tablename__ = "samples"
+    # Each filter index ends in the PK so a filtered keyset page is a single range scan.
+    __table_args__ = (
+        Index("ix_samples_well_id_sample_id", "well_id", "sample_id"),
+        Index("ix_samples_horizon_sample_id", "horizon", "sample_id"),
+        Index("ix_samples_assigned_to_sample_id", "assigned_to", "sample_id"),
+        Index("ix_samples_storage_location_sample_id", "storage_location", "sample_id"),
+        Index("ix_samples_sampling_date_sample_id", "sampling_date", "sample_id"),
+    )
 
     sample_id: Mapped[str] = mapped_column(String, primary_key=True)
     well_id: Mapped[str] = mapped_column(String, nullable=False)
     horizon: Mapped[str] = mapped_column(String, nullable=False)
-    sampling_date: Mapped[str] = mapped_column(String, nullable=False)
+    sampling_date: Mapped[date] = mapped_column(Date, nullable=False)
     status: Mapped[SampleStatus] = mapped_column(Enum(SampleStatus), default=SampleStatus.new, nullable=False)
     storage_location: Mapped[str | None] = mapped_column(String, nullable=True)
     assigned_to: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Bumped by every update; PATCH compares it with If-Match.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
 
 
 class AnalysisStatus(enum.Enum):
@@ -37,17 +72,35 @@ class AnalysisStatus(enum.Enum):
 
 class PlannedAnalysisModel(Base):
     __tablename__ = "planned_analyses"
+    # Serves the batch-create duplicate check and per-sample lookups; the status
+    # index serves the status filter on the list and the work queue.
+    __table_args__ = (
+        Index("ix_planned_analyses_sample_id_analysis_type", "sample_id", "analysis_type"),
+        Index("ix_planned_analyses_status", "status"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sample_id: Mapped[str] = mapped_column(String, ForeignKey("samples.sample_id", ondelete="CASCADE"), nullable=False)
     analysis_type: Mapped[str] = mapped_column(String, nullable=False)
     status: Mapped[AnalysisStatus] = mapped_column(Enum(AnalysisStatus), default=AnalysisStatus.planned, nullable=False)
     assigned_to: Mapped[str | None] = mapped_column(String, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # Loaded with one "IN" query per result set instead of one query per analysis.
+    assignees: Mapped[list["PlannedAnalysisAssigneeModel"]] = relationship(
+        lazy="selectin",
+        order_by="PlannedAnalysisAssigneeModel.id",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class PlannedAnalysisAssigneeModel(Base):
     __tablename__ = "planned_analysis_assignees"
-    __table_args__ = (UniqueConstraint("analysis_id", "assignee", name="uq_planned_analysis_assignee"),)
+    # The unique constraint leads with analysis_id; the work queue looks rows up by assignee.
+    __table_args__ = (
+        UniqueConstraint("analysis_id", "assignee", name="uq_planned_analysis_assignee"),
+        Index("ix_planned_analysis_assignees_assignee_analysis_id", "assignee", "analysis_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     analysis_id: Mapped[int] = mapped_column(Integer, ForeignKey("planned_analyses.id", ondelete="CASCADE"), nullable=False)
@@ -76,6 +129,7 @@ class ConflictStatus(enum.Enum):
 
 class ConflictModel(Base):
     __tablename__ = "conflicts"
+    __table_args__ = (Index("ix_conflicts_updated_at", "updated_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     old_payload: Mapped[str] = mapped_column(String, nullable=False)
@@ -83,7 +137,7 @@ class ConflictModel(Base):
     status: Mapped[ConflictStatus] = mapped_column(Enum(ConflictStatus), default=ConflictStatus.open, nullable=False)
     resolution_note: Mapped[str | None] = mapped_column(String, nullable=True)
     updated_by: Mapped[str | None] = mapped_column(String, nullable=True)
-    updated_at: Mapped[str | None] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(UTCDateTime, nullable=True)
 
 
 class UserModel(Base):
@@ -92,8 +146,27 @@ class UserModel(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     full_name: Mapped[str] = mapped_column(String, nullable=False)
+    # The primary role, i.e. roles[0]; the full list lives in user_roles.
     role: Mapped[str] = mapped_column(String, nullable=False, default="lab_operator")
-    roles: Mapped[str] = mapped_column(String, nullable=False, default="lab_operator")
+    roles: Mapped[list["UserRoleModel"]] = relationship(
+        lazy="selectin",
+        order_by="UserRoleModel.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @property
+    def role_names(self) -> list[str]:
+        return [r.role for r in self.roles]
+
+
+class UserRoleModel(Base):
+    __tablename__ = "user_roles"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    role: Mapped[str] = mapped_column(String, primary_key=True)
+    # Keeps the order roles were assigned in; the first is the primary role.
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class FilterMethodModel(Base):
@@ -105,11 +178,41 @@ class FilterMethodModel(Base):
 
 class AuditLogModel(Base):
     __tablename__ = "audit_log"
+    # Every index ends in (performed_at, id) to serve the newest-first keyset pages.
+    __table_args__ = (
+        Index("ix_audit_log_performed_at_id", "performed_at", "id"),
+        Index("ix_audit_log_entity", "entity_type", "entity_id", "performed_at", "id"),
+        Index("ix_audit_log_performed_by", "performed_by", "performed_at", "id"),
+        Index("ix_audit_log_action", "action", "performed_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     entity_type: Mapped[str] = mapped_column(String, nullable=False)
     entity_id: Mapped[str] = mapped_column(String, nullable=False)
     action: Mapped[str] = mapped_column(String, nullable=False)
     performed_by: Mapped[str | None] = mapped_column(String, nullable=True)
-    performed_at: Mapped[str] = mapped_column(String, nullable=False)
+    performed_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False)
     details: Mapped[str | None] = mapped_column(String, nullable=True)
+
+
+class StatusCountModel(Base):
+    """Row counts per (entity, group, status), kept current by the write paths.
+
+    group_a/group_b are (well_id, horizon) for samples and (analysis_type, "")
+    for planned analyses.
+    """
+
+    __tablename__ = "status_counts"
+
+    entity: Mapped[str] = mapped_column(String, primary_key=True)
+    group_a: Mapped[str] = mapped_column(String, primary_key=True)
+    group_b: Mapped[str] = mapped_column(String, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CollectionVersionModel(Base):
+    __tablename__ = "collection_versions"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,110 @@
+import enum
+from functools import lru_cache, reduce
+from operator import or_
+from typing import Iterable
+
+from fastapi import Depends, HTTPException, Request
+
+try:
+    from .tokens import AUTH_DEV_MODE, InvalidToken, verify_token
+except ImportError:  # pragma: no cover
+    from tokens import AUTH_DEV_MODE, InvalidToken, verify_token  # type: ignore
+
+
+class Permission(enum.IntFlag):
+    NONE = 0
+    DELETE_SAMPLES = enum.auto()
+    PURGE_ANALYSES = enum.auto()
+    CUSTOM_ANALYSIS_TYPES = enum.auto()
+    MANAGE_FILTER_METHODS = enum.auto()
+    RECONCILE_STATS = enum.auto()
+    VIEW_DB_POOL = enum.auto()
+    MANAGE_USERS = enum.auto()
+
+
+ALL_PERMISSIONS = reduce(or_, Permission, Permission.NONE)
+
+# Roles not listed here grant nothing beyond what every caller may do.
+ROLE_PERMISSIONS: dict[str, Permission] = {
+    "admin": ALL_PERMISSIONS,
+}
+DEFAULT_ROLE = "lab_operator"
+
+
+def parse_roles(role_str: str | None) -> list[str]:
+    if not role_str:
+        return []
+    return [r for r in (role_str.split(",") if "," in role_str else [role_str]) if r]
+
+
+def normalize_roles(roles: Iterable[str]) -> list[str]:
+    """Drop blanks and repeats, keeping order; a user always has at least one role."""
+    cleaned = list(dict.fromkeys(r.strip() for r in roles if r and r.strip()))
+    return cleaned or [DEFAULT_ROLE]
+
+
+def permissions_for(roles: Iterable[str]) -> Permission:
+    return reduce(or_, (ROLE_PERMISSIONS.get(r.lower(), Permission.NONE) for r in roles), Permission.NONE)
+
+
+@lru_cache(maxsize=256)
+def header_permissions(roles_header: str, role_header: str) -> Permission:
+    # Only consulted under AUTH_DEV_MODE; the few distinct header values are
+    # resolved once per process.
+    return permissions_for([*parse_roles(roles_header), role_header])
+
+
+@lru_cache(maxsize=256)
+def token_permissions(roles: tuple[str, ...]) -> Permission:
+    return permissions_for(roles)
+
+
+def request_claims(request: Request, authorization: str | None = None) -> dict | None:
+    """Claims of the request's bearer token, or None without one; 401 if it does not verify.
+
+    The token may come in the Authorization header or, for older clients, the
+    authorization query parameter. Verified once per request.
+    """
+    if not hasattr(request.state, "claims"):
+        authorization = authorization or request.headers.get("authorization") or ""
+        claims = None
+        if authorization.lower().startswith("bearer "):
+            try:
+                claims = verify_token(authorization.split(" ", 1)[1])
+            except InvalidToken as exc:
+                raise HTTPException(status_code=401, detail=str(exc))
+        request.state.claims = claims
+    return request.state.claims
+
+
+def request_actor(request: Request, authorization: str | None = None) -> str | None:
+    """Who to record as performing a change: the token's user, else nobody.
+
+    Under AUTH_DEV_MODE a request without a token may name itself in X-User.
+    """
+    claims = request_claims(request, authorization)
+    if claims is not None:
+        return claims["name"]
+    return request.headers.get("x-user") if AUTH_DEV_MODE else None
+
+
+async def current_permissions(request: Request) -> Permission:
+    """Permissions of the token's roles. Without a token: none, or under
+    AUTH_DEV_MODE those of the X-Roles / X-Role headers."""
+    claims = request_claims(request)
+    if claims is not None:
+        return token_permissions(tuple(claims["roles"]))
+    if not AUTH_DEV_MODE:
+        return Permission.NONE
+    return header_permissions((request.headers.get("x-roles") or "").lower(), (request.headers.get("x-role") or "").lower())
+
+
+def require(permission: Permission):
+    """Route dependency: 403 unless the caller holds every bit in permission."""
+
+    async def check(granted: Permission = Depends(current_permissions)) -> Permission:
+        if permission not in granted:
+            raise HTTPException(status_code=403, detail=f"Missing permission: {permission.name.lower()}")
+        return granted
+
+    return check
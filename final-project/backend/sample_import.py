@@ -0,0 +1,205 @@
+import csv
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    from .models import SampleModel, SampleStatus
+    from .schemas import Sample
+    from .versions import touch
+    from .events import broadcaster, change_event
+    from .stats import count_sample
+except ImportError:  # pragma: no cover
+    from models import SampleModel, SampleStatus  # type: ignore
+    from schemas import Sample  # type: ignore
+    from versions import touch  # type: ignore
+    from events import broadcaster, change_event  # type: ignore
+    from stats import count_sample  # type: ignore
+
+try:
+    from asyncpg.exceptions import UniqueViolationError
+except ImportError:  # pragma: no cover - only the Postgres COPY path raises it
+    UniqueViolationError = IntegrityError
+
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+SAMPLE_COLUMNS = ["sample_id", "well_id", "horizon", "sampling_date", "status", "storage_location", "assigned_to"]
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+
+
+def detect_format(content_type: str | None, explicit: str | None = None) -> str | None:
+    if explicit:
+        return explicit.lower() if explicit.lower() in {"csv", "ndjson"} else None
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering more than one partial line."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def iter_records(lines: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, record, parse error) for every non-blank line.
+
+    CSV input must start with a header row and keep one record per line.
+    Lines that are not valid UTF-8 are reported like any other bad row.
+    """
+    header: list[str] | None = None
+    line_no = 0
+    async for raw in lines:
+        line_no += 1
+        try:
+            line = raw.decode("utf-8").rstrip("\r")
+        except UnicodeDecodeError as exc:
+            yield line_no, None, f"invalid UTF-8 at byte {exc.start}"
+            continue
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, None, f"expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, {k: (v if v != "" else None) for k, v in zip(header, values)}, None
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "expected a JSON object"
+                continue
+            yield line_no, record, None
+
+
+def validate_record(record: dict) -> Sample:
+    if record.get("status") is None:
+        record = {**record, "status": "new"}
+    sample = Sample.model_validate(record)
+    SampleStatus(sample.status)
+    return sample
+
+
+def format_error(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors())
+    return str(exc)
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def fail(self, line: int, sample_id: str | None, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "sample_id": sample_id, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def split_existing(db: AsyncSession, chunk: list[tuple[int, Sample]]) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Rows to insert, and (line, sample_id) of those whose ID already exists or repeats."""
+    ids = [s.sample_id for _, s in chunk]
+    existing = set((await db.execute(select(SampleModel.sample_id).where(SampleModel.sample_id.in_(ids)))).scalars())
+    rows: list[dict] = []
+    skipped: list[tuple[int, str]] = []
+    for line, sample in chunk:
+        if sample.sample_id in existing:
+            skipped.append((line, sample.sample_id))
+            continue
+        existing.add(sample.sample_id)
+        rows.append(sample.model_dump(include=set(SAMPLE_COLUMNS)))
+    return rows, skipped
+
+
+async def write_chunk(db: AsyncSession, chunk: list[tuple[int, Sample]], report: ImportReport):
+    """Insert one chunk of validated samples, skipping IDs that already exist.
+
+    A sample created by another request between the check and the insert
+    fails the whole chunk; it is then rolled back and checked again once.
+    """
+    for attempt in range(2):
+        rows, skipped = await split_existing(db, chunk)
+        if not rows:
+            break
+        try:
+            for r in rows:
+                count_sample(db, r["well_id"], r["horizon"], r["status"])
+            await insert_samples(db, rows)
+            broadcaster.stage(db, [change_event("sample", None, "imported", count=len(rows))])
+            touch(db, "samples")
+            await db.commit()
+            break
+        except (IntegrityError, UniqueViolationError):
+            await db.rollback()
+            if attempt:
+                for line, sample in chunk:
+                    report.fail(line, sample.sample_id, "Sample was created concurrently; retry the import")
+                return
+    for line, sample_id in skipped:
+        report.fail(line, sample_id, "Sample exists")
+    report.imported += len(rows)
+
+
+async def insert_samples(db: AsyncSession, rows: list[dict]):
+    if db.bind.dialect.name == "postgresql":
+        # COPY skips per-row statement overhead entirely on asyncpg.
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        records = [tuple(r.get(c) for c in SAMPLE_COLUMNS) for r in rows]
+        await raw.driver_connection.copy_records_to_table("samples", records=records, columns=SAMPLE_COLUMNS)
+    else:
+        for r in rows:
+            r["status"] = SampleStatus(r["status"])
+        await db.execute(insert(SampleModel), rows)
+
+
+async def import_samples_stream(db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str) -> dict:
+    report = ImportReport()
+    chunk: list[tuple[int, Sample]] = []
+    async for line, record, error in iter_records(iter_lines(chunks), fmt):
+        if error:
+            report.fail(line, None, error)
+            continue
+        try:
+            chunk.append((line, validate_record(record)))
+        except (ValidationError, ValueError) as exc:
+            report.fail(line, record.get("sample_id"), format_error(exc))
+            continue
+        if len(chunk) >= CHUNK_SIZE:
+            await write_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        await write_chunk(db, chunk, report)
+    return report.as_dict()
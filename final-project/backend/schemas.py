@@ -1,3 +1,5 @@
+from datetime import date, datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -5,9 +7,11 @@ class Sample(BaseModel):
     sample_id: str = Field(min_length=2, max_length=64)
     well_id: str = Field(min_length=1, max_length=32)
     horizon: str = Field(min_length=1, max_length=32)
-    sampling_date: str = Field(min_length=4, max_length=32)
+    sampling_date: date
     status: str = "new"
     storage_location: str | None = Field(default=None, max_length=128)
+    assigned_to: str | None = Field(default=None, max_length=128)
+    version: int | None = None
 
 
 class PlannedAnalysisCreate(BaseModel):
@@ -16,6 +20,18 @@ class PlannedAnalysisCreate(BaseModel):
     assigned_to: list[str] | str | None = Field(default=None)
 
 
+class PlannedAnalysisBatchCreate(BaseModel):
+    sample_ids: list[str] = Field(min_length=1, max_length=1000)
+    analysis_types: list[str] = Field(min_length=1, max_length=20)
+    assigned_to: list[str] | str | None = Field(default=None)
+
+
+class PlannedAnalysisBatchSkipped(BaseModel):
+    sample_id: str
+    analysis_type: str
+    reason: str
+
+
 class PlannedAnalysisUpdate(BaseModel):
     status: str | None = Field(default=None, pattern="^(planned|in_progress|review|completed|failed)$")
     assigned_to: list[str] | str | None = Field(default=None)
@@ -27,6 +43,22 @@ class PlannedAnalysisOut(BaseModel):
     analysis_type: str
     status: str
     assigned_to: list[str] | None = None
+    version: int | None = None
+
+
+class WorkQueueAnalysis(PlannedAnalysisOut):
+    well_id: str
+    horizon: str
+
+
+class WorkQueueOut(BaseModel):
+    analyses: list[WorkQueueAnalysis]
+    samples: list[Sample]
+
+
+class PlannedAnalysisBatchOut(BaseModel):
+    created: list[PlannedAnalysisOut]
+    skipped: list[PlannedAnalysisBatchSkipped]
 
 
 class FilterMethodsUpdate(BaseModel):
@@ -67,6 +99,7 @@ class ConflictOut(BaseModel):
     new_payload: str
     status: str
     resolution_note: str | None = None
+    updated_at: datetime | None = None
 
 
 class UserOut(BaseModel):
@@ -80,3 +113,46 @@ class UserOut(BaseModel):
 class UserUpdate(BaseModel):
     role: str | None = Field(default=None, pattern="^(warehouse_worker|lab_operator|action_supervision|admin)$")
     roles: list[str] | None = None
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    entity_type: str
+    entity_id: str
+    action: str
+    performed_by: str | None = None
+    performed_at: datetime
+    details: str | None = None
+
+
+class SampleBulkChange(BaseModel):
+    # Only fields present in the request are applied; an explicit null clears the field.
+    id: str = Field(min_length=2, max_length=64)
+    status: str | None = Field(default=None, pattern="^(new|progress|review|done)$")
+    assigned_to: str | None = Field(default=None, max_length=128)
+    storage_location: str | None = Field(default=None, max_length=128)
+
+
+class SampleBulkUpdate(BaseModel):
+    changes: list[SampleBulkChange] = Field(min_length=1, max_length=1000)
+
+
+class PlannedAnalysisBulkChange(BaseModel):
+    id: int
+    status: str | None = Field(default=None, pattern="^(planned|in_progress|review|completed|failed)$")
+    assigned_to: list[str] | str | None = Field(default=None)
+
+
+class PlannedAnalysisBulkUpdate(BaseModel):
+    changes: list[PlannedAnalysisBulkChange] = Field(min_length=1, max_length=1000)
+
+
+class BulkItemResult(BaseModel):
+    id: str | int
+    ok: bool
+    error: str | None = None
+
+
+class BulkUpdateOut(BaseModel):
+    updated: int
+    results: list[BulkItemResult]
@@ -0,0 +1,163 @@
+import os
+import re
+
+from sqlalchemy import DDL, Integer, Row, column, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    from .models import SampleModel
+except ImportError:  # pragma: no cover
+    from models import SampleModel  # type: ignore
+
+
+# Columns a search term may match, in the order they are indexed.
+SEARCH_COLUMNS = ("sample_id", "well_id", "horizon", "storage_location", "assigned_to")
+SEARCH_PAGE_MAX = 100
+# How much a term matching a word in each column counts towards the ranking;
+# a whole-word match counts double a prefix match.
+COLUMN_WEIGHTS = {"sample_id": 4, "well_id": 4, "horizon": 2, "assigned_to": 2, "storage_location": 1}
+
+# Postgres: a stored tsvector column holding every prefix of every word, so a
+# prefix search is a set of exact lexeme lookups that the GIN index intersects
+# (":*" queries instead scan a range of the index per term). Punctuation only
+# separates words, as in search_terms; the default text search parser would
+# read "W-7731" as "w" and "-7731". insert_seq is the insertion order the
+# results are paged in: unlike the heap position, an UPDATE does not change it.
+# Neither column is mapped on SampleModel; the database fills both.
+PG_DOCUMENT_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION sample_search_document(VARIADIC fields text[]) RETURNS tsvector "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ "
+    "SELECT coalesce(array_to_tsvector(array_agg(DISTINCT left(w, n))), ''::tsvector) "
+    "FROM unnest(regexp_split_to_array(lower(array_to_string(fields, ' ')), '[^[:alnum:]_]+')) w, "
+    "generate_series(1, length(w)) n WHERE w <> '' $$"
+)
+PG_DDL = [
+    PG_DOCUMENT_FUNCTION,
+    "ALTER TABLE samples ADD COLUMN IF NOT EXISTS insert_seq bigint GENERATED ALWAYS AS IDENTITY",
+    f"ALTER TABLE samples ADD COLUMN IF NOT EXISTS search_document tsvector "
+    f"GENERATED ALWAYS AS (sample_search_document({', '.join(SEARCH_COLUMNS)})) STORED",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_samples_insert_seq ON samples (insert_seq)",
+    "CREATE INDEX IF NOT EXISTS ix_samples_search_document ON samples USING gin (search_document)",
+]
+
+# SQLite: an external-content FTS5 table over samples (it stores only the index,
+# not a copy of the rows) plus triggers, so every statement that writes samples
+# (single, bulk, import, delete) updates it in the same transaction. The prefix
+# indexes make prefix queries of up to 6 characters single lookups instead of
+# merges over every matching term. detail=column drops token positions (only
+# needed for phrase queries) and roughly halves the doclists a query decodes.
+# The FTS5 rowid is the samples rowid, which an UPDATE keeps, so it doubles as
+# the insertion order.
+_COLUMNS = ", ".join(SEARCH_COLUMNS)
+_NEW = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_OLD = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS samples_fts USING fts5({_COLUMNS}, content='samples', detail=column, prefix='1 2 3 4 5 6')",
+    f"CREATE TRIGGER IF NOT EXISTS samples_fts_insert AFTER INSERT ON samples BEGIN "
+    f"INSERT INTO samples_fts(rowid, {_COLUMNS}) VALUES (new.rowid, {_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS samples_fts_delete AFTER DELETE ON samples BEGIN "
+    f"INSERT INTO samples_fts(samples_fts, rowid, {_COLUMNS}) VALUES ('delete', old.rowid, {_OLD}); END",
+    # Status changes, the most frequent write, do not touch the index.
+    f"CREATE TRIGGER IF NOT EXISTS samples_fts_update AFTER UPDATE OF {_COLUMNS} ON samples BEGIN "
+    f"INSERT INTO samples_fts(samples_fts, rowid, {_COLUMNS}) VALUES ('delete', old.rowid, {_OLD}); "
+    f"INSERT INTO samples_fts(rowid, {_COLUMNS}) VALUES (new.rowid, {_NEW}); END",
+]
+for _statement in SQLITE_DDL:
+    event.listen(SampleModel.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in PG_DDL:
+    event.listen(SampleModel.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(SampleModel.__table__, "before_drop", DDL("DROP TABLE IF EXISTS samples_fts").execute_if(dialect="sqlite"))
+
+
+WORD = re.compile(r"\w+")
+
+
+def search_terms(q: str) -> list[str]:
+    """Split a query into lowercase word tokens; punctuation only separates terms."""
+    return WORD.findall(q.lower())
+
+
+def search_statement(dialect_name: str):
+    """Matches of every term as prefixes, in two tiers, each newest first.
+
+    Tier 0 is the SEARCH_CANDIDATES newest matches, which search_samples
+    ranks; tier 1 is the slice of the older matches the page reaches into.
+    For a broad query both walk the matches in insertion order and stop at
+    their LIMIT; a narrow one reads its few matches from the index and sorts
+    them. Ranking only reads the candidates' own columns, so its cost does
+    not grow with the number of matches.
+    """
+    table = SampleModel.__table__
+    s_columns = ", ".join(f"s.{c.name}" for c in table.columns)
+    if dialect_name == "postgresql":
+        matches = f"SELECT {s_columns}, s.insert_seq AS pos, {{tier}} AS tier FROM samples s WHERE s.search_document @@ CAST(:query AS tsquery)"
+        p_columns = ", ".join(f"p.{c.name}" for c in table.columns)
+        sql = (
+            f"SELECT {p_columns}, p.tier FROM ("
+            f"({matches.format(tier=0)} ORDER BY s.insert_seq DESC LIMIT :candidates) UNION ALL "
+            f"({matches.format(tier=1)} ORDER BY s.insert_seq DESC LIMIT :tail_limit OFFSET :tail_offset)"
+            f") p ORDER BY p.tier, p.pos DESC"
+        )
+    else:
+        matches = "SELECT rowid AS pos, {tier} AS tier FROM samples_fts WHERE samples_fts MATCH :query ORDER BY rowid DESC"
+        sql = (
+            f"SELECT {s_columns}, p.tier FROM ("
+            f"SELECT * FROM ({matches.format(tier=0)} LIMIT :candidates) UNION ALL "
+            f"SELECT * FROM ({matches.format(tier=1)} LIMIT :tail_limit OFFSET :tail_offset)"
+            f") p JOIN samples s ON s.rowid = p.pos ORDER BY p.tier, p.pos DESC"
+        )
+    return text(sql).columns(*table.columns, column("tier", Integer))
+
+
+def page_window(offset: int, limit: int, candidates: int) -> dict:
+    """Split rows [offset, offset + limit) between the ranked head and the tail."""
+    head_limit = max(0, min(limit, candidates - offset))
+    return {
+        # Skip the candidates entirely once the page is past the head.
+        "candidates": candidates if head_limit else 0,
+        "head_limit": head_limit,
+        "head_offset": min(offset, candidates),
+        "tail_limit": limit - head_limit,
+        "tail_offset": candidates + max(0, offset - candidates),
+    }
+
+
+def search_query(dialect_name: str, terms: list[str]) -> str:
+    if dialect_name == "postgresql":
+        # The document holds every prefix as a lexeme, so terms match exactly.
+        return " & ".join(f"'{t}'" for t in terms)
+    # Quoted, so words like AND/NEAR or "col:" stay literal terms for FTS5.
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def match_score(row, terms: list[str]) -> int:
+    """Sum over the terms of the best column each matches, by COLUMN_WEIGHTS."""
+    best = [0] * len(terms)
+    for column_name, weight in COLUMN_WEIGHTS.items():
+        value = getattr(row, column_name)
+        if not value:
+            continue
+        words = WORD.findall(value.lower())
+        for i, term in enumerate(terms):
+            if best[i] < 2 * weight and term in words:
+                best[i] = 2 * weight
+            elif best[i] < weight and any(word.startswith(term) for word in words):
+                best[i] = weight
+    return sum(best)
+
+
+async def search_samples(db: AsyncSession, q: str, limit: int, offset: int = 0) -> list[Row]:
+    """One page of matches: best first among the newest candidates, then older ones newest first."""
+    terms = search_terms(q)
+    if not terms:
+        return []
+    dialect_name = db.bind.dialect.name
+    window = page_window(offset, limit, SEARCH_CANDIDATES)
+    params = {"query": search_query(dialect_name, terms), **{k: window[k] for k in ("candidates", "tail_limit", "tail_offset")}}
+    rows = (await db.execute(search_statement(dialect_name), params)).all()
+    head = sorted((r for r in rows if r.tier == 0), key=lambda r: (-match_score(r, terms), r.sample_id))
+    start = window["head_offset"]
+    return head[start:start + window["head_limit"]] + [r for r in rows if r.tier == 1]
+
+
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "200"))
@@ -0,0 +1,88 @@
+import logging
+import os
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+try:
+    from .metrics import RequestDB, current_request_db
+except ImportError:  # pragma: no cover
+    from metrics import RequestDB, current_request_db  # type: ignore
+
+
+slow_query_logger = logging.getLogger("labsync.slow_query")
+budget_logger = logging.getLogger("labsync.sql_budget")
+
+MAX_LOGGED_PARAMS = 500
+
+
+class SQLBudgetExceeded(AssertionError):
+    pass
+
+
+def sql_budget(statements: int):
+    """Declare how many SQL statements one request to the decorated route may run.
+
+    Place it below the @app.<method> decorator. Enforcement depends on
+    SQL_BUDGET_MODE: "off" (the default), "log", or "raise" (for tests).
+    """
+
+    def decorate(endpoint):
+        endpoint.__sql_budget__ = statements
+        return endpoint
+
+    return decorate
+
+
+class BudgetEnforcer:
+    def __init__(self, mode: str = "off"):
+        if mode not in {"off", "log", "raise"}:
+            raise ValueError(f"Unknown SQL budget mode: {mode}")
+        self.mode = mode
+        # "METHOD /route" -> number of over-budget requests; bounded by the route table.
+        self.violations: Counter[str] = Counter()
+
+    def __call__(self, scope: dict, status: int, db: RequestDB):
+        if self.mode == "off":
+            return
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "__sql_budget__", None)
+        if budget is None or db.statements <= budget:
+            return
+        violation = {"method": scope["method"], "route": db.route, "statements": db.statements, "budget": budget}
+        self.violations[f"{violation['method']} {violation['route']}"] += 1
+        message = "%(method)s %(route)s ran %(statements)d SQL statements, budget is %(budget)d" % violation
+        if self.mode == "raise":
+            raise SQLBudgetExceeded(message)
+        budget_logger.warning(message)
+
+    def stats(self) -> dict:
+        return {"violations": sum(self.violations.values()), "routes_over_budget": len(self.violations)}
+
+
+def log_slow_queries(engine, threshold_ms: float):
+    """Log statement, parameters, duration and route for queries slower than threshold_ms."""
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < threshold:
+            return
+        db = current_request_db.get()
+        slow_query_logger.warning(
+            "slow query %.1f ms route=%s statement=%s parameters=%s",
+            elapsed * 1000,
+            db.route if db is not None else "-",
+            " ".join(statement.split()),
+            repr(parameters)[:MAX_LOGGED_PARAMS],
+        )
+
+
+budget_enforcer = BudgetEnforcer(os.getenv("SQL_BUDGET_MODE", "off"))
+SLOW_QUERY_MS = os.getenv("SLOW_QUERY_MS")
@@ -0,0 +1,97 @@
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy import func, insert, literal, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+try:
+    from .database import Base
+    from .models import UserModel, UserRoleModel
+    from . import search  # noqa: F401  registers the search index DDL with create_all
+    from .seed import DEFAULT_USERS
+except ImportError:  # pragma: no cover
+    from database import Base  # type: ignore
+    from models import UserModel, UserRoleModel  # type: ignore
+    import search  # type: ignore  # noqa: F401
+    from seed import DEFAULT_USERS  # type: ignore
+
+
+logger = logging.getLogger("labsync.startup")
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Arbitrary but fixed, so every worker contends for the same Postgres advisory lock.
+SEED_LOCK_KEY = 0x4C414253  # "LABS"
+SCHEMA_MODES = {"check", "create", "off"}
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_heads() -> set[str]:
+    # Imported lazily: only the check needs Alembic, and it costs ~100 ms to import.
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def prepare_schema(engine: AsyncEngine, mode: str):
+    """Make sure the schema is usable before serving.
+
+    "check" (the default) compares the database's Alembic revision with the
+    migration head and refuses to start on a mismatch, so `alembic upgrade
+    head` stays a deploy step rather than something every worker races to do.
+    "create" runs metadata.create_all for SQLite development and tests.
+    """
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown DB_SCHEMA_MODE: {mode}")
+    if mode == "off":
+        return
+    if mode == "create":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    from alembic.runtime.migration import MigrationContext
+
+    async with engine.connect() as conn:
+        current = set(await conn.run_sync(lambda c: MigrationContext.configure(c).get_current_heads()))
+    expected = alembic_heads()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database is at revision {sorted(current) or 'none'}, code expects {sorted(expected)}; run `alembic upgrade head`"
+        )
+
+
+async def seed_default_users(engine: AsyncEngine) -> bool:
+    """Insert the default users once; returns True if this process seeded them.
+
+    On Postgres the check-then-insert runs under a transaction-scoped advisory
+    lock, so concurrent workers seed exactly once. SQLite serializes writers
+    itself; a worker that loses the race hits the unique username constraint
+    and leaves the rows to the winner.
+    """
+    try:
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+            if await conn.scalar(select(func.count()).select_from(UserModel)):
+                return False
+            await conn.execute(insert(UserModel), DEFAULT_USERS)
+            # Each default user has exactly one role: its primary one.
+            await conn.execute(
+                insert(UserRoleModel).from_select(["user_id", "role", "position"], select(UserModel.id, UserModel.role, literal(0)))
+            )
+    except IntegrityError:
+        return False
+    logger.info("Seeded %d default users", len(DEFAULT_USERS))
+    return True
+
+
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "check")
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "1").strip().lower() in {"1", "true", "yes", "on"}
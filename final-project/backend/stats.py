@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+
+from sqlalchemy import delete, event, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+try:
+    from .models import PlannedAnalysisModel, SampleModel, StatusCountModel
+except ImportError:  # pragma: no cover
+    from models import PlannedAnalysisModel, SampleModel, StatusCountModel  # type: ignore
+
+
+logger = logging.getLogger("labsync.stats")
+
+DELTAS_KEY = "status_count_deltas"
+SAMPLES = "samples"
+PLANNED_ANALYSES = "planned_analyses"
+# Distinct from the seeding lock in startup.py.
+RECONCILE_LOCK_KEY = 0x4C415354  # "LAST"
+
+
+def _status(value) -> str:
+    return getattr(value, "value", value)
+
+
+def count_sample(db: AsyncSession, well_id: str, horizon: str, status, delta: int = 1):
+    """Stage a change to the per-(well, horizon, status) sample count; applied on commit."""
+    _stage(db, (SAMPLES, well_id, horizon, _status(status)), delta)
+
+
+def count_analysis(db: AsyncSession, analysis_type: str, status, delta: int = 1):
+    """Stage a change to the per-(analysis type, status) count; applied on commit."""
+    _stage(db, (PLANNED_ANALYSES, analysis_type, "", _status(status)), delta)
+
+
+def _stage(db: AsyncSession, key: tuple, delta: int):
+    if not db.in_transaction():
+        db.sync_session.begin()
+    db.sync_session.info.setdefault(DELTAS_KEY, Counter())[key] += delta
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(StatusCountModel)
+    return stmt.on_conflict_do_update(
+        index_elements=["entity", "group_a", "group_b", "status"],
+        set_={"count": StatusCountModel.count + stmt.excluded.count},
+    )
+
+
+def _apply_deltas(session: Session):
+    deltas = session.info.pop(DELTAS_KEY, None)
+    # One executemany upsert per commit, however many groups changed. Sorted so
+    # concurrent writers always lock summary rows in the same order.
+    rows = [
+        {"entity": entity, "group_a": group_a, "group_b": group_b, "status": status, "count": delta}
+        for (entity, group_a, group_b, status), delta in sorted((deltas or {}).items())
+        if delta
+    ]
+    if rows:
+        session.execute(_upsert(session.get_bind().dialect.name), rows)
+
+
+event.listen(Session, "before_commit", _apply_deltas)
+event.listen(Session, "after_soft_rollback", lambda s, _: s.info.pop(DELTAS_KEY, None))
+
+
+async def read_stats(db: AsyncSession) -> dict:
+    """Read the summary table; its size depends on the number of groups, not rows."""
+    rows = (
+        await db.execute(
+            select(StatusCountModel)
+            .where(StatusCountModel.count != 0)
+            .order_by(StatusCountModel.entity, StatusCountModel.group_a, StatusCountModel.group_b, StatusCountModel.status)
+        )
+    ).scalars()
+    stats: dict[str, list] = {SAMPLES: [], PLANNED_ANALYSES: []}
+    for row in rows:
+        if row.entity == SAMPLES:
+            stats[SAMPLES].append({"well_id": row.group_a, "horizon": row.group_b, "status": row.status, "count": row.count})
+        else:
+            stats[PLANNED_ANALYSES].append({"analysis_type": row.group_a, "status": row.status, "count": row.count})
+    return stats
+
+
+async def actual_counts(db: AsyncSession) -> Counter:
+    counts: Counter = Counter()
+    samples = select(SampleModel.well_id, SampleModel.horizon, SampleModel.status, func.count()).group_by(
+        SampleModel.well_id, SampleModel.horizon, SampleModel.status
+    )
+    for well_id, horizon, status, count in await db.execute(samples):
+        counts[(SAMPLES, well_id, horizon, _status(status))] = count
+    analyses = select(PlannedAnalysisModel.analysis_type, PlannedAnalysisModel.status, func.count()).group_by(
+        PlannedAnalysisModel.analysis_type, PlannedAnalysisModel.status
+    )
+    for analysis_type, status, count in await db.execute(analyses):
+        counts[(PLANNED_ANALYSES, analysis_type, "", _status(status))] = count
+    return counts
+
+
+async def reconcile(db: AsyncSession) -> int | None:
+    """Recompute the summary from the base tables and repair drifted rows.
+
+    Returns the number of repaired rows, or None if another worker holds the
+    reconcile lock. On Postgres the summary table is locked against writers
+    first, so a write that lands mid-reconcile applies its delta on top of the
+    recomputed count rather than being overwritten by it.
+    """
+    if db.bind.dialect.name == "postgresql":
+        if not await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY}):
+            return None
+        await db.execute(text("LOCK TABLE status_counts IN EXCLUSIVE MODE"))
+    actual = await actual_counts(db)
+    stored = {
+        (r.entity, r.group_a, r.group_b, r.status): r.count
+        for r in (await db.execute(select(StatusCountModel))).scalars()
+    }
+    repaired = 0
+    for key in sorted(set(actual) | set(stored)):
+        expected = actual.get(key, 0)
+        if stored.get(key) == expected or (key not in stored and expected == 0):
+            continue
+        repaired += 1
+        entity, group_a, group_b, status = key
+        where = (
+            StatusCountModel.entity == entity,
+            StatusCountModel.group_a == group_a,
+            StatusCountModel.group_b == group_b,
+            StatusCountModel.status == status,
+        )
+        if expected == 0:
+            await db.execute(delete(StatusCountModel).where(*where))
+        elif key in stored:
+            await db.execute(update(StatusCountModel).where(*where).values(count=expected))
+        else:
+            await db.execute(insert(StatusCountModel).values(entity=entity, group_a=group_a, group_b=group_b, status=status, count=expected))
+    await db.commit()
+    if repaired:
+        logger.warning("Repaired %d drifted status count rows", repaired)
+    return repaired
+
+
+async def reconcile_periodically(session_factory, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await reconcile(db)
+        except Exception:
+            logger.exception("Status count reconciliation failed")
+
+
+STATS_RECONCILE_SECONDS = float(os.getenv("STATS_RECONCILE_SECONDS", "3600"))
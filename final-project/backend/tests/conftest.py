@@ -12,15 +12,36 @@ if TEST_DB_PATH.exists():
     TEST_DB_PATH.unlink()
 
 os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{TEST_DB_PATH}"
+os.environ.setdefault("SQL_BUDGET_MODE", "raise")
+os.environ.setdefault("DB_SCHEMA_MODE", "create")
 
 from backend.main import app  # noqa: E402
-from backend.database import Base, engine  # noqa: E402
 
 
 @pytest.fixture(scope="session")
 def client():
-    Base.metadata.create_all(bind=engine)
+    # Entering the client runs the lifespan, which creates the schema (DB_SCHEMA_MODE=create) and seeds users.
     with TestClient(app) as test_client:
         yield test_client
     if TEST_DB_PATH.exists():
         TEST_DB_PATH.unlink()
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """login(username) -> headers with a bearer token for that user, created on first use.
+
+    New users are warehouse workers whose full name, recorded as the actor
+    of their changes, is the username itself.
+    """
+
+    def headers(username: str) -> dict:
+        res = client.post("/auth/login", json={"username": username, "password": "x", "full_name": username})
+        return {"Authorization": f"Bearer {res.json()['token']}"}
+
+    return headers
+
+
+@pytest.fixture(scope="session")
+def admin(login):
+    return login("admin")
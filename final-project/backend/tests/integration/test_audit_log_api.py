@@ -0,0 +1,28 @@
+def test_sample_history_pages_newest_first(client, login):
+    payload = {"sample_id": "HIST-1", "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-07-01"}
+    assert client.post("/samples", json=payload).status_code == 201
+    for status in ["progress", "review", "done"]:
+        client.patch("/samples/HIST-1", json={"status": status}, headers={"If-Match": "*", **login("historian")})
+
+    res = client.get("/samples/HIST-1/history", params={"limit": 2})
+    assert res.status_code == 200
+    assert [e["details"] for e in res.json()] == ["review->done", "progress->review"]
+
+    res = client.get("/samples/HIST-1/history", params={"limit": 2, "cursor": res.headers["X-Next-Cursor"]})
+    assert [e["details"] for e in res.json()] == ["new->progress"]
+    assert "X-Next-Cursor" not in res.headers
+
+
+def test_audit_log_filters(client, login):
+    payload = {"sample_id": "HIST-2", "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-07-01"}
+    assert client.post("/samples", json=payload).status_code == 201
+    client.patch("/samples/HIST-2", json={"status": "progress"}, headers={"If-Match": "*", **login("filterer")})
+
+    res = client.get("/audit-log", params={"performed_by": "filterer", "entity_type": "sample", "action": "status_change"})
+    entries = res.json()
+    assert [(e["entity_id"], e["details"]) for e in entries] == [("HIST-2", "new->progress")]
+
+    res = client.get("/audit-log", params={"performed_by": "filterer", "performed_from": "2999-01-01"})
+    assert res.json() == []
+
+    assert client.get("/audit-log", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,44 @@
+from sqlalchemy import event, func, select
+
+from backend.audit import audit_entry, audit_writer
+from backend.database import AsyncSessionLocal, async_engine
+from backend.models import AuditLogModel
+
+
+def test_purge_writes_audit_rows_in_one_commit(client, admin):
+    ids = [f"PURGE-{i}" for i in range(20)]
+    for sid in ids:
+        payload = {"sample_id": sid, "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-06-01"}
+        assert client.post("/samples", json=payload).status_code == 201
+
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    event.listen(async_engine.sync_engine, "commit", listener)
+    try:
+        res = client.request("DELETE", "/admin/samples", json={"sample_ids": ids}, headers=admin)
+    finally:
+        event.remove(async_engine.sync_engine, "commit", listener)
+    assert res.json() == {"deleted": 20}
+    assert len(commits) == 1
+
+    res = client.get("/export/audit-log", params={"format": "ndjson", "action": "delete", "performed_by": "Admin User"})
+    assert len(res.text.splitlines()) == 20
+
+
+def test_background_mode_group_commits_after_business_commit(client):
+    async def scenario():
+        audit_writer.mode = "background"
+        try:
+            async with AsyncSessionLocal() as db:
+                audit_writer.stage(db, [audit_entry(entity_type="sample", entity_id="BG-1", action="noop", performed_by="bg")])
+                await db.rollback()
+                audit_writer.stage(db, [audit_entry(entity_type="sample", entity_id=f"BG-{i}", action="bulk", performed_by="bg") for i in range(50)])
+                await db.commit()
+            await audit_writer.flush()
+        finally:
+            audit_writer.mode = "transaction"
+        async with AsyncSessionLocal() as db:
+            stmt = select(AuditLogModel.action, func.count()).where(AuditLogModel.performed_by == "bg").group_by(AuditLogModel.action)
+            return dict((await db.execute(stmt)).all())
+
+    assert client.portal.call(scenario) == {"bulk": 50}
@@ -0,0 +1,70 @@
+from sqlalchemy import event
+
+from backend.database import async_engine
+
+
+def create_samples(client, ids):
+    for sid in ids:
+        payload = {"sample_id": sid, "well_id": "W-BULK", "horizon": "H-BULK", "sampling_date": "2024-06-01"}
+        assert client.post("/samples", json=payload).status_code == 201
+
+
+def count_statements(client, *args, **kwargs):
+    statements = []
+    listener = lambda conn, cursor, statement, *_: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        res = client.post(*args, **kwargs)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return res, statements
+
+
+def test_sample_bulk_update_is_set_based_and_reports_per_item(client, login):
+    ids = [f"BULK-{i}" for i in range(30)]
+    create_samples(client, ids)
+    changes = [{"id": sid, "status": "progress"} for sid in ids[:25]]
+    changes += [{"id": sid, "storage_location": "Cold room", "assigned_to": None} for sid in ids[25:]]
+    changes += [{"id": "BULK-MISSING", "status": "done"}, {"id": ids[0], "status": "review"}]
+
+    res, statements = count_statements(client, "/samples/bulk-update", json={"changes": changes}, headers=login("shift"))
+    assert res.status_code == 200
+    body = res.json()
+    assert body["updated"] == 29
+    results = {r["id"]: r for r in body["results"]}
+    assert results["BULK-MISSING"] == {"id": "BULK-MISSING", "ok": False, "error": "Sample not found"}
+    assert results[ids[0]]["error"] == "Duplicate id in request"
+    # One UPDATE per distinct change set, not one per sample.
+    assert sum(s.startswith("UPDATE samples") for s in statements) == 2
+
+    samples = {s["sample_id"]: s for s in client.get("/samples", params={"horizon": "H-BULK"}).json()}
+    assert samples[ids[1]]["status"] == "progress"
+    assert samples[ids[0]]["status"] == "new"
+    assert samples[ids[26]]["storage_location"] == "Cold room" and samples[ids[26]]["status"] == "new"
+    history = client.get(f"/samples/{ids[1]}/history").json()
+    assert [(h["action"], h["performed_by"], h["details"]) for h in history] == [("status_change", "shift", "new->progress")]
+
+
+def test_sample_bulk_update_rejects_invalid_status(client):
+    res = client.post("/samples/bulk-update", json={"changes": [{"id": "BULK-0", "status": "lost"}]})
+    assert res.status_code == 422
+
+
+def test_planned_analysis_bulk_update_replaces_assignees(client):
+    create_samples(client, ["BULK-PA"])
+    created = [
+        client.post("/planned-analyses", json={"sample_id": "BULK-PA", "analysis_type": t, "assigned_to": ["ann"]}).json()["id"]
+        for t in ("SARA", "IR", "Viscosity")
+    ]
+    changes = [{"id": i, "status": "in_progress", "assigned_to": ["bob", "cy"]} for i in created[:2]]
+    changes.append({"id": created[2], "status": "completed"})
+    changes.append({"id": 999999, "status": "failed"})
+    res = client.post("/planned-analyses/bulk-update", json={"changes": changes})
+    assert res.status_code == 200
+    assert res.json()["updated"] == 3
+    assert res.json()["results"][-1] == {"id": 999999, "ok": False, "error": "Planned analysis not found"}
+
+    rows = {r["id"]: r for r in client.get("/planned-analyses").json() if r["id"] in created}
+    assert rows[created[0]]["status"] == "in_progress"
+    assert rows[created[0]]["assigned_to"] == ["bob", "cy"]
+    assert rows[created[2]] == {**rows[created[2]], "status": "completed", "assigned_to": ["ann"]}
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+from backend.events import broadcaster
+from backend.main import app
+
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        message = queue.get_nowait()
+        messages.append(json.loads(message[1]))
+    return messages
+
+
+def test_mutations_publish_change_events_after_commit(client):
+    queue = broadcaster.subscribe()
+    try:
+        payload = {"sample_id": "EVT-1", "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-06-01"}
+        assert client.post("/samples", json=payload).status_code == 201
+        assert client.patch("/samples/EVT-1", json={"status": "progress", "assigned_to": "lab"}, headers={"If-Match": "*"}).status_code == 200
+        assert client.patch("/samples/EVT-MISSING", json={"status": "done"}, headers={"If-Match": "*"}).status_code == 404
+        res = client.post("/planned-analyses", json={"sample_id": "EVT-1", "analysis_type": "SARA", "assigned_to": ["lab", "qa"]})
+        assert res.status_code == 201
+        assert client.delete("/samples/EVT-1").status_code == 200
+    finally:
+        broadcaster.unsubscribe(queue)
+
+    assert drain(queue) == [
+        {"entity": "sample", "id": "EVT-1", "action": "created", "status": "new"},
+        {"entity": "sample", "id": "EVT-1", "action": "updated", "status": "progress", "assigned_to": "lab"},
+        {"entity": "planned_analysis", "id": res.json()["id"], "action": "created", "sample_id": "EVT-1", "status": "planned", "assigned_to": ["lab", "qa"]},
+        {"entity": "sample", "id": "EVT-1", "action": "deleted"},
+    ]
+
+
+def test_events_endpoint_streams_until_client_disconnects(client):
+    async def scenario():
+        sent = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b"event: change" in message.get("body", b""):
+                disconnected.set()
+
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+                 "path": "/events", "raw_path": b"/events", "root_path": "", "query_string": b"", "headers": [],
+                 "client": ("test", 1), "server": ("test", 80)}
+        task = asyncio.create_task(app(scope, receive, send))
+        while broadcaster.stats()["subscribers"] == 0:
+            await asyncio.sleep(0.01)
+        broadcaster.publish({"entity": "sample", "id": "EVT-2", "action": "updated"})
+        await asyncio.wait_for(task, 5)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["status"] == 200
+    assert dict(sent[0]["headers"])[b"content-type"].startswith(b"text/event-stream")
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    assert body.startswith(b"retry: ")
+    assert b'event: change\ndata: {"entity":"sample","id":"EVT-2","action":"updated"}' in body
+    assert broadcaster.stats()["subscribers"] == 0
@@ -0,0 +1,29 @@
+def test_list_endpoints_answer_304_until_collection_changes(client):
+    res = client.get("/conflicts")
+    etag = res.headers["ETag"]
+    assert client.get("/conflicts", headers={"If-None-Match": etag}).status_code == 304
+
+    # Writes to another collection leave the ETag alone.
+    client.post("/action-batches", json={"title": "Flush line", "date": "2024-08-01"})
+    assert client.get("/conflicts", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/conflicts", json={"old_payload": "a", "new_payload": "b"})
+    res = client.get("/conflicts", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
+def test_sample_etag_depends_on_query_and_writes(client):
+    etag_all = client.get("/samples").headers["ETag"]
+    etag_filtered = client.get("/samples", params={"horizon": "H-ETAG"}).headers["ETag"]
+    assert etag_all != etag_filtered
+
+    payload = {"sample_id": "ETAG-1", "well_id": "W-1", "horizon": "H-ETAG", "sampling_date": "2024-08-01"}
+    client.post("/samples", json=payload)
+    res = client.get("/samples", params={"horizon": "H-ETAG"}, headers={"If-None-Match": etag_filtered})
+    assert res.status_code == 200
+    assert [s["sample_id"] for s in res.json()] == ["ETAG-1"]
+
+    etag = res.headers["ETag"]
+    client.patch("/samples/ETAG-1", json={"storage_location": "Shelf Z"}, headers={"If-Match": "*"})
+    assert client.get("/samples", params={"horizon": "H-ETAG"}, headers={"If-None-Match": etag}).status_code == 200
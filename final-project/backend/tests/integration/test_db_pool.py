@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.db_pool import InstrumentedAsyncPool, instrument, pool_stats
+
+
+def test_db_pool_reports_checkouts_and_wait_time(client, admin):
+    assert client.get("/admin/db-pool").status_code == 403
+
+    client.get("/samples")
+    stats = client.get("/admin/db-pool", headers=admin).json()
+    assert stats["pool_class"] == "InstrumentedAsyncPool"
+    assert stats["checkouts"] >= 1
+    assert stats["checked_out"] == 0
+    assert stats["timeouts"] == 0
+    assert stats["wait_seconds_max"] >= stats["wait_seconds_avg"] >= 0
+    assert stats["max_overflow"] == 10
+    assert stats["connect_seconds_total"] > 0
+
+
+def test_every_checkout_goes_through_the_timed_connect(tmp_path):
+    # Fails if SQLAlchemy stops routing engine checkouts through Pool.connect()
+    # or stops firing do_connect/connect, which the wait and connect times rely on.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=InstrumentedAsyncPool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    instrument(engine.sync_engine)
+
+    async def exercise():
+        before = (pool_stats.checkouts, pool_stats.timed_checkouts, pool_stats.timeouts, pool_stats.connect_seconds_total)
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        async with engine.connect():
+            pass
+        await engine.dispose()
+        return before
+
+    checkouts, timed, timeouts, connect_seconds = asyncio.run(exercise())
+    assert pool_stats.checkouts - checkouts == 2
+    assert pool_stats.timed_checkouts - timed == 3
+    assert pool_stats.timeouts - timeouts == 1
+    assert pool_stats.wait_seconds_max >= 0.05
+    assert pool_stats.connect_seconds_total > connect_seconds
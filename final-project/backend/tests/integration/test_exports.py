@@ -0,0 +1,40 @@
+import csv
+import gzip
+import io
+import json
+
+
+def create_sample(client, sample_id, well_id):
+    payload = {"sample_id": sample_id, "well_id": well_id, "horizon": "H-EXP", "sampling_date": "2024-05-01"}
+    assert client.post("/samples", json=payload).status_code == 201
+
+
+def test_sample_export_streams_filtered_csv(client):
+    create_sample(client, "EXP-1", "W-EXP")
+    create_sample(client, "EXP-2", "W-OTHER")
+    res = client.get("/export/samples", params={"horizon": "H-EXP", "well_id": "W-EXP"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [r["sample_id"] for r in rows] == ["EXP-1"]
+    assert rows[0]["status"] == "new"
+
+
+def test_planned_analysis_export_ndjson_gzip(client):
+    create_sample(client, "EXP-3", "W-EXP")
+    payload = {"sample_id": "EXP-3", "analysis_type": "Viscosity", "assigned_to": ["Dr. Lee", "Dr. Kim"]}
+    analysis = client.post("/planned-analyses", json=payload).json()
+
+    with client.stream("GET", "/export/planned-analyses", params={"format": "ndjson", "gzip": "true"}) as res:
+        assert res.headers["content-encoding"] == "gzip"
+        raw = b"".join(res.iter_raw())
+    rows = [json.loads(line) for line in gzip.decompress(raw).decode().splitlines()]
+    assert {"id": analysis["id"], "sample_id": "EXP-3", "analysis_type": "Viscosity", "status": "planned", "assigned_to": ["Dr. Lee", "Dr. Kim"]} in rows
+
+
+def test_audit_log_export_filters_by_entity(client, login):
+    create_sample(client, "EXP-4", "W-EXP")
+    client.patch("/samples/EXP-4", json={"status": "review"}, headers={"If-Match": "*", **login("auditor")})
+    res = client.get("/export/audit-log", params={"format": "ndjson", "entity_id": "EXP-4"})
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [(r["action"], r["performed_by"], r["details"]) for r in rows] == [("status_change", "auditor", "new->review")]
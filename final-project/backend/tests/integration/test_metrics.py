@@ -0,0 +1,24 @@
+def test_metrics_expose_route_latency_and_db_usage(client):
+    client.get("/samples/METRICS-MISSING")
+    client.get("/samples/METRICS-MISSING")
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+
+    labels = 'method="GET",route="/samples/{sample_id}"'
+    assert f'labsync_http_requests_total{{{labels},status="404"}} 2' in body
+    assert f'labsync_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in body
+    assert f"labsync_http_request_duration_seconds_count{{{labels}}} 2" in body
+    assert f"labsync_http_request_errors_total{{{labels}}} 0" in body
+    # One primary-key lookup per request.
+    assert f"labsync_db_statements_total{{{labels}}} 2" in body
+    assert "labsync_db_pool_checkouts " in body
+    assert "labsync_cache_hits " in body
+
+
+def test_unmatched_paths_share_one_series(client):
+    client.get("/no-such-endpoint-1")
+    client.get("/no-such-endpoint-2")
+    body = client.get("/metrics").text
+    assert 'route="<unmatched>",status="404"} 2' in body
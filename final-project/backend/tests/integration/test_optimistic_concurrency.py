@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+from backend.database import AsyncSessionLocal
+from backend.main import compare_and_swap
+from backend.models import SampleModel
+
+
+def add_sample(client, sample_id):
+    payload = {"sample_id": sample_id, "well_id": "W-OCC", "horizon": "H1", "sampling_date": "2025-01-01"}
+    assert client.post("/samples", json=payload).status_code == 201
+
+
+def test_stale_if_match_is_rejected_and_queued_as_a_conflict(client, login):
+    add_sample(client, "OCC-1")
+    first = client.get("/samples/OCC-1")
+    assert first.headers["ETag"] == '"1"' and first.json()["version"] == 1
+
+    res = client.patch("/samples/OCC-1", json={"status": "progress"}, headers={"If-Match": '"1"'})
+    assert res.status_code == 200 and res.headers["ETag"] == '"2"' and res.json()["version"] == 2
+
+    # A second client still holding version 1.
+    stale = client.patch("/samples/OCC-1", json={"status": "done"}, headers={"If-Match": '"1"', **login("Late Lee")})
+    assert stale.status_code == 412 and stale.headers["ETag"] == '"2"'
+    detail = stale.json()["detail"]
+    assert detail["current"]["status"] == "progress"
+    assert client.get("/samples/OCC-1").json()["status"] == "progress"
+
+    conflict = next(c for c in client.get("/conflicts").json() if c["id"] == detail["conflict_id"])
+    assert conflict["status"] == "open"
+    assert json.loads(conflict["old_payload"])["version"] == 2
+    attempted = json.loads(conflict["new_payload"])
+    assert attempted == {"entity_type": "sample", "entity_id": "OCC-1", "if_match": ['"1"'], "changes": {"status": "done"}, "performed_by": "Late Lee"}
+    # A weak tag names the same version.
+    assert client.patch("/samples/OCC-1", json={"status": "review"}, headers={"If-Match": 'W/"2"'}).json()["version"] == 3
+    # Without If-Match nothing is written; "*" applies to whatever version it reads.
+    missing = client.patch("/samples/OCC-1", json={"status": "done"})
+    assert missing.status_code == 428 and client.get("/samples/OCC-1").json()["status"] == "review"
+    assert client.patch("/samples/OCC-1", json={"status": "done"}, headers={"If-Match": "*"}).json()["version"] == 4
+
+
+def test_planned_analysis_versions_and_bulk_updates(client):
+    add_sample(client, "OCC-2")
+    analysis = client.post("/planned-analyses", json={"sample_id": "OCC-2", "analysis_type": "IR"}).json()
+    assert analysis["version"] == 1
+    url = f"/planned-analyses/{analysis['id']}"
+    res = client.patch(url, json={"assigned_to": ["ann"]}, headers={"If-Match": '"1"'})
+    assert res.status_code == 200 and res.json()["assigned_to"] == ["ann"] and res.headers["ETag"] == '"2"'
+
+    bulk = client.post("/planned-analyses/bulk-update", json={"changes": [{"id": analysis["id"], "status": "in_progress"}]})
+    assert bulk.json()["updated"] == 1
+    stale = client.patch(url, json={"status": "failed"}, headers={"If-Match": '"2"'})
+    assert stale.status_code == 412 and stale.json()["detail"]["current"]["version"] == 3
+    assert client.patch(url, json={"status": "review"}, headers={"If-Match": '"3", "4"'}).json()["status"] == "review"
+
+
+def test_concurrent_writers_from_one_version_only_one_wins(client):
+    add_sample(client, "OCC-3")
+
+    async def race():
+        async with AsyncSessionLocal() as a, AsyncSessionLocal() as b:
+            key = SampleModel.sample_id == "OCC-3"
+            won = await compare_and_swap(a, SampleModel, key, 1, {"storage_location": "Rack A"})
+            await a.commit()
+            lost = await compare_and_swap(b, SampleModel, key, 1, {"storage_location": "Rack B"})
+            await b.rollback()
+            return won.version, lost
+
+    assert asyncio.run(race()) == (2, None)
+    assert client.get("/samples/OCC-3").json()["storage_location"] == "Rack A"
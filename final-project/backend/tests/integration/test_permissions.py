@@ -0,0 +1,89 @@
+from backend import permissions
+from backend.tokens import revocations, verify_token
+
+
+def bearer(client, username):
+    token = client.post("/auth/login", json={"username": username, "password": "x"}).json()["token"]
+    return verify_token(token)["sub"], {"Authorization": f"Bearer {token}"}
+
+
+def admin(client):
+    return bearer(client, "admin")[1]
+
+
+def test_token_permissions_follow_role_changes_after_login(client):
+    user_id, auth = bearer(client, "perm.user")
+    res = client.get("/admin/db-pool", headers=auth)
+    assert res.status_code == 403 and res.json()["detail"] == "Missing permission: view_db_pool"
+
+    client.patch(f"/admin/users/{user_id}", json={"roles": ["lab_operator", "admin", "lab_operator"]}, headers=admin(client))
+    # The old token still says warehouse_worker, so it is revoked.
+    res = client.get("/admin/db-pool", headers=auth)
+    assert res.status_code == 401 and res.json()["detail"] == "Token revoked"
+    _, auth = bearer(client, "perm.user")
+    assert client.get("/admin/db-pool", headers=auth).status_code == 200
+    assert client.post("/admin/stats/reconcile", headers=auth).status_code == 200
+    assert client.get("/admin/db-pool", headers={"Authorization": "Bearer not.signed"}).status_code == 401
+
+
+def test_me_reads_the_token_without_a_lookup(client):
+    user_id, auth = bearer(client, "perm.me")
+    me = client.get("/auth/me", headers=auth).json()
+    assert me["roles"] == ["warehouse_worker"] and me["full_name"] == "Perm Me"
+    # Same answer through the query parameter older clients use.
+    assert client.get("/auth/me", params={"authorization": auth["Authorization"]}).json() == me
+    client.patch(f"/admin/users/{user_id}", json={"roles": ["lab_operator", "admin"]}, headers=admin(client))
+    assert client.get("/auth/me", headers=auth).status_code == 401
+    _, auth = bearer(client, "perm.me")
+    me = client.get("/auth/me", headers=auth).json()
+    assert me["roles"] == ["lab_operator", "admin"] and me["role"] == "lab_operator"
+
+
+def test_token_user_is_recorded_as_the_actor(client):
+    _, auth = bearer(client, "perm.actor")
+    conflict = client.post("/conflicts", json={"old_payload": "a", "new_payload": "b"}).json()
+    client.patch(f"/conflicts/{conflict['id']}", json={"status": "resolved"}, headers={**auth, "X-User": "someone else"})
+    entries = client.get("/audit-log", params={"entity_type": "conflict", "entity_id": str(conflict["id"])}).json()
+    assert [e["performed_by"] for e in entries] == ["Perm Actor"]
+
+
+def test_roles_are_stored_in_order_one_row_each(client):
+    user_id, _ = bearer(client, "perm.order")
+    auth = admin(client)
+    updated = client.patch(f"/admin/users/{user_id}", json={"roles": ["action_supervision", "lab_operator"]}, headers=auth).json()
+    assert updated["role"] == "action_supervision" and updated["roles"] == ["action_supervision", "lab_operator"]
+    client.patch(f"/admin/users/{user_id}", json={"roles": ["lab_operator", "admin"]}, headers=auth)
+    users = {u["username"]: u for u in client.get("/admin/users", headers=auth).json()}
+    assert users["perm.order"]["roles"] == ["lab_operator", "admin"]
+    assert users["admin"]["roles"] == ["admin"]
+
+
+def test_managing_users_needs_the_permission(client):
+    user_id, auth = bearer(client, "perm.self")
+    res = client.patch(f"/admin/users/{user_id}", json={"roles": ["admin"]}, headers=auth)
+    assert res.status_code == 403 and res.json()["detail"] == "Missing permission: manage_users"
+    assert client.get("/admin/users", headers=auth).status_code == 403
+    assert client.get("/admin/users").status_code == 403
+    assert client.get("/auth/me", headers=auth).json()["roles"] == ["warehouse_worker"]
+
+
+def test_role_headers_are_ignored_outside_dev_mode(client, monkeypatch):
+    assert client.get("/admin/db-pool", headers={"X-Role": "admin"}).status_code == 403
+    conflict = client.post("/conflicts", json={"old_payload": "a", "new_payload": "b"}).json()
+    client.patch(f"/conflicts/{conflict['id']}", json={"status": "resolved"}, headers={"X-User": "spoofed"})
+    entries = client.get("/audit-log", params={"entity_type": "conflict", "entity_id": str(conflict["id"])}).json()
+    assert [e["performed_by"] for e in entries] == [None]
+
+    monkeypatch.setattr(permissions, "AUTH_DEV_MODE", True)
+    assert client.get("/admin/db-pool", headers={"X-Roles": "lab_operator,Admin"}).status_code == 200
+    assert client.get("/admin/db-pool", headers={"X-Role": "lab_operator"}).status_code == 403
+
+
+def test_refresh_reissues_the_token_with_current_roles(client):
+    user_id, auth = bearer(client, "perm.refresh")
+    client.patch(f"/admin/users/{user_id}", json={"roles": ["lab_operator"]}, headers=admin(client))
+    # A worker that never saw the revocation still accepts the old token.
+    revocations.invalidate(str(user_id))
+    refreshed = client.post("/auth/refresh", headers=auth).json()
+    assert refreshed["roles"] == ["lab_operator"] and verify_token(refreshed["token"])["roles"] == ["lab_operator"]
+    assert client.post("/auth/refresh").status_code == 401
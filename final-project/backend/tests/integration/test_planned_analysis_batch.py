@@ -0,0 +1,51 @@
+from sqlalchemy import event
+
+from backend.database import async_engine
+
+
+def test_batch_creates_pairs_in_bulk_and_skips_duplicates(client):
+    ids = [f"BATCH-{i:03d}" for i in range(300)]
+    lines = ["sample_id,well_id,horizon,sampling_date"] + [f"{sid},W-B,H-B,2024-06-01" for sid in ids]
+    assert client.post("/samples/import", content="\n".join(lines), headers={"Content-Type": "text/csv"}).json()["imported"] == 300
+    existing = client.post("/planned-analyses", json={"sample_id": ids[0], "analysis_type": "SARA"}).json()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *_: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        res = client.post(
+            "/planned-analyses/batch",
+            json={"sample_ids": ids + ["BATCH-MISSING"], "analysis_types": ["SARA", "IR"], "assigned_to": ["ann", "bob"]},
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert res.status_code == 201
+    body = res.json()
+    assert len(body["created"]) == 599
+    assert body["created"][0] == {"id": body["created"][0]["id"], "sample_id": ids[0], "analysis_type": "IR", "status": "planned", "assigned_to": ["ann", "bob"], "version": 1}
+    assert body["skipped"] == [
+        {"sample_id": ids[0], "analysis_type": "SARA", "reason": "Already planned"},
+        {"sample_id": "BATCH-MISSING", "analysis_type": "SARA", "reason": "Sample not found"},
+        {"sample_id": "BATCH-MISSING", "analysis_type": "IR", "reason": "Sample not found"},
+    ]
+    # Two lookups, then bulk inserts; nothing scales with the number of pairs.
+    inserts = [s for s in statements if s.startswith("INSERT INTO planned_analyses ")]
+    assert len(inserts) == 1
+    assert len(statements) <= 8
+
+    listed = {r["id"]: r for r in client.get("/planned-analyses").json()}
+    assert listed[existing["id"]]["analysis_type"] == "SARA"
+    assert all(listed[row["id"]]["assigned_to"] == ["ann", "bob"] for row in body["created"])
+
+    again = client.post("/planned-analyses/batch", json={"sample_ids": ids[:5], "analysis_types": ["IR"]})
+    assert again.json()["created"] == []
+    assert len(again.json()["skipped"]) == 5
+
+
+def test_batch_applies_allowed_type_rule(client, admin):
+    res = client.post("/planned-analyses/batch", json={"sample_ids": ["BATCH-000"], "analysis_types": ["SARA", "NMR"]})
+    assert res.status_code == 403
+    res = client.post("/planned-analyses/batch", json={"sample_ids": ["BATCH-000"], "analysis_types": ["NMR"]}, headers=admin)
+    assert res.status_code == 201
+    assert [r["analysis_type"] for r in res.json()["created"]] == ["NMR"]
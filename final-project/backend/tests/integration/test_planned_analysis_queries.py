@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from backend.database import async_engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_planned_analysis_list_query_count_is_constant(client):
+    sample = {"sample_id": "NPLUS1-1", "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-03-01"}
+    assert client.post("/samples", json=sample).status_code == 201
+
+    def create_analyses(count):
+        for _ in range(count):
+            payload = {"sample_id": "NPLUS1-1", "analysis_type": "IR", "assigned_to": ["Dr. Lee", "Dr. Kim"]}
+            assert client.post("/planned-analyses", json=payload).status_code == 201
+
+    create_analyses(1)
+    with count_statements() as small:
+        res = client.get("/planned-analyses")
+    assert res.status_code == 200
+
+    create_analyses(10)
+    with count_statements() as large:
+        res = client.get("/planned-analyses")
+    mine = [a for a in res.json() if a["sample_id"] == "NPLUS1-1"]
+    assert len(mine) == 11
+    assert all(a["assigned_to"] == ["Dr. Lee", "Dr. Kim"] for a in mine)
+    assert len(large) == len(small)
+
+
+def test_reassigning_keeps_requested_order(client):
+    sample = {"sample_id": "NPLUS1-2", "well_id": "W-1", "horizon": "H1", "sampling_date": "2024-03-01"}
+    assert client.post("/samples", json=sample).status_code == 201
+    payload = {"sample_id": "NPLUS1-2", "analysis_type": "SARA", "assigned_to": ["A", "B"]}
+    analysis = client.post("/planned-analyses", json=payload).json()
+
+    res = client.patch(f"/planned-analyses/{analysis['id']}", json={"assigned_to": ["B", "C", "A"]}, headers={"If-Match": "*"})
+    assert res.status_code == 200
+    assert res.json()["assigned_to"] == ["B", "C", "A"]
+    res = client.patch(f"/planned-analyses/{analysis['id']}", json={"assigned_to": []}, headers={"If-Match": "*"})
+    assert res.json()["assigned_to"] == []
@@ -0,0 +1,14 @@
+from backend.cache import FILTER_METHODS_KEY, reference_cache
+
+
+def test_filter_methods_are_cached_until_updated(client, admin):
+    client.put("/filter-methods", json={"methods": ["SARA"]}, headers=admin)
+    assert client.get("/filter-methods").json() == {"methods": ["SARA"]}
+    hits = reference_cache.hits
+    assert client.get("/filter-methods").json() == {"methods": ["SARA"]}
+    assert reference_cache.hits == hits + 1
+
+    client.put("/filter-methods", json={"methods": ["SARA", "IR"]}, headers=admin)
+    assert reference_cache.get(FILTER_METHODS_KEY) is None
+    assert client.get("/filter-methods").json() == {"methods": ["SARA", "IR"]}
+
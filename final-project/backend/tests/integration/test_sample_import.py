@@ -0,0 +1,83 @@
+import json
+
+
+def test_csv_import_reports_row_errors(client):
+    body = "\n".join(
+        [
+            "sample_id,well_id,horizon,sampling_date,status,storage_location",
+            "IMP-1,W-1,H1,2024-04-01,new,Shelf A",
+            "IMP-2,W-1,H1,2024-04-02,,",
+            "IMP-3,W-1,H1,2024-04-03,bogus,",
+            "IMP-1,W-1,H1,2024-04-01,new,",
+            "IMP-4,W-1",
+        ]
+    )
+    res = client.post("/samples/import", content=body, headers={"Content-Type": "text/csv"})
+    assert res.status_code == 200
+    report = res.json()
+    assert report["imported"] == 2
+    assert [(e["line"], e["sample_id"]) for e in report["errors"]] == [(4, "IMP-3"), (5, "IMP-1"), (6, None)]
+
+    res = client.get("/samples/IMP-2")
+    assert res.json()["status"] == "new"
+    assert res.json()["storage_location"] is None
+
+
+def test_ndjson_import_skips_existing_samples(client):
+    rows = [
+        {"sample_id": "IMPJ-1", "well_id": "W-2", "horizon": "H2", "sampling_date": "2024-04-01", "assigned_to": "Alex"},
+        {"sample_id": "IMPJ-2", "well_id": "W-2", "horizon": "H2", "sampling_date": "24"},
+    ]
+    body = "\n".join(json.dumps(r) for r in rows) + "\nnot json\n"
+    res = client.post("/samples/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    report = res.json()
+    assert report["imported"] == 1
+    assert report["failed"] == 2
+    assert client.get("/samples/IMPJ-1").json()["assigned_to"] == "Alex"
+
+    res = client.post("/samples/import?format=ndjson", content=json.dumps(rows[0]))
+    assert res.json()["imported"] == 0
+    assert res.json()["errors"][0]["error"] == "Sample exists"
+
+
+def test_import_rejects_unknown_content_type(client):
+    res = client.post("/samples/import", content="x", headers={"Content-Type": "text/plain"})
+    assert res.status_code == 415
+
+
+def test_import_reports_lines_that_are_not_utf8(client):
+    body = b"sample_id,well_id,horizon,sampling_date\nIMPU-1,W-3,H1,2024-04-01\nIMPU-2,W-\xff,H1,2024-04-01\nIMPU-3,W-3,H1,2024-04-01\n"
+    res = client.post("/samples/import", content=body, headers={"Content-Type": "text/csv"})
+    assert res.status_code == 200
+    report = res.json()
+    assert report["imported"] == 2
+    assert report["errors"] == [{"line": 3, "sample_id": None, "error": "invalid UTF-8 at byte 9"}]
+
+
+def test_import_retries_chunk_when_sample_is_created_concurrently(client, monkeypatch):
+    from datetime import date
+
+    from sqlalchemy import insert
+
+    from backend import sample_import
+    from backend.database import SessionLocal
+    from backend.models import SampleModel, SampleStatus
+
+    original = sample_import.insert_samples
+    calls = []
+
+    async def racing_insert(db, rows):
+        if not calls:
+            with SessionLocal() as other:
+                other.execute(insert(SampleModel).values(sample_id="IMPR-2", well_id="W-4", horizon="H1", sampling_date=date(2024, 4, 1), status=SampleStatus.new))
+                other.commit()
+        calls.append(len(rows))
+        await original(db, rows)
+
+    monkeypatch.setattr(sample_import, "insert_samples", racing_insert)
+    rows = [{"sample_id": f"IMPR-{i}", "well_id": "W-4", "horizon": "H1", "sampling_date": "2024-04-01"} for i in range(1, 4)]
+    res = client.post("/samples/import?format=ndjson", content="\n".join(json.dumps(r) for r in rows))
+    assert res.status_code == 200
+    assert calls == [3, 2]
+    assert res.json()["imported"] == 2
+    assert res.json()["errors"] == [{"line": 2, "sample_id": "IMPR-2", "error": "Sample exists"}]
@@ -0,0 +1,61 @@
+import backend.main
+
+
+def test_samples_are_paged_by_cursor_and_filtered(client):
+    for i in range(5):
+        res = client.post(
+            "/samples",
+            json={
+                "sample_id": f"PAGE-{i}",
+                "well_id": "W-PAGE" if i % 2 == 0 else "W-OTHER",
+                "horizon": "H-PAGE",
+                "sampling_date": f"2024-02-0{i + 1}",
+                "status": "new",
+            },
+        )
+        assert res.status_code == 201
+
+    res = client.get("/samples", params={"horizon": "H-PAGE", "limit": 2})
+    assert [s["sample_id"] for s in res.json()] == ["PAGE-0", "PAGE-1"]
+    cursor = res.headers["X-Next-Cursor"]
+
+    res = client.get("/samples", params={"horizon": "H-PAGE", "limit": 2, "cursor": cursor})
+    assert [s["sample_id"] for s in res.json()] == ["PAGE-2", "PAGE-3"]
+
+    res = client.get("/samples", params={"horizon": "H-PAGE", "limit": 2, "cursor": res.headers["X-Next-Cursor"]})
+    assert [s["sample_id"] for s in res.json()] == ["PAGE-4"]
+    assert "X-Next-Cursor" not in res.headers
+
+    res = client.get(
+        "/samples",
+        params={"well_id": "W-PAGE", "sampling_date_from": "2024-02-02", "sampling_date_to": "2024-02-05"},
+    )
+    assert [s["sample_id"] for s in res.json()] == ["PAGE-2", "PAGE-4"]
+
+
+def test_fast_list_path_is_byte_identical(client, monkeypatch):
+    for i, (location, assignee) in enumerate([("Rack 3 / Shelf 1", None), ("Schrank Ü   \"7\"", "Zoë"), (None, "Олег \U0001f9ea")]):
+        payload = {
+            "sample_id": f"FAST-{i}",
+            "well_id": "W-FAST",
+            "horizon": "H1",
+            "sampling_date": f"2024-03-0{i + 1}",
+            "storage_location": location,
+            "assigned_to": assignee,
+        }
+        assert client.post("/samples", json=payload).status_code == 201
+    client.patch("/samples/FAST-1", json={"status": "review"}, headers={"If-Match": "*"})
+
+    def fetch(fast: bool, **params):
+        monkeypatch.setattr(backend.main, "FAST_JSON_LISTS", fast)
+        return client.get("/samples", params={"well_id": "W-FAST", **params})
+
+    for params in [{}, {"limit": 2}, {"limit": 2, "cursor": "FAST-1"}]:
+        slow, fast = fetch(False, **params), fetch(True, **params)
+        assert fast.content == slow.content
+        assert fast.headers["content-type"] == slow.headers["content-type"] == "application/json"
+        assert fast.headers["ETag"] == slow.headers["ETag"]
+        assert fast.headers.get("X-Next-Cursor") == slow.headers.get("X-Next-Cursor")
+    assert fetch(True, limit=2).headers["X-Next-Cursor"] == "FAST-1"
+    etag = fetch(True).headers["ETag"]
+    assert client.get("/samples", params={"well_id": "W-FAST"}, headers={"If-None-Match": etag}).status_code == 304
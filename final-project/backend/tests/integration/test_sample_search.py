@@ -0,0 +1,89 @@
+def add(client, sample_id, well_id, horizon="H1", **extra):
+    payload = {"sample_id": sample_id, "well_id": well_id, "horizon": horizon, "sampling_date": "2024-07-01", **extra}
+    assert client.post("/samples", json=payload).status_code == 201
+
+
+def ids(response):
+    return [r["sample_id"] for r in response.json()]
+
+
+def test_search_matches_word_prefixes_across_fields(client):
+    add(client, "SRCH-1", "W-7731", "Bazhenov", storage_location="Rack Q9", assigned_to="qsearcher")
+    add(client, "SRCH-2", "W-7732", "Achimov")
+
+    assert set(ids(client.get("/samples/search", params={"q": "7731"}))) == {"SRCH-1"}
+    assert set(ids(client.get("/samples/search", params={"q": "w-773"}))) == {"SRCH-1", "SRCH-2"}
+    assert ids(client.get("/samples/search", params={"q": "bazh"})) == ["SRCH-1"]
+    assert ids(client.get("/samples/search", params={"q": "rack q9"})) == ["SRCH-1"]
+    assert ids(client.get("/samples/search", params={"q": "qsearch 7731"})) == ["SRCH-1"]
+    # Every term has to match, and FTS syntax in the query is taken literally.
+    assert ids(client.get("/samples/search", params={"q": "achimov 7731"})) == []
+    assert ids(client.get("/samples/search", params={"q": "srch-2 OR NEAR"})) == []
+    assert client.get("/samples/search", params={"q": "--"}).json() == []
+
+
+def test_search_follows_updates_and_deletes(client, admin):
+    add(client, "SRCH-3", "W-8841")
+    client.patch("/samples/SRCH-3", json={"assigned_to": "zelda"}, headers={"If-Match": "*"})
+    client.post("/samples/bulk-update", json={"changes": [{"id": "SRCH-3", "storage_location": "Shelf Z12"}]})
+    assert ids(client.get("/samples/search", params={"q": "zelda shelf"})) == ["SRCH-3"]
+
+    client.patch("/samples/SRCH-3", json={"assigned_to": "yuri"}, headers={"If-Match": "*"})
+    assert ids(client.get("/samples/search", params={"q": "zelda"})) == []
+    assert ids(client.get("/samples/search", params={"q": "yuri"})) == ["SRCH-3"]
+
+    client.request("DELETE", "/admin/samples", json={"sample_ids": ["SRCH-3"]}, headers=admin)
+    assert ids(client.get("/samples/search", params={"q": "8841"})) == []
+
+
+def test_search_ranks_and_paginates(client):
+    rows = "\n".join(f"SRCH-P{i:02d},W-9950,H{i % 3}" + (",2024-07-01,new,,pagerank" if i == 7 else ",2024-07-01,new,,") for i in range(25))
+    client.post("/samples/import", content="sample_id,well_id,horizon,sampling_date,status,storage_location,assigned_to\n" + rows, headers={"Content-Type": "text/csv"})
+
+    # The sample matching both terms in more fields ranks first.
+    assert ids(client.get("/samples/search", params={"q": "9950 pagerank"})) == ["SRCH-P07"]
+
+    first = client.get("/samples/search", params={"q": "9950", "limit": 10})
+    assert len(first.json()) == 10 and first.headers["X-Next-Cursor"] == "10"
+    second = client.get("/samples/search", params={"q": "9950", "limit": 10, "cursor": "10"})
+    third = client.get("/samples/search", params={"q": "9950", "limit": 10, "cursor": second.headers["X-Next-Cursor"]})
+    assert "X-Next-Cursor" not in third.headers
+    seen = ids(first) + ids(second) + ids(third)
+    assert sorted(seen) == [f"SRCH-P{i:02d}" for i in range(25)]
+
+    assert client.get("/samples/search", params={"q": "9950", "limit": 1000}).status_code == 422
+    assert client.get("/samples/search").status_code == 422
+
+
+def test_search_pages_past_ranked_candidates(client, monkeypatch):
+    from backend import search
+
+    monkeypatch.setattr(search, "SEARCH_CANDIDATES", 5)
+    rows = "\n".join(f"SRCH-C{i:02d},W-9960,H1,2024-07-01,new,," for i in range(12))
+    client.post("/samples/import", content="sample_id,well_id,horizon,sampling_date,status,storage_location,assigned_to\n" + rows, headers={"Content-Type": "text/csv"})
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        res = client.get("/samples/search", params={"q": "9960", "limit": 4, **({"cursor": cursor} if cursor else {})})
+        seen += ids(res)
+        pages += 1
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == 3
+    # The newest five are ranked (ties by id); older matches follow newest first.
+    assert seen == [f"SRCH-C{i:02d}" for i in (7, 8, 9, 10, 11, 6, 5, 4, 3, 2, 1, 0)]
+
+    # Editing an old sample does not move it to the front.
+    client.patch("/samples/SRCH-C01", json={"assigned_to": "zoe"}, headers={"If-Match": "*"})
+    tail = client.get("/samples/search", params={"q": "9960", "limit": 4, "cursor": "8"})
+    assert ids(tail) == ["SRCH-C03", "SRCH-C02", "SRCH-C01", "SRCH-C00"]
+
+
+def test_search_ranks_whole_words_and_identifiers_first(client):
+    add(client, "SRCH-R1", "W-4410", storage_location="Rack 5521")
+    add(client, "SRCH-R2", "W-55210")
+    add(client, "SRCH-R3", "W-5521")
+
+    # A whole well id beats a prefix of one, which beats a whole storage word.
+    assert ids(client.get("/samples/search", params={"q": "5521"})) == ["SRCH-R3", "SRCH-R2", "SRCH-R1"]
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.startup import SchemaOutOfDate, alembic_heads, prepare_schema, seed_default_users
+
+PROJECT_DIR = Path(__file__).resolve().parents[3]
+
+
+def test_importing_the_app_does_not_touch_the_database(tmp_path):
+    db_path = tmp_path / "import.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite+pysqlite:///{db_path}"}
+    subprocess.run([sys.executable, "-c", "import backend.main"], cwd=PROJECT_DIR, env=env, check=True)
+    assert not db_path.exists()
+
+
+def test_check_mode_requires_the_alembic_head(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'check.db'}")
+        try:
+            with pytest.raises(SchemaOutOfDate, match="alembic upgrade head"):
+                await prepare_schema(engine, "check")
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+                await conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": next(iter(alembic_heads()))})
+            await prepare_schema(engine, "check")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_workers_seed_users_once(tmp_path):
+    async def scenario():
+        engines = [create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'seed.db'}") for _ in range(4)]
+        try:
+            await prepare_schema(engines[0], "create")
+            seeded = await asyncio.gather(*(seed_default_users(e) for e in engines))
+            async with engines[0].connect() as conn:
+                users = await conn.scalar(text("SELECT count(*) FROM users"))
+        finally:
+            for e in engines:
+                await e.dispose()
+        return seeded, users
+
+    seeded, users = asyncio.run(scenario())
+    assert seeded.count(True) == 1
+    assert users == 4
@@ -0,0 +1,55 @@
+import asyncio
+
+from sqlalchemy import update
+
+from backend.database import AsyncSessionLocal
+from backend.models import StatusCountModel
+
+
+def sample_counts(client, well_id):
+    return {(r["horizon"], r["status"]): r["count"] for r in client.get("/stats").json()["samples"] if r["well_id"] == well_id}
+
+
+def analysis_counts(client, analysis_type):
+    return {r["status"]: r["count"] for r in client.get("/stats").json()["planned_analyses"] if r["analysis_type"] == analysis_type}
+
+
+def test_write_paths_keep_counts_current(client, admin):
+    for i in range(4):
+        payload = {"sample_id": f"STAT-{i}", "well_id": "W-STAT", "horizon": "H1" if i < 3 else "H2", "sampling_date": "2024-06-01"}
+        assert client.post("/samples", json=payload).status_code == 201
+    client.post("/samples/import", content="sample_id,well_id,horizon,sampling_date,status\nSTAT-9,W-STAT,H2,2024-06-01,done", headers={"Content-Type": "text/csv"})
+    assert sample_counts(client, "W-STAT") == {("H1", "new"): 3, ("H2", "new"): 1, ("H2", "done"): 1}
+
+    client.patch("/samples/STAT-0", json={"status": "progress"}, headers={"If-Match": "*"})
+    client.post("/samples/bulk-update", json={"changes": [{"id": "STAT-1", "status": "done"}, {"id": "STAT-3", "status": "done"}]})
+    client.request("DELETE", "/admin/samples", json={"sample_ids": ["STAT-9"]}, headers=admin)
+    assert sample_counts(client, "W-STAT") == {("H1", "new"): 1, ("H1", "progress"): 1, ("H1", "done"): 1, ("H2", "done"): 1}
+
+    before = analysis_counts(client, "Mass Spectrometry")
+    created = client.post("/planned-analyses/batch", json={"sample_ids": ["STAT-0", "STAT-1"], "analysis_types": ["Mass Spectrometry"]}).json()["created"]
+    client.patch(f"/planned-analyses/{created[0]['id']}", json={"status": "completed"}, headers={"If-Match": "*"})
+    client.delete("/samples/STAT-1")
+    after = analysis_counts(client, "Mass Spectrometry")
+    assert after.get("planned", 0) == before.get("planned", 0)
+    assert after.get("completed", 0) == before.get("completed", 0) + 1
+    assert ("H1", "done") not in sample_counts(client, "W-STAT")
+
+
+def test_reconcile_repairs_drift(client, admin):
+    payload = {"sample_id": "STAT-DRIFT", "well_id": "W-DRIFT", "horizon": "H1", "sampling_date": "2024-06-01"}
+    assert client.post("/samples", json=payload).status_code == 201
+
+    async def corrupt():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(StatusCountModel).where(StatusCountModel.group_a == "W-DRIFT").values(count=42))
+            await db.commit()
+
+    asyncio.run(corrupt())
+    assert sample_counts(client, "W-DRIFT") == {("H1", "new"): 42}
+    assert client.post("/admin/stats/reconcile").status_code == 403
+    res = client.post("/admin/stats/reconcile", headers=admin)
+    assert res.status_code == 200
+    assert res.json()["repaired"] >= 1
+    assert sample_counts(client, "W-DRIFT") == {("H1", "new"): 1}
+    assert client.post("/admin/stats/reconcile", headers=admin).json() == {"repaired": 0}
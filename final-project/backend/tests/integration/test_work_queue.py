@@ -0,0 +1,45 @@
+import asyncio
+
+from sqlalchemy import text
+
+from backend.database import async_engine
+from backend.main import work_queue_analyses_query, work_queue_samples_query
+
+
+def test_work_queue_returns_assigned_analyses_and_samples(client):
+    for sid, well, assigned in [("WQ-1", "W-WQ1", "wq.alice"), ("WQ-2", "W-WQ2", None)]:
+        payload = {"sample_id": sid, "well_id": well, "horizon": "BS10", "sampling_date": "2024-08-01", "assigned_to": assigned}
+        assert client.post("/samples", json=payload).status_code == 201
+    mine = client.post("/planned-analyses", json={"sample_id": "WQ-2", "analysis_type": "IR", "assigned_to": ["wq.bob", "wq.alice"]}).json()
+    client.post("/planned-analyses", json={"sample_id": "WQ-1", "analysis_type": "SARA", "assigned_to": ["wq.bob"]})
+    done = client.post("/planned-analyses", json={"sample_id": "WQ-1", "analysis_type": "IR", "assigned_to": "wq.alice"}).json()
+    client.patch(f"/planned-analyses/{done['id']}", json={"status": "completed"}, headers={"If-Match": "*"})
+
+    queue = client.get("/work-queue", params={"assignee": "wq.alice"}).json()
+    assert [a["id"] for a in queue["analyses"]] == [mine["id"], done["id"]]
+    first = queue["analyses"][0]
+    assert (first["well_id"], first["horizon"], first["assigned_to"]) == ("W-WQ2", "BS10", ["wq.bob", "wq.alice"])
+    assert [s["sample_id"] for s in queue["samples"]] == ["WQ-1"]
+
+    # Analysis-only statuses leave samples out, and the reverse.
+    planned = client.get("/work-queue", params={"assignee": "wq.alice", "status": "planned"}).json()
+    assert [a["id"] for a in planned["analyses"]] == [mine["id"]] and planned["samples"] == []
+    new = client.get("/work-queue", params={"assignee": "wq.alice", "status": "new"}).json()
+    assert new["analyses"] == [] and [s["sample_id"] for s in new["samples"]] == ["WQ-1"]
+
+    assert client.get("/work-queue", params={"assignee": "wq.alice", "status": "bogus"}).status_code == 422
+    assert client.get("/work-queue").status_code == 422
+
+
+def test_work_queue_lookups_use_indexes(client):
+    async def plan(stmt):
+        async with async_engine.connect() as conn:
+            sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+            return [row[-1] for row in await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    # The statements the route runs, with and without a status filter; no step scans a table.
+    by_assignee = asyncio.run(plan(work_queue_analyses_query("wq.alice")))
+    assert "ix_planned_analysis_assignees_assignee_analysis_id" in by_assignee[0]
+    assert asyncio.run(plan(work_queue_samples_query("wq.alice"))) == ["SEARCH samples USING INDEX ix_samples_assigned_to_sample_id (assigned_to=?)"]
+    for steps in (by_assignee, asyncio.run(plan(work_queue_analyses_query("wq.alice", "planned"))), asyncio.run(plan(work_queue_samples_query("wq.alice", "new")))):
+        assert not [step for step in steps if step.startswith("SCAN")], steps
@@ -12,7 +12,7 @@ def test_sample_to_analysis_workflow(client):
     assert res.status_code == 201
     assert res.json()["sample_id"] == "S-100"
 
-    res = client.patch("/samples/S-100", json={"status": "progress"})
+    res = client.patch("/samples/S-100", json={"status": "progress"}, headers={"If-Match": "*"})
     assert res.status_code == 200
     assert res.json()["status"] == "progress"
 
@@ -23,6 +23,6 @@ def test_sample_to_analysis_workflow(client):
     assert analysis["sample_id"] == "S-100"
     assert analysis["analysis_type"] == "SARA"
 
-    res = client.patch(f"/planned-analyses/{analysis['id']}", json={"status": "in_progress"})
+    res = client.patch(f"/planned-analyses/{analysis['id']}", json={"status": "in_progress"}, headers={"If-Match": "*"})
     assert res.status_code == 200
     assert res.json()["status"] == "in_progress"
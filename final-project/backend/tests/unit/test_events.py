@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from backend.events import Broadcaster, change_event
+
+
+async def collect(stream, count):
+    frames = []
+    async for frame in stream:
+        frames.append(frame)
+        if len(frames) == count:
+            break
+    return frames
+
+
+def test_stream_formats_events_and_heartbeats():
+    async def scenario():
+        broadcaster = Broadcaster()
+        queue = broadcaster.subscribe()
+        broadcaster.publish(change_event("sample", "S-1", "updated", status="done", assigned_to=None))
+        stream = broadcaster.stream(queue, heartbeat=0.01)
+        frames = await collect(stream, 3)
+        await stream.aclose()
+        return broadcaster, frames
+
+    broadcaster, frames = asyncio.run(scenario())
+    assert frames[0] == "retry: 10\n\n"
+    assert frames[1] == 'id: 1\nevent: change\ndata: {"entity":"sample","id":"S-1","action":"updated","status":"done"}\n\n'
+    assert frames[2] == ": keepalive\n\n"
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_slow_consumer_is_dropped_without_blocking_publisher():
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=4)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe()
+        for i in range(10):
+            broadcaster.publish({"n": i})
+            while not fast.empty():
+                fast.get_nowait()
+        frames = await collect(broadcaster.stream(slow), 10)
+        return broadcaster, frames
+
+    broadcaster, frames = asyncio.run(scenario())
+    assert broadcaster.stats() == {"subscribers": 1, "published": 10, "dropped": 1}
+    # Three events fit; the reserved slot carries the end-of-stream marker.
+    assert [json.loads(f.rsplit("data: ", 1)[1]) for f in frames[1:4]] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert frames[-1] == "event: dropped\ndata: {}\n\n"
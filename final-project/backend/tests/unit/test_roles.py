@@ -1,9 +1,20 @@
-from backend.main import parse_roles, serialize_roles
+from backend.permissions import ALL_PERMISSIONS, Permission, header_permissions, normalize_roles, parse_roles, permissions_for
 
 
 def test_parse_roles_handles_csv():
     assert parse_roles("admin,lab_operator") == ["admin", "lab_operator"]
 
 
-def test_serialize_roles_defaults():
-    assert serialize_roles(["lab_operator", ""]) == "lab_operator"
+def test_normalize_roles_defaults():
+    assert normalize_roles(["lab_operator", ""]) == ["lab_operator"]
+    assert normalize_roles([" admin", "admin", "lab_operator"]) == ["admin", "lab_operator"]
+    assert normalize_roles([]) == ["lab_operator"]
+
+
+def test_permissions_are_the_union_of_role_bits():
+    assert permissions_for(["lab_operator", "Admin"]) == ALL_PERMISSIONS
+    assert permissions_for(["lab_operator", "unknown"]) == Permission.NONE
+    assert Permission.DELETE_SAMPLES in header_permissions("lab_operator,admin", "")
+    assert Permission.DELETE_SAMPLES not in header_permissions("lab_operator", "warehouse_worker")
+    assert Permission.MANAGE_USERS in permissions_for(["admin"])
+    assert Permission.MANAGE_USERS not in permissions_for(["lab_operator", "action_supervision"])
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.metrics import RequestDB
+from backend.sql_guard import BudgetEnforcer, SQLBudgetExceeded, log_slow_queries, sql_budget
+
+
+class Route:
+    path = "/things/{thing_id}"
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+
+@sql_budget(2)
+def endpoint():
+    pass
+
+
+def request_with(statements):
+    scope = {"method": "GET", "route": Route(endpoint)}
+    db = RequestDB(scope)
+    db.statements = statements
+    return scope, db
+
+
+def test_raise_mode_fails_over_budget():
+    enforcer = BudgetEnforcer("raise")
+    scope, db = request_with(2)
+    enforcer(scope, 200, db)
+    scope, db = request_with(3)
+    with pytest.raises(SQLBudgetExceeded, match="GET /things/{thing_id} ran 3 SQL statements, budget is 2"):
+        enforcer(scope, 200, db)
+
+
+def test_log_mode_records_violation(caplog):
+    enforcer = BudgetEnforcer("log")
+    scope, db = request_with(5)
+    with caplog.at_level(logging.WARNING, logger="labsync.sql_budget"):
+        enforcer(scope, 200, db)
+        enforcer(scope, 200, db)
+    assert enforcer.violations == {"GET /things/{thing_id}": 2}
+    assert enforcer.stats() == {"violations": 2, "routes_over_budget": 1}
+    assert "budget is 2" in caplog.text
+
+
+def test_routes_without_budget_are_ignored():
+    enforcer = BudgetEnforcer("raise")
+    scope = {"method": "GET", "route": Route(lambda: None)}
+    db = RequestDB(scope)
+    db.statements = 100
+    enforcer(scope, 200, db)
+
+
+def test_slow_queries_are_logged_with_statement_and_parameters(caplog):
+    engine = create_engine("sqlite://")
+    log_slow_queries(engine, threshold_ms=0)
+    with caplog.at_level(logging.WARNING, logger="labsync.slow_query"), engine.connect() as conn:
+        conn.execute(text("SELECT :value"), {"value": 42})
+    assert "statement=SELECT ? parameters=(42,)" in caplog.text
+    assert "route=-" in caplog.text
@@ -0,0 +1,53 @@
+import pytest
+
+from backend import tokens
+from backend.tokens import TOKEN_TTL_SECONDS, InvalidToken, MissingTokenSecret, Revocations, check_token_secret, issue_token, revoke_tokens, verify_token
+
+
+def test_token_round_trips_its_claims():
+    claims = verify_token(issue_token(7, "Ann Lab", ["lab_operator", "admin"], now=1000.0), now=1001.0)
+    assert (claims["sub"], claims["name"], claims["roles"]) == (7, "Ann Lab", ["lab_operator", "admin"])
+
+
+def test_tampered_or_expired_tokens_are_rejected():
+    token = issue_token(8, "Bob", ["warehouse_worker"], now=1000.0)
+    payload, signature = token.split(".")
+    forged = issue_token(8, "Bob", ["admin"], now=1000.0).split(".")[0]
+    with pytest.raises(InvalidToken, match="Invalid token"):
+        verify_token(f"{forged}.{signature}", now=1001.0)
+    with pytest.raises(InvalidToken, match="Invalid token"):
+        verify_token(payload, now=1001.0)
+    with pytest.raises(InvalidToken, match="Token expired"):
+        verify_token(token, now=1000.0 + TOKEN_TTL_SECONDS)
+
+
+def test_revocation_covers_tokens_issued_before_it():
+    old = issue_token(9, "Cy", ["lab_operator"], now=1000.0)
+    revoke_tokens(9, now=1500.0)
+    with pytest.raises(InvalidToken, match="Token revoked"):
+        verify_token(old, now=1600.0)
+    assert verify_token(issue_token(9, "Cy", ["admin"], now=1501.0), now=1600.0)["roles"] == ["admin"]
+
+
+def test_startup_needs_a_secret_outside_development(monkeypatch):
+    monkeypatch.setattr(tokens, "_secret", "")
+    monkeypatch.setattr(tokens, "AUTH_DEV_MODE", False)
+    with pytest.raises(MissingTokenSecret):
+        check_token_secret("check")
+    check_token_secret("create")
+    monkeypatch.setattr(tokens, "AUTH_DEV_MODE", True)
+    check_token_secret("check")
+    monkeypatch.setattr(tokens, "AUTH_DEV_MODE", False)
+    monkeypatch.setattr(tokens, "_secret", "shared")
+    check_token_secret("check")
+
+
+def test_revocations_are_kept_until_the_tokens_they_cover_expire():
+    revocations = Revocations(ttl=900)
+    revocations.revoke(1, at=1000.0)
+    for user_id in range(2, 20002):
+        revocations.revoke(user_id, at=1001.0)
+    assert revocations.revoked_at(1, now=1899.0) == 1000.0
+    assert revocations.revoked_at(1, now=1900.0) is None
+    revocations.revoke(2, at=1902.0)
+    assert revocations.stats() == {"size": 1, "expired": 20001}
@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+logger = logging.getLogger("labsync.auth")
+
+# Local development only: allows a random signing secret and trusts the
+# X-Role / X-Roles / X-User headers of requests without a token.
+AUTH_DEV_MODE = os.getenv("AUTH_DEV_MODE", "0").strip().lower() in {"1", "true", "yes", "on"}
+# Short, because a revocation only reaches the worker that made it; other
+# workers honour the old roles until the token expires. Clients refresh.
+TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", "900"))
+_secret = os.getenv("AUTH_TOKEN_SECRET", "")
+TOKEN_SECRET = _secret.encode() or secrets.token_bytes(32)
+
+
+class Revocations:
+    """user id -> time of the user's last role change; tokens issued before it are rejected.
+
+    Single process only: a revocation is not seen by other workers, which
+    keep accepting the old token until it expires, at most ttl seconds
+    later. An entry is dropped only once it is ttl seconds old, when every
+    token it covers has expired; nothing is evicted earlier, so a
+    revocation cannot be lost to memory pressure. Role changes are rare,
+    so the map stays small.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.expired = 0
+        self._revoked: dict[str, float] = {}
+
+    def revoke(self, user_id: int, at: float):
+        self._drop_expired(at)
+        key = str(user_id)
+        # Re-inserted at the end, so entries stay ordered oldest first.
+        self._revoked[key] = max(at, self._revoked.pop(key, at))
+
+    def revoked_at(self, user_id: int, now: float) -> float | None:
+        at = self._revoked.get(str(user_id))
+        return None if at is None or at <= now - self.ttl else at
+
+    def invalidate(self, key: str):
+        self._revoked.pop(key, None)
+
+    def _drop_expired(self, now: float):
+        while self._revoked:
+            key, at = next(iter(self._revoked.items()))
+            if at > now - self.ttl:
+                break
+            del self._revoked[key]
+            self.expired += 1
+
+    def stats(self) -> dict:
+        return {"size": len(self._revoked), "expired": self.expired}
+
+
+revocations = Revocations(ttl=TOKEN_TTL_SECONDS)
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+class MissingTokenSecret(RuntimeError):
+    pass
+
+
+def check_token_secret(schema_mode: str):
+    """Refuse to start without AUTH_TOKEN_SECRET unless this is a development setup.
+
+    With a random per-process secret, tokens fail on every other worker and
+    after each restart.
+    """
+    if _secret:
+        return
+    if schema_mode == "create" or AUTH_DEV_MODE:
+        logger.warning("AUTH_TOKEN_SECRET is not set; using a random per-process secret")
+        return
+    raise MissingTokenSecret("AUTH_TOKEN_SECRET is not set; give every worker the same secret (or set AUTH_DEV_MODE=1 locally)")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(TOKEN_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user_id: int, full_name: str, roles: list[str], now: float | None = None) -> str:
+    """A "<payload>.<signature>" token carrying the user's id, name and roles."""
+    issued = time.time() if now is None else now
+    claims = {"sub": user_id, "name": full_name, "roles": roles, "iat": issued, "exp": issued + TOKEN_TTL_SECONDS}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token: str, now: float | None = None) -> dict:
+    """Return the token's claims; raises InvalidToken. Needs no database access."""
+    payload, _, signature = token.partition(".")
+    # Checked before the payload is decoded, so unsigned input is never parsed.
+    if not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        raise InvalidToken("Invalid token")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    if claims["exp"] <= (time.time() if now is None else now):
+        raise InvalidToken("Token expired")
+    revoked_at = revocations.revoked_at(claims["sub"], time.time() if now is None else now)
+    if revoked_at is not None and claims["iat"] <= revoked_at:
+        raise InvalidToken("Token revoked")
+    return claims
+
+
+def revoke_tokens(user_id: int, now: float | None = None):
+    """Reject every token issued to user_id so far, e.g. after a role change."""
+    revocations.revoke(user_id, time.time() if now is None else now)
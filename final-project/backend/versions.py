@@ -0,0 +1,72 @@
+import hashlib
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+try:
+    from .models import CollectionVersionModel
+except ImportError:  # pragma: no cover
+    from models import CollectionVersionModel  # type: ignore
+
+
+CHANGED_KEY = "changed_collections"
+
+
+def touch(db: AsyncSession, *collections: str):
+    """Mark collections as changed; their versions are bumped when db commits."""
+    db.sync_session.info.setdefault(CHANGED_KEY, set()).update(collections)
+
+
+def _bump_versions(session: Session):
+    changed = session.info.pop(CHANGED_KEY, None)
+    # Sorted so concurrent writers always lock version rows in the same order.
+    for name in sorted(changed or ()):
+        result = session.execute(
+            update(CollectionVersionModel)
+            .where(CollectionVersionModel.name == name)
+            .values(version=CollectionVersionModel.version + 1)
+        )
+        if result.rowcount == 0:
+            session.execute(insert(CollectionVersionModel).values(name=name, version=1))
+
+
+event.listen(Session, "before_commit", _bump_versions)
+event.listen(Session, "after_soft_rollback", lambda s, _: s.info.pop(CHANGED_KEY, None))
+
+
+async def collection_etag(db: AsyncSession, collection: str, request: Request) -> str:
+    version = await db.scalar(select(CollectionVersionModel.version).where(CollectionVersionModel.name == collection))
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2s(query.encode(), digest_size=6).hexdigest()
+    return f'"{collection}-{version or 0}-{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Set validators on response; return a 304 if the client already has etag."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+    candidates = {tag.strip() for tag in (request.headers.get("if-none-match") or "").split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def entity_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def if_match(request: Request) -> set[str] | None:
+    """ETags listed in If-Match, or None for "*"; 428 when the header is absent.
+
+    An entity's ETag is just its version, so weak tags (W/"3") match like
+    strong ones.
+    """
+    header = request.headers.get("if-match")
+    if header is None:
+        raise HTTPException(status_code=428, detail='Send If-Match with the version the change is based on, or "*"')
+    if header.strip() == "*":
+        return None
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
@@ -1577,6 +1577,16 @@ export function KanbanBoard({
     setTimeout(() => setSelectedCard(null), 300);
   };
 
+  // Keep the version each update returns, so the next update's If-Match is current.
+  const rememberSampleVersion = (sampleId: string, version?: number) => {
+    setCards((prev) => prev.map((c) => (c.sampleId === sampleId ? { ...c, version } : c)));
+    setSelectedCard((prev) => (prev?.sampleId === sampleId ? { ...prev, version } : prev));
+  };
+
+  const rememberAnalysisVersion = (analysisId: number, version?: number) => {
+    setPlannedAnalyses((prev) => prev.map((pa) => (pa.id === analysisId ? { ...pa, version } : pa)));
+  };
+
   const applySampleStatusChange = (cardId: string, columnId: KanbanCard['status'], options?: { skipUndo?: boolean }) => {
     const prevCard =
       cards.find((c) => c.id === cardId || c.sampleId === cardId) ??
@@ -1603,8 +1613,9 @@ export function KanbanBoard({
           : card,
       ),
     );
-    updateSampleStatus(cardId, columnId)
+    updateSampleStatus(cardId, columnId, undefined, prevCard?.version)
       .then((updated) => {
+        rememberSampleVersion(updated.sampleId, updated.version);
         if (role === 'warehouse_worker' && columnId === 'review') {
           ensureAnalyses(updated.sampleId, plannedAnalyses, setPlannedAnalyses, analysisTypes);
         }
@@ -1782,7 +1793,9 @@ export function KanbanBoard({
       setPlannedAnalyses((prev) =>
         prev.map((pa) => (pa.id === analysis.id ? { ...pa, status: toAnalysisStatus(columnId) } : pa)),
       );
-      updatePlannedAnalysis(analysis.id, toAnalysisStatus(columnId)).catch(() => {});
+      updatePlannedAnalysis(analysis.id, toAnalysisStatus(columnId), undefined, analysis.version)
+        .then((updated) => rememberAnalysisVersion(updated.id, updated.version))
+        .catch(() => {});
       return;
     }
     const conflict = conflicts.find((c) => `conflict-${c.id}` === cardId);
@@ -1943,8 +1956,9 @@ export function KanbanBoard({
       );
     }
     try {
+      let version = cards.find((c) => c.sampleId === sampleId)?.version;
       if (payload.status) {
-        await updateSampleStatus(sampleId, payload.status, payload.storage_location);
+        version = (await updateSampleStatus(sampleId, payload.status, payload.storage_location, version)).version;
       }
       const fieldPayload: Record<string, string | undefined> = {};
       if (payload.storage_location !== undefined && !payload.status) fieldPayload.storage_location = payload.storage_location;
@@ -1953,8 +1967,9 @@ export function KanbanBoard({
       if (payload.horizon) fieldPayload.horizon = payload.horizon;
       if (payload.assigned_to) fieldPayload.assigned_to = payload.assigned_to;
       if (Object.keys(fieldPayload).length > 0) {
-        await updateSampleFields(sampleId, fieldPayload);
+        version = (await updateSampleFields(sampleId, fieldPayload, version)).version;
       }
+      rememberSampleVersion(sampleId, version);
     } catch (err) {
       toast({
         title: 'Undo sync failed',
@@ -2016,10 +2031,15 @@ export function KanbanBoard({
       }
     } else if (lastAction.kind === 'analysis') {
       try {
-        await updatePlannedAnalysis(lastAction.analysisId, lastAction.prevStatus, lastAction.prevAssignedTo ?? undefined);
+        const { version } = await updatePlannedAnalysis(
+          lastAction.analysisId,
+          lastAction.prevStatus,
+          lastAction.prevAssignedTo ?? undefined,
+          plannedAnalyses.find((pa) => pa.id === lastAction!.analysisId)?.version,
+        );
         setPlannedAnalyses((prev) => {
           const updated = prev.map((pa) =>
-            pa.id === lastAction!.analysisId ? { ...pa, status: lastAction!.prevStatus, assignedTo: lastAction!.prevAssignedTo ?? pa.assignedTo } : pa,
+            pa.id === lastAction!.analysisId ? { ...pa, status: lastAction!.prevStatus, assignedTo: lastAction!.prevAssignedTo ?? pa.assignedTo, version } : pa,
           );
           const methods = updated.filter((pa) => pa.sampleId === lastAction!.sampleId);
           const allDone = methods.length > 0 && methods.every((m) => m.status === 'completed');
@@ -2310,7 +2330,8 @@ export function KanbanBoard({
     }
     setIssuePrompt({ open: false, card: null });
     setIssueReason('');
-    updateSampleStatus(issuePrompt.card.sampleId, 'done').catch((err) => {
+    const issuedSampleId = issuePrompt.card.sampleId;
+    updateSampleStatus(issuedSampleId, 'done', undefined, issuePrompt.card.version).then((updated) => rememberSampleVersion(issuedSampleId, updated.version)).catch((err) => {
       toast({
         title: 'Failed to update sample',
         description: err instanceof Error ? err.message : 'Backend unreachable',
@@ -2475,12 +2496,12 @@ export function KanbanBoard({
           return;
         }
         const nextAssignees = isUnassigned ? [] : appendAssignee(existing.assignedTo, assignee) ?? [];
-        await updatePlannedAnalysis(existing.id, existing.status, nextAssignees);
+        const { version } = await updatePlannedAnalysis(existing.id, existing.status, nextAssignees, existing.version);
         setPlannedAnalyses((prev) =>
           prev.map((pa) => {
             if (pa.id !== existing.id) return pa;
-            if (isUnassigned || nextAssignees.length === 0) return { ...pa, assignedTo: undefined };
-            return { ...pa, assignedTo: nextAssignees };
+            if (isUnassigned || nextAssignees.length === 0) return { ...pa, assignedTo: undefined, version };
+            return { ...pa, assignedTo: nextAssignees, version };
           }),
         );
         toast({
@@ -2614,7 +2635,8 @@ export function KanbanBoard({
       return updated;
     });
     try {
-      await updatePlannedAnalysis(methodId, nextStatus);
+      const updated = await updatePlannedAnalysis(methodId, nextStatus, undefined, prevPa?.version);
+      rememberAnalysisVersion(methodId, updated.version);
     } catch (err) {
       toast({
         title: "Failed to update method",
@@ -2775,7 +2797,8 @@ export function KanbanBoard({
       );
     }
     try {
-      await updateSampleFields(sampleId, targetStatus ? { ...nextUpdates, status: targetStatus } : nextUpdates);
+      const updated = await updateSampleFields(sampleId, targetStatus ? { ...nextUpdates, status: targetStatus } : nextUpdates, prevCard?.version);
+      rememberSampleVersion(sampleId, updated.version);
       if (role === 'warehouse_worker' && (targetStatus === 'review' || nextUpdates.status === 'review')) {
         ensureAnalyses(sampleId, plannedAnalyses, setPlannedAnalyses, analysisTypes);
       }
@@ -2800,7 +2823,8 @@ export function KanbanBoard({
       setSelectedCard((prev) => (prev ? { ...prev, assignedTo: updates.assigned_to ?? prev.assignedTo } : prev));
     }
     try {
-      await updatePlannedAnalysis(analysisId, undefined as any, updates.assigned_to);
+      const updated = await updatePlannedAnalysis(analysisId, undefined as any, updates.assigned_to, plannedAnalyses.find((pa) => pa.id === analysisId)?.version);
+      rememberAnalysisVersion(analysisId, updated.version);
     } catch (err) {
       toast({
         title: "Failed to update analysis",
@@ -3170,14 +3194,14 @@ export function KanbanBoard({
             }
             const isUnassigned = operator === '__unassigned';
             const nextAssignees = isUnassigned ? [] : appendAssignee(target.assignedTo, operator) ?? [];
-            updatePlannedAnalysis(target.id, target.status, nextAssignees).then(() => {
+            updatePlannedAnalysis(target.id, target.status, nextAssignees, target.version).then(({ version }) => {
               setPlannedAnalyses((prev) =>
                 prev.map((pa) => {
                   if (pa.id !== target.id) return pa;
                   if (isUnassigned || nextAssignees.length === 0) {
-                    return { ...pa, assignedTo: undefined };
+                    return { ...pa, assignedTo: undefined, version };
                   }
-                  return { ...pa, assignedTo: nextAssignees };
+                  return { ...pa, assignedTo: nextAssignees, version };
                 }),
               );
               toast({
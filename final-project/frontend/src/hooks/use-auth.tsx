@@ -28,6 +28,32 @@ async function apiLogin(username: string, password: string) {
   return (await res.json()) as { token: string; role: Role; roles?: Role[]; full_name: string };
 }
 
+async function apiRefresh(token: string) {
+  const res = await fetch("/api/auth/refresh", {
+    method: "POST",
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!res.ok) throw new Error(`Refresh failed: ${res.status}`);
+  return (await res.json()) as { token: string; role: Role; roles?: Role[]; full_name: string };
+}
+
+// Seconds since the epoch at which the token expires, read from its (unverified) payload.
+function tokenExpiry(token: string): number {
+  try {
+    const payload = token.split(".")[0].replace(/-/g, "+").replace(/_/g, "/");
+    return JSON.parse(atob(payload.padEnd(Math.ceil(payload.length / 4) * 4, "="))).exp ?? 0;
+  } catch {
+    return 0;
+  }
+}
+
+// Tokens live for minutes; refresh this long before they expire.
+const REFRESH_MARGIN_SECONDS = 60;
+
+function toAuthUser(data: { token: string; role: Role; roles?: Role[]; full_name: string }): AuthUser {
+  return { token: data.token, role: data.role, roles: data.roles ?? [data.role], fullName: data.full_name };
+}
+
 export function AuthProvider({ children }: { children: React.ReactNode }) {
   const [user, setUser] = useState<AuthUser | null>(null);
 
@@ -44,8 +70,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   }, []);
 
   const login = async (username: string, password: string) => {
-    const data = await apiLogin(username, password);
-    const authUser: AuthUser = { token: data.token, role: data.role, roles: data.roles ?? [data.role], fullName: data.full_name };
+    const authUser = toAuthUser(await apiLogin(username, password));
     setUser(authUser);
     localStorage.setItem(STORAGE_KEY, JSON.stringify(authUser));
   };
@@ -55,6 +80,23 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     localStorage.removeItem(STORAGE_KEY);
   };
 
+  // Swap the token for a fresh one (with the user's current roles) before it
+  // expires; a token that can no longer be refreshed means logging in again.
+  useEffect(() => {
+    if (!user) return;
+    const delayMs = Math.max(0, (tokenExpiry(user.token) - REFRESH_MARGIN_SECONDS) * 1000 - Date.now());
+    const timer = window.setTimeout(async () => {
+      try {
+        const authUser = toAuthUser(await apiRefresh(user.token));
+        setUser(authUser);
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(authUser));
+      } catch {
+        logout();
+      }
+    }, delayMs);
+    return () => window.clearTimeout(timer);
+  }, [user]);
+
   const value = useMemo(() => ({ user, login, logout }), [user]);
 
   return <AuthContext.Provider value={value}>{children}</AuthContext.Provider>;
@@ -1,17 +1,13 @@
 import { KanbanCard, NewCardPayload, PlannedAnalysisCard } from "@/types/kanban";
 
+// The server takes the caller's user and roles from the signed login token only.
 function authHeaders() {
-  let userName: string | undefined;
-  let roles: string[] | undefined;
-  let role: string | undefined;
+  let token: string | undefined;
   if (typeof window !== "undefined") {
     try {
       const stored = localStorage.getItem("labsync-auth");
       if (stored) {
-        const parsed = JSON.parse(stored);
-        userName = parsed?.fullName || parsed?.username;
-        roles = parsed?.roles;
-        role = parsed?.role;
+        token = JSON.parse(stored)?.token;
       }
     } catch {
       // ignore
@@ -19,17 +15,75 @@ function authHeaders() {
   }
   return {
     "Content-Type": "application/json",
-    ...(userName ? { "X-User": userName } : {}),
-    ...(role ? { "X-Role": role } : {}),
-    ...(roles ? { "X-Roles": Array.isArray(roles) ? roles.join(",") : roles } : {}),
+    ...(token ? { Authorization: `Bearer ${token}` } : {}),
   };
 }
 
-export async function fetchSamples(): Promise<KanbanCard[]> {
-  const res = await fetch("/api/samples");
+// Sends the version the card was loaded at; the server answers 412 and queues a conflict if it changed since.
+// Without a known version the update explicitly applies to whatever the server has ("*").
+function versionHeaders(version?: number) {
+  return { ...authHeaders(), "If-Match": version === undefined ? "*" : `"${version}"` };
+}
+
+const SAMPLE_PAGE_SIZE = 500;
+
+export type SampleQuery = {
+  status?: string;
+  wellId?: string;
+  horizon?: string;
+  assignedTo?: string;
+  storageLocation?: string;
+  samplingDateFrom?: string;
+  samplingDateTo?: string;
+};
+
+export async function fetchSamplePage(
+  query: SampleQuery = {},
+  cursor?: string | null,
+  limit = SAMPLE_PAGE_SIZE,
+): Promise<{ cards: KanbanCard[]; nextCursor: string | null }> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  const filters: Record<string, string | undefined> = {
+    status: query.status,
+    well_id: query.wellId,
+    horizon: query.horizon,
+    assigned_to: query.assignedTo,
+    storage_location: query.storageLocation,
+    sampling_date_from: query.samplingDateFrom,
+    sampling_date_to: query.samplingDateTo,
+  };
+  for (const [key, value] of Object.entries(filters)) {
+    if (value) params.set(key, value);
+  }
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`/api/samples?${params.toString()}`);
   if (!res.ok) throw new Error(`Failed to load samples (${res.status})`);
   const data = (await res.json()) as any[];
-  return data.map(mapSampleToCard);
+  return { cards: data.map(mapSampleToCard), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+export async function searchSamples(
+  q: string,
+  cursor?: string | null,
+  limit = 20,
+): Promise<{ cards: KanbanCard[]; nextCursor: string | null }> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`/api/samples/search?${params.toString()}`);
+  if (!res.ok) throw new Error(`Failed to search samples (${res.status})`);
+  const data = (await res.json()) as any[];
+  return { cards: data.map(mapSampleToCard), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+export async function fetchSamples(query: SampleQuery = {}): Promise<KanbanCard[]> {
+  const cards: KanbanCard[] = [];
+  let cursor: string | null = null;
+  do {
+    const page = await fetchSamplePage(query, cursor);
+    cards.push(...page.cards);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return cards;
 }
 
 export async function createSample(payload: NewCardPayload): Promise<KanbanCard> {
@@ -53,15 +107,16 @@ export async function createSample(payload: NewCardPayload): Promise<KanbanCard>
 export async function deleteSample(sampleId: string) {
   const res = await fetch(`/api/samples/${encodeURIComponent(sampleId)}`, {
     method: "DELETE",
+    headers: authHeaders(),
   });
   if (!res.ok) throw new Error(`Failed to delete sample (${res.status})`);
   return (await res.json()) as { deleted: boolean };
 }
 
-export async function updateSampleStatus(sampleId: string, status: string, storageLocation?: string): Promise<KanbanCard> {
+export async function updateSampleStatus(sampleId: string, status: string, storageLocation?: string, version?: number): Promise<KanbanCard> {
   const res = await fetch(`/api/samples/${sampleId}`, {
     method: "PATCH",
-    headers: authHeaders(),
+    headers: versionHeaders(version),
     body: JSON.stringify({ status, storage_location: storageLocation }),
   });
   if (!res.ok) throw new Error(`Failed to update sample (${res.status})`);
@@ -69,10 +124,24 @@ export async function updateSampleStatus(sampleId: string, status: string, stora
   return mapSampleToCard(data);
 }
 
-export async function updateSampleFields(sampleId: string, payload: Record<string, string | undefined>): Promise<KanbanCard> {
+export type BulkUpdateResult = { updated: number; results: { id: string | number; ok: boolean; error?: string | null }[] };
+
+export async function bulkUpdateSamples(
+  changes: { id: string; status?: string; assigned_to?: string | null; storage_location?: string | null }[],
+): Promise<BulkUpdateResult> {
+  const res = await fetch("/api/samples/bulk-update", {
+    method: "POST",
+    headers: authHeaders(),
+    body: JSON.stringify({ changes }),
+  });
+  if (!res.ok) throw new Error(`Failed to update samples (${res.status})`);
+  return (await res.json()) as BulkUpdateResult;
+}
+
+export async function updateSampleFields(sampleId: string, payload: Record<string, string | undefined>, version?: number): Promise<KanbanCard> {
   const res = await fetch(`/api/samples/${sampleId}`, {
     method: "PATCH",
-    headers: authHeaders(),
+    headers: versionHeaders(version),
     body: JSON.stringify(payload),
   });
   if (!res.ok) throw new Error(`Failed to update sample (${res.status})`);
@@ -101,6 +170,7 @@ export function mapSampleToCard(sample: any): KanbanCard {
     assignedTo: sample.assigned_to ?? "Unassigned",
     analysisStatus: sample.status ?? "new",
     sampleStatus: sample.status ?? "new",
+    version: sample.version,
   };
 }
 
@@ -110,6 +180,40 @@ export async function fetchPlannedAnalyses(): Promise<PlannedAnalysisCard[]> {
   return (await res.json()) as PlannedAnalysisCard[];
 }
 
+export type WorkQueue = {
+  analyses: (PlannedAnalysisCard & { well_id: string; horizon: string })[];
+  samples: KanbanCard[];
+};
+
+export async function fetchWorkQueue(assignee: string, status?: string): Promise<WorkQueue> {
+  const params = new URLSearchParams({ assignee });
+  if (status) params.set("status", status);
+  const res = await fetch(`/api/work-queue?${params.toString()}`);
+  if (!res.ok) throw new Error(`Failed to load work queue (${res.status})`);
+  const data = await res.json();
+  return { analyses: data.analyses, samples: data.samples.map(mapSampleToCard) };
+}
+
+export type ChangeEvent = {
+  entity: "sample" | "planned_analysis" | "action_batch" | "conflict";
+  id: string | number | null;
+  action: string;
+  status?: string;
+  assigned_to?: string | string[];
+  sample_id?: string;
+  count?: number;
+};
+
+// Subscribes to the server's change feed; returns an unsubscribe function.
+// The browser reconnects on its own; onResync fires when the server dropped us
+// for falling behind, so the caller should re-fetch its lists.
+export function subscribeToChanges(onChange: (event: ChangeEvent) => void, onResync?: () => void): () => void {
+  const source = new EventSource("/api/events");
+  source.addEventListener("change", (e) => onChange(JSON.parse((e as MessageEvent).data) as ChangeEvent));
+  source.addEventListener("dropped", () => onResync?.());
+  return () => source.close();
+}
+
 export async function createPlannedAnalysis(payload: { sampleId: string; analysisType: string; assignedTo?: string }) {
   const res = await fetch("/api/planned-analyses", {
     method: "POST",
@@ -121,17 +225,34 @@ export async function createPlannedAnalysis(payload: { sampleId: string; analysi
     }),
   });
   if (!res.ok) throw new Error(`Failed to create analysis (${res.status})`);
-  return (await res.json()) as { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string };
+  return (await res.json()) as { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string; version: number };
+}
+
+export async function createPlannedAnalysesBatch(payload: { sampleIds: string[]; analysisTypes: string[]; assignedTo?: string[] }) {
+  const res = await fetch("/api/planned-analyses/batch", {
+    method: "POST",
+    headers: authHeaders(),
+    body: JSON.stringify({
+      sample_ids: payload.sampleIds,
+      analysis_types: payload.analysisTypes,
+      assigned_to: payload.assignedTo,
+    }),
+  });
+  if (!res.ok) throw new Error(`Failed to plan analyses (${res.status})`);
+  return (await res.json()) as {
+    created: PlannedAnalysisCard[];
+    skipped: { sample_id: string; analysis_type: string; reason: string }[];
+  };
 }
 
-export async function updatePlannedAnalysis(id: number, status: string | undefined, assignedTo?: string[] | string) {
+export async function updatePlannedAnalysis(id: number, status: string | undefined, assignedTo?: string[] | string, version?: number) {
   const res = await fetch(`/api/planned-analyses/${id}`, {
     method: "PATCH",
-    headers: authHeaders(),
+    headers: versionHeaders(version),
     body: JSON.stringify({ status, assigned_to: assignedTo }),
   });
   if (!res.ok) throw new Error(`Failed to update analysis (${res.status})`);
-  return (await res.json()) as { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string };
+  return (await res.json()) as { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string; version: number };
 }
 
 export async function fetchFilterMethods(): Promise<string[]> {
@@ -151,7 +272,7 @@ export async function updateFilterMethods(methods: string[]) {
   return (await res.json()) as { methods: string[] };
 }
 
-export function mapApiAnalysis(pa: { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string }): PlannedAnalysisCard {
+export function mapApiAnalysis(pa: { id: number; sample_id: string; analysis_type: string; status: string; assigned_to?: string[] | string; version?: number }): PlannedAnalysisCard {
   const assignedTo =
     typeof pa.assigned_to === "string"
       ? pa.assigned_to.trim()
@@ -166,6 +287,7 @@ export function mapApiAnalysis(pa: { id: number; sample_id: string; analysis_typ
     analysisType: pa.analysis_type,
     status: pa.status as PlannedAnalysisCard["status"],
     assignedTo: assignedTo.length > 0 ? assignedTo : undefined,
+    version: pa.version,
   };
 }
 
@@ -212,7 +334,7 @@ export async function resolveConflict(id: number, note?: string) {
 }
 
 export async function fetchUsers() {
-  const res = await fetch("/api/admin/users");
+  const res = await fetch("/api/admin/users", { headers: authHeaders() });
   if (!res.ok) throw new Error(`Failed to load users (${res.status})`);
   return (await res.json()) as { id: number; username: string; full_name: string; role: string; roles: string[] }[];
 }
@@ -45,6 +45,7 @@ export interface KanbanCard {
   returnNotes?: string[];
   analysisLabel?: string;
   adminStored?: boolean;
+  version?: number;
 }
 
 export interface NewCardPayload {
@@ -61,6 +62,7 @@ export interface PlannedAnalysisCard {
   analysisType: string;
   status: PlannedAnalysis['status'];
   assignedTo?: string[];
+  version?: number;
 }
 
 export interface ActionBatchCard {